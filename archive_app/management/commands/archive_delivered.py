@@ -0,0 +1,25 @@
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from archive_app.tier import archive_delivered
+
+
+class Command(BaseCommand):
+    help = "Move delivered invoices older than the configured age, with their lines, to the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_DELIVERED_AFTER_DAYS,
+            help="Archive invoices delivered more than this many days ago.",
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help="Invoices moved per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the invoices that would be moved.")
+
+    def handle(self, *args, **options):
+        before = date.today() - timedelta(days=options['days'])
+        moved = 0
+        for count in archive_delivered(before, options['batch_size'], options['dry_run']):
+            moved += count
+            self.stdout.write(f"{'Found' if options['dry_run'] else 'Archived'} {moved} invoices...")
+        action = "would be archived" if options['dry_run'] else "archived"
+        self.stdout.write(self.style.SUCCESS(f"{moved} invoices delivered before {before} {action}."))
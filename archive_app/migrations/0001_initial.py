@@ -0,0 +1,124 @@
+# Generated by Django 5.2 on 2026-10-19 23:35
+
+import django.db.models.deletion
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedWithdrawalInfo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('invoice_no', models.CharField(blank=True, max_length=12, null=True, unique=True)),
+                ('invoice_type', models.CharField(choices=[('EXP', 'Expired'), ('GEN', 'General')], default='EXP', max_length=12)),
+                ('mio_id', models.CharField(max_length=40)),
+                ('rm_id', models.CharField(max_length=40)),
+                ('da_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('depot_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('route_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('partner_id', models.CharField(max_length=40)),
+                ('request_approval', models.BooleanField(default=False)),
+                ('withdrawal_confirmation', models.BooleanField(default=False)),
+                ('replacement_order', models.BooleanField(default=False)),
+                ('order_approval', models.BooleanField(default=False)),
+                ('order_delivery', models.BooleanField(default=False)),
+                ('request_date', models.DateField(blank=True, null=True)),
+                ('request_approval_date', models.DateField(blank=True, null=True)),
+                ('withdrawal_date', models.DateField(blank=True, null=True)),
+                ('withdrawal_approval_date', models.DateField(blank=True, null=True)),
+                ('order_date', models.DateField(blank=True, null=True)),
+                ('order_approval_date', models.DateField(blank=True, null=True)),
+                ('delivery_da_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('delivery_date', models.DateField(blank=True, null=True)),
+                ('last_status', models.CharField(choices=[('request_pending', 'Request Pending'), ('request_approved', 'Request Approved'), ('withdrawal_pending', 'Withdrawal Pending'), ('withdrawal_approval', 'Withdrawal Approval'), ('withdrawal_approved', 'Withdrawal Approved'), ('replacement_approval', 'Replacement Approval'), ('replacement_approved', 'Replacement Approved'), ('delivery_pending', 'Delivery Pending'), ('delivered', 'Delivered')], default='delivered', max_length=40)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('request_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('request_count', models.IntegerField(default=0)),
+                ('withdrawal_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('withdrawal_count', models.IntegerField(default=0)),
+                ('replacement_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('replacement_count', models.IntegerField(default=0)),
+                ('archived_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+            ],
+            options={
+                'verbose_name': 'Archived Withdrawal Info',
+                'verbose_name_plural': 'Archived Withdrawal Info',
+                'db_table': 'expr_withdrawal_info_archive',
+                'indexes': [models.Index(fields=['delivery_date'], name='expr_wi_archive_delivery_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedReplacementList',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('matnr', models.CharField(max_length=40)),
+                ('batch', models.CharField(blank=True, max_length=40, null=True)),
+                ('pack_qty', models.IntegerField(default=0)),
+                ('unit_qty', models.IntegerField(default=0)),
+                ('net_val', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='replacement_list', to='archive_app.archivedwithdrawalinfo')),
+            ],
+            options={
+                'verbose_name': 'Archived Replacement List',
+                'verbose_name_plural': 'Archived Replacement List',
+                'db_table': 'expr_replacement_list_archive',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedWithdrawalList',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('matnr', models.CharField(max_length=40)),
+                ('batch', models.CharField(max_length=40)),
+                ('pack_qty', models.IntegerField(default=0)),
+                ('strip_qty', models.IntegerField(default=0)),
+                ('unit_qty', models.IntegerField(default=0)),
+                ('net_val', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('expire_date', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('invoice_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='withdrawal_list', to='archive_app.archivedwithdrawalinfo')),
+            ],
+            options={
+                'verbose_name': 'Archived Withdrawal List',
+                'verbose_name_plural': 'Archived Withdrawal List',
+                'db_table': 'expr_withdrawal_list_archive',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedWithdrawalRequestList',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('matnr', models.CharField(max_length=40)),
+                ('batch', models.CharField(max_length=40)),
+                ('pack_qty', models.IntegerField(default=0)),
+                ('strip_qty', models.IntegerField(default=0)),
+                ('unit_qty', models.IntegerField(default=0)),
+                ('net_val', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('expire_date', models.DateField(blank=True, null=True)),
+                ('rel_invoice_no', models.CharField(blank=True, max_length=20, null=True)),
+                ('rel_invoice_date', models.DateField(blank=True, null=True)),
+                ('rel_mio_name', models.CharField(blank=True, max_length=155, null=True)),
+                ('rel_mio_phone', models.CharField(blank=True, max_length=15, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('invoice_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='request_list', to='archive_app.archivedwithdrawalinfo')),
+            ],
+            options={
+                'verbose_name': 'Archived Withdrawal Request List',
+                'verbose_name_plural': 'Archived Withdrawal Request List',
+                'db_table': 'expr_request_list_archive',
+            },
+        ),
+    ]
@@ -0,0 +1,123 @@
+from django.db import models
+from django.db.models.functions import Now
+from withdrawal_app.models import WithdrawalInfo
+
+# Create your models here.
+# The archive tables mirror the hot tables column for column (same column
+# names, same primary keys) so rows can be moved with INSERT ... SELECT and
+# read with the same raw SQL by swapping the table names.
+class ArchivedWithdrawalInfo(models.Model):
+    """
+    Model representing a delivered invoice moved out of `expr_withdrawal_info`.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    invoice_no = models.CharField(max_length=12, unique=True, blank=True, null=True)
+    invoice_type = models.CharField(max_length=12, choices=WithdrawalInfo.InvoiceType.choices, default=WithdrawalInfo.InvoiceType.EXPIRED)
+    mio_id = models.CharField(max_length=40)
+    rm_id = models.CharField(max_length=40)
+    da_id = models.CharField(max_length=40, null=True, blank=True)
+    depot_id = models.CharField(max_length=40, null=True, blank=True)
+    route_id = models.CharField(max_length=40, null=True, blank=True)
+    partner_id = models.CharField(max_length=40)
+    request_approval = models.BooleanField(default=False)
+    withdrawal_confirmation = models.BooleanField(default=False)
+    replacement_order = models.BooleanField(default=False)
+    order_approval = models.BooleanField(default=False)
+    order_delivery = models.BooleanField(default=False)
+    request_date = models.DateField(null=True, blank=True)
+    request_approval_date = models.DateField(null=True, blank=True)
+    withdrawal_date = models.DateField(null=True, blank=True)
+    withdrawal_approval_date = models.DateField(null=True, blank=True)
+    order_date = models.DateField(null=True, blank=True)
+    order_approval_date = models.DateField(null=True, blank=True)
+    delivery_da_id = models.CharField(max_length=40, null=True, blank=True)
+    delivery_date = models.DateField(null=True, blank=True)
+    last_status = models.CharField(max_length=40, choices=WithdrawalInfo.Status.choices, default=WithdrawalInfo.Status.DELIVERED)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    request_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    request_count = models.IntegerField(default=0)
+    withdrawal_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    withdrawal_count = models.IntegerField(default=0)
+    replacement_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    replacement_count = models.IntegerField(default=0)
+    archived_at = models.DateTimeField(db_default=Now())
+
+    def __str__(self):
+        return f'{self.invoice_no}'
+
+    class Meta:
+        db_table = 'expr_withdrawal_info_archive'
+        verbose_name = 'Archived Withdrawal Info'
+        verbose_name_plural = 'Archived Withdrawal Info'
+        indexes = [
+            models.Index(fields=['delivery_date'], name='expr_wi_archive_delivery_idx'),
+        ]
+
+
+class ArchivedWithdrawalRequestList(models.Model):
+    """
+    Model representing an archived row of `expr_request_list`.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    invoice_id = models.ForeignKey(ArchivedWithdrawalInfo, on_delete=models.CASCADE, related_name='request_list')
+    matnr = models.CharField(max_length=40)
+    batch = models.CharField(max_length=40)
+    pack_qty = models.IntegerField(default=0)
+    strip_qty = models.IntegerField(default=0)
+    unit_qty = models.IntegerField(default=0)
+    net_val = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    expire_date = models.DateField(null=True, blank=True)
+    rel_invoice_no = models.CharField(max_length=20, blank=True, null=True)
+    rel_invoice_date = models.DateField(blank=True, null=True)
+    rel_mio_name = models.CharField(max_length=155, blank=True, null=True)
+    rel_mio_phone = models.CharField(max_length=15, blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'expr_request_list_archive'
+        verbose_name = 'Archived Withdrawal Request List'
+        verbose_name_plural = 'Archived Withdrawal Request List'
+
+
+class ArchivedWithdrawalList(models.Model):
+    """
+    Model representing an archived row of `expr_withdrawal_list`.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    invoice_id = models.ForeignKey(ArchivedWithdrawalInfo, on_delete=models.CASCADE, related_name='withdrawal_list')
+    matnr = models.CharField(max_length=40)
+    batch = models.CharField(max_length=40)
+    pack_qty = models.IntegerField(default=0)
+    strip_qty = models.IntegerField(default=0)
+    unit_qty = models.IntegerField(default=0)
+    net_val = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    expire_date = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'expr_withdrawal_list_archive'
+        verbose_name = 'Archived Withdrawal List'
+        verbose_name_plural = 'Archived Withdrawal List'
+
+
+class ArchivedReplacementList(models.Model):
+    """
+    Model representing an archived row of `expr_replacement_list`.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    invoice = models.ForeignKey(ArchivedWithdrawalInfo, on_delete=models.CASCADE, related_name='replacement_list')
+    matnr = models.CharField(max_length=40)
+    batch = models.CharField(max_length=40, null=True, blank=True)
+    pack_qty = models.IntegerField(default=0)
+    unit_qty = models.IntegerField(default=0)
+    net_val = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'expr_replacement_list_archive'
+        verbose_name = 'Archived Replacement List'
+        verbose_name_plural = 'Archived Replacement List'
@@ -0,0 +1,61 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from django.urls import reverse
+from material_app.models import RplMaterial
+from reference_app.models import Customer, RouteWiseDepot
+from replacement_app.models import ReplacementList
+from withdrawal_app.models import WithdrawalInfo, WithdrawalList, WithdrawalRequestList
+from .models import ArchivedWithdrawalInfo, ArchivedWithdrawalList, ArchivedWithdrawalRequestList, ArchivedReplacementList
+from .tier import archive_delivered, archive_watermark, table_tiers, HOT_TABLES, ARCHIVE_TABLES
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        Customer.objects.create(partner='C1', name1='Pharmacy')
+        RouteWiseDepot.objects.create(depot_code='P1', route_code='RT1', route_name='Route 1')
+        RplMaterial.objects.create(matnr='X1', plant='P', sales_org='S', dis_channel='D', material_name='Drug')
+        self.old = self.delivered('INV1', date(2024, 1, 15))
+        self.recent = self.delivered('INV2', date.today())
+
+    def delivered(self, invoice_no, delivery_date):
+        invoice = WithdrawalInfo.objects.create(
+            invoice_no=invoice_no, mio_id='M1', rm_id='R1', depot_id='P1', route_id='RT1', partner_id='C1',
+            delivery_da_id='DD1', delivery_date=delivery_date, last_status=WithdrawalInfo.Status.DELIVERED,
+        )
+        WithdrawalRequestList.objects.create(invoice_id=invoice, matnr='X1', batch='B1', net_val=Decimal('5.00'))
+        WithdrawalList.objects.create(invoice_id=invoice, matnr='X1', batch='B1', net_val=Decimal('5.00'))
+        ReplacementList.objects.create(invoice=invoice, matnr='X1', net_val=Decimal('4.00'))
+        return invoice
+
+    def test_archive_moves_old_invoices_with_their_lines(self):
+        self.assertEqual(list(archive_delivered(date(2025, 1, 1), dry_run=True)), [1])
+        self.assertEqual(ArchivedWithdrawalInfo.objects.count(), 0)
+
+        self.assertEqual(list(archive_delivered(date(2025, 1, 1))), [1])
+        self.assertEqual(list(WithdrawalInfo.objects.values_list('invoice_no', flat=True)), ['INV2'])
+        archived = ArchivedWithdrawalInfo.objects.get()
+        self.assertEqual((archived.pk, archived.invoice_no), (self.old.pk, 'INV1'))
+        for model in [ArchivedWithdrawalRequestList, ArchivedWithdrawalList, ArchivedReplacementList]:
+            self.assertEqual(model.objects.count(), 1)
+        for model in [WithdrawalRequestList, WithdrawalList, ReplacementList]:
+            self.assertEqual(model.objects.count(), 1)
+        self.assertEqual(archive_watermark(), date(2024, 1, 15))
+
+    def test_tiers_follow_the_watermark(self):
+        self.assertEqual(table_tiers(date(2024, 1, 1)), [HOT_TABLES])
+        list(archive_delivered(date(2025, 1, 1)))
+        self.assertEqual(table_tiers(date(2024, 1, 1)), [HOT_TABLES, ARCHIVE_TABLES])
+        self.assertEqual(table_tiers(date(2024, 2, 1)), [HOT_TABLES])
+
+    def test_delivered_list_reads_both_tiers_when_the_range_reaches_back(self):
+        list(archive_delivered(date(2025, 1, 1)))
+
+        def invoice_nos(**query):
+            response = self.client.get(reverse('delivered_list'), {'delivery_da_id': 'DD1', **query})
+            self.assertEqual(response.status_code, 200)
+            return sorted(invoice['invoice_no'] for invoice in response.data['data'])
+
+        self.assertEqual(invoice_nos(), ['INV2'])
+        self.assertEqual(invoice_nos(from_date='2024-01-01'), ['INV1', 'INV2'])
+        self.assertEqual(invoice_nos(from_date='2024-01-01', to_date='2024-12-31'), ['INV1'])
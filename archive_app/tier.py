@@ -0,0 +1,128 @@
+from django.db import connection, transaction
+from django.db.models import Max
+from withdrawal_app.models import WithdrawalInfo, WithdrawalRequestList, WithdrawalList
+from replacement_app.models import ReplacementList
+from withdrawal_app.dialect import in_clause
+from withdrawal_app.transitions import SCOPE_FIELDS
+from sync_app.models import SyncTombstone
+from .models import ArchivedWithdrawalInfo, ArchivedWithdrawalRequestList, ArchivedWithdrawalList, ArchivedReplacementList
+
+# Table names of each tier, keyed by the placeholder used in raw SQL templates
+HOT_TABLES = {
+    'info': 'expr_withdrawal_info',
+    'request_list': 'expr_request_list',
+    'withdrawal_list': 'expr_withdrawal_list',
+    'replacement_list': 'expr_replacement_list',
+}
+ARCHIVE_TABLES = {
+    'info': 'expr_withdrawal_info_archive',
+    'request_list': 'expr_request_list_archive',
+    'withdrawal_list': 'expr_withdrawal_list_archive',
+    'replacement_list': 'expr_replacement_list_archive',
+}
+
+# (hot model, archive model, column holding the invoice id)
+LINE_TABLES = [
+    (WithdrawalRequestList, ArchivedWithdrawalRequestList, 'invoice_id_id'),
+    (WithdrawalList, ArchivedWithdrawalList, 'invoice_id_id'),
+    (ReplacementList, ArchivedReplacementList, 'invoice_id'),
+]
+
+
+def _columns(model):
+    return ", ".join(field.column for field in model._meta.concrete_fields)
+
+
+def archive_watermark():
+    """
+    Return the latest delivery date held in the archive, or None when empty.
+
+    This is a MAX over an indexed column, cheap enough to run per request, and
+    never stale: invoices vanish from the hot tables the moment they are archived.
+    """
+    return ArchivedWithdrawalInfo.objects.aggregate(latest=Max('delivery_date'))['latest']
+
+
+def reaches_archive(from_date):
+    """
+    Check whether a date range starting at `from_date` can contain archived invoices.
+
+    Every date on an invoice is on or before its delivery date, so the range
+    reaches the archive when it starts on or before the archive watermark.
+    """
+    if not from_date:
+        return False
+    watermark = archive_watermark()
+    return watermark is not None and from_date <= watermark
+
+
+def table_tiers(from_date):
+    """
+    Return the table name maps to run a raw query against.
+
+    Always the hot tables, plus the archive tables when the date range reaches
+    into them. Format the SQL template once per map and combine the results.
+    """
+    tiers = [HOT_TABLES]
+    if reaches_archive(from_date):
+        tiers.append(ARCHIVE_TABLES)
+    return tiers
+
+
+def archive_invoices(ids):
+    """
+    Move invoices and all their lines to the archive tables in one transaction.
+
+    The sync feed gets an `invoice` tombstone for each, as archived
+    invoices no longer come up in it.
+
+    Args:
+        ids (list): `WithdrawalInfo` ids to move.
+    """
+    ids = list(ids)
+    info_clause, params = in_clause('id', ids)
+    with transaction.atomic(), connection.cursor() as cursor:
+        SyncTombstone.record_invoices(WithdrawalInfo.objects.filter(id__in=ids).values('id', 'invoice_no', *SCOPE_FIELDS))
+        columns = _columns(WithdrawalInfo)
+        cursor.execute(
+            f"INSERT INTO {ARCHIVE_TABLES['info']} ({columns}) SELECT {columns} FROM {HOT_TABLES['info']} WHERE {info_clause}",
+            params,
+        )
+        for hot, archive, invoice_column in LINE_TABLES:
+            columns = _columns(hot)
+            line_clause, _ = in_clause(invoice_column, ids)
+            cursor.execute(
+                f"INSERT INTO {archive._meta.db_table} ({columns}) SELECT {columns} FROM {hot._meta.db_table} WHERE {line_clause}",
+                params,
+            )
+        for hot, _, invoice_column in LINE_TABLES:
+            line_clause, _ = in_clause(invoice_column, ids)
+            cursor.execute(f"DELETE FROM {hot._meta.db_table} WHERE {line_clause}", params)
+        cursor.execute(f"DELETE FROM {HOT_TABLES['info']} WHERE {info_clause}", params)
+
+
+def archive_delivered(before, batch_size=500, dry_run=False):
+    """
+    Archive delivered invoices whose delivery date is before `before`.
+
+    Invoices are moved in chunks of `batch_size`, one transaction per chunk,
+    so locks stay short and an interrupted run can simply be restarted.
+
+    Yields:
+        int: The number of invoices moved by each chunk.
+    """
+    queryset = (
+        WithdrawalInfo.objects
+        .filter(last_status=WithdrawalInfo.Status.DELIVERED, delivery_date__lt=before)
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+    last_id = 0
+    while True:
+        ids = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not ids:
+            return
+        last_id = ids[-1]
+        if not dry_run:
+            archive_invoices(ids)
+        yield len(ids)
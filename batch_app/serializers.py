@@ -0,0 +1,19 @@
+from rest_framework import serializers
+
+
+class SubRequestSerializer(serializers.Serializer):
+    """
+    Serializer for one sub-request of a batch.
+    """
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    path = serializers.CharField()
+    query = serializers.DictField(child=serializers.CharField(), required=False, default=dict)
+    body = serializers.JSONField(required=False, default=None)
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """
+    Serializer for a batch of sub-requests executed in order.
+    """
+    atomic = serializers.BooleanField(required=False, default=False)
+    requests = SubRequestSerializer(many=True, allow_empty=False)
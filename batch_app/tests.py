@@ -0,0 +1,49 @@
+from datetime import date
+from django.test import TestCase
+from reference_app.models import Customer, RouteWiseDepot
+from withdrawal_app.models import WithdrawalInfo, WithdrawalRequestList, WithdrawalTransition
+
+REQUEST_BODY = {
+    'mio_id': 'M1', 'rm_id': 'R1', 'partner_id': 'C1', 'invoice_type': 'Expired',
+    'request_list': [{
+        'matnr': 'X1', 'batch': 'B1', 'pack_qty': 1, 'strip_qty': 0, 'unit_qty': 0,
+        'net_val': '10.00', 'expire_date': date.today().isoformat(),
+    }],
+}
+
+
+class BatchTests(TestCase):
+    def setUp(self):
+        Customer.objects.create(partner='C1', trans_p_zone='0000RT1')
+        RouteWiseDepot.objects.create(depot_code='P1', route_code='RT1')
+
+    def batch(self, atomic, *subs):
+        response = self.client.post('/api/v1/batch', {'atomic': atomic, 'requests': list(subs)}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def create(self):
+        return {'method': 'POST', 'path': '/api/v1/withdrawal/request', 'body': REQUEST_BODY}
+
+    def missing(self):
+        return {'method': 'GET', 'path': '/api/v1/withdrawal/no-such-route'}
+
+    def test_atomic_batch_rolls_back_on_the_first_failure(self):
+        data = self.batch(True, self.create(), self.missing(), self.create())
+        self.assertFalse(data['success'])
+        self.assertEqual([item['status'] for item in data['responses']], [201, 404, 424])
+        self.assertFalse(WithdrawalInfo.objects.exists())
+        self.assertFalse(WithdrawalRequestList.objects.exists())
+        self.assertFalse(WithdrawalTransition.objects.exists())
+
+    def test_atomic_batch_commits_when_every_request_succeeds(self):
+        data = self.batch(True, self.create(), self.create())
+        self.assertTrue(data['success'])
+        self.assertEqual(WithdrawalInfo.objects.count(), 2)
+        self.assertEqual(WithdrawalRequestList.objects.count(), 2)
+
+    def test_non_atomic_batch_keeps_the_successful_requests(self):
+        data = self.batch(False, self.create(), self.missing())
+        self.assertFalse(data['success'])
+        self.assertEqual([item['status'] for item in data['responses']], [201, 404])
+        self.assertEqual(WithdrawalInfo.objects.count(), 1)
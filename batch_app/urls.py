@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views as batch_views
+
+urlpatterns = [
+    path('', batch_views.BatchView.as_view(), name='batch'),
+]
@@ -0,0 +1,136 @@
+import io
+import json
+import logging
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.urls import Resolver404, resolve
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from drf_spectacular.utils import extend_schema
+from .serializers import BatchRequestSerializer
+
+# Set logger
+logger = logging.getLogger("batch_app")
+
+# Only the application routes may be called through a batch
+ALLOWED_PREFIXES = ('/api/v1/withdrawal/', '/api/v1/replacement/', '/api/v1/material/')
+
+
+class SubRequestFailed(Exception):
+    """Raised to roll back an atomic batch when a sub-request fails."""
+
+
+def build_sub_request(request, method, path, query, body):
+    """
+    Build a Django request for one sub-request.
+
+    The parent request's headers, user and session are carried over, so the
+    sub-request is authenticated exactly like the batch call itself.
+    """
+    payload = b'' if body is None else json.dumps(body, cls=DjangoJSONEncoder).encode('utf-8')
+    environ = {key: value for key, value in request.META.items() if isinstance(value, str)}
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': urlencode(query),
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        'wsgi.input': io.BytesIO(payload),
+    })
+    sub_request = WSGIRequest(environ)
+    sub_request.user = request.user
+    sub_request.session = getattr(request._request, 'session', None)
+    # The batch call itself already passed the CSRF check
+    sub_request._dont_enforce_csrf_checks = True
+    return sub_request
+
+
+def dispatch(request, sub):
+    """
+    Run one sub-request through the URL resolver.
+
+    Returns:
+        dict: `status` and `body` of the sub-response.
+    """
+    path = sub['path'].split('?', 1)[0]
+    if not path.startswith(ALLOWED_PREFIXES):
+        return {"status": status.HTTP_400_BAD_REQUEST, "body": {"success": False, "message": f"Path not allowed in a batch: {path}"}}
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return {"status": status.HTTP_404_NOT_FOUND, "body": {"success": False, "message": f"Not found: {path}"}}
+
+    sub_request = build_sub_request(request, sub['method'], path, sub['query'], sub['body'])
+    response = match.func(sub_request, *match.args, **match.kwargs)
+    if isinstance(response, StreamingHttpResponse):
+        return {"status": status.HTTP_400_BAD_REQUEST, "body": {"success": False, "message": "Streaming endpoints cannot be batched."}}
+    if hasattr(response, 'data'):
+        # DRF response: take the data as-is instead of rendering and re-parsing it
+        return {"status": response.status_code, "body": response.data}
+    if hasattr(response, 'render'):
+        response.render()
+    try:
+        body = json.loads(response.content or b'null')
+    except ValueError:
+        body = response.content.decode('utf-8', errors='replace')
+    return {"status": response.status_code, "body": body}
+
+
+# Create your views here.
+class BatchView(APIView):
+    """
+    View executing many API calls in one HTTP round trip.
+
+    Sub-requests run in order, in-process, through the Django URL resolver.
+    With `atomic` set, they share one transaction: the first failing
+    sub-request (status >= 400) rolls everything back and the rest are skipped.
+    """
+    @extend_schema(request=BatchRequestSerializer)
+    def post(self, request):
+        """
+        Execute a batch of sub-requests.
+
+        Returns:
+            Response: One `{status, body}` entry per sub-request, in order.
+        """
+        serializer = BatchRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"success":False,"message": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        atomic = serializer.validated_data['atomic']
+        subs = serializer.validated_data['requests']
+        if len(subs) > settings.BATCH_MAX_REQUESTS:
+            return Response({"success":False,"message": f"A batch may hold at most {settings.BATCH_MAX_REQUESTS} requests."}, status=status.HTTP_400_BAD_REQUEST)
+
+        responses = []
+        if not atomic:
+            for sub in subs:
+                try:
+                    responses.append(dispatch(request, sub))
+                except Exception as e:
+                    logger.error("Batch sub-request %s %s failed: %s", sub['method'], sub['path'], e, exc_info=True)
+                    responses.append({"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "body": {"success": False, "message": str(e)}})
+            success = all(item['status'] < 400 for item in responses)
+            return Response({"success": success, "atomic": False, "responses": responses}, status=status.HTTP_200_OK)
+
+        try:
+            with transaction.atomic():
+                for sub in subs:
+                    try:
+                        result = dispatch(request, sub)
+                    except Exception as e:
+                        logger.error("Batch sub-request %s %s failed: %s", sub['method'], sub['path'], e, exc_info=True)
+                        result = {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "body": {"success": False, "message": str(e)}}
+                    responses.append(result)
+                    if result['status'] >= 400:
+                        raise SubRequestFailed()
+        except SubRequestFailed:
+            skipped = {"status": status.HTTP_424_FAILED_DEPENDENCY, "body": {"success": False, "message": "Skipped, batch rolled back."}}
+            responses.extend(skipped for _ in subs[len(responses):])
+            return Response({"success": False, "atomic": True, "message": "Batch rolled back.", "responses": responses}, status=status.HTTP_200_OK)
+        return Response({"success": True, "atomic": True, "responses": responses}, status=status.HTTP_200_OK)
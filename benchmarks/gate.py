@@ -0,0 +1,143 @@
+"""
+Performance regression gate.
+
+Runs every scenario once on a small fixed data set and compares its query
+count, SQL time and response size with the committed baseline
+(`benchmarks/baseline.json`). Exits non-zero when a scenario goes past the
+baseline's tolerances, listing the SQL statements it added or dropped.
+
+    python -m benchmarks.gate            # check against the baseline
+    python -m benchmarks.gate --update   # record a new baseline
+
+Query counts and response sizes are deterministic for a given seed, so their
+tolerances are tight; SQL time varies between machines and only catches
+gross regressions. Update the baseline in the same commit as an intended change.
+"""
+import argparse
+import json
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from .run import test_database, call, instrumented
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+
+# Used when a new baseline is recorded; afterwards edit them in the baseline file
+DEFAULT_TOLERANCES = {
+    # Extra queries allowed per scenario
+    'queries': 0,
+    # SQL time may grow by this factor plus this many milliseconds
+    'sql_ms_factor': 3.0,
+    'sql_ms_slack': 20.0,
+    # Response size may grow by this fraction
+    'bytes_ratio': 0.05,
+}
+DATA = {'invoices': 300, 'lines': 5, 'seed': 43}
+
+_PLACEHOLDER_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """Fold whitespace and placeholder lists, so statements compare by shape."""
+    return _PLACEHOLDER_LIST.sub('(%s, ...)', _SPACE.sub(' ', sql).strip())
+
+
+def collect(data):
+    """Run every scenario once and return its measurements, keyed by scenario name."""
+    from django.core.cache import cache
+    from django.test import Client
+    from .generator import generate
+    from .scenarios import SCENARIOS
+
+    cache.clear()
+    dataset = generate(data['invoices'], data['lines'], seed=data['seed'])
+    client = Client()
+    results = {}
+    for scenario in SCENARIOS:
+        request = scenario.build(dataset)
+        call(client, scenario, request)
+        status_code, size, counter = instrumented(client, scenario, request)
+        results[scenario.name] = {
+            'status': status_code,
+            'queries': counter.queries,
+            'sql_ms': round(counter.sql_seconds * 1000, 2),
+            'bytes': size,
+            'statements': dict(Counter(normalize(sql) for sql in counter.statements)),
+        }
+    return results
+
+
+def statement_diff(before, after, width=160):
+    """List the statements `after` runs more (+) or fewer (-) times than `before` (statement to count maps)."""
+    added = Counter(after) - Counter(before)
+    removed = Counter(before) - Counter(after)
+    lines = []
+    for sign, changes in (('+', added), ('-', removed)):
+        for sql, count in sorted(changes.items()):
+            text = sql if len(sql) <= width else sql[:width - 3] + '...'
+            lines.append(f"    {sign} {count}x {text}")
+    return lines
+
+
+def compare(baseline, current, tolerances):
+    """
+    Check current measurements against the baseline.
+
+    Returns:
+        list: One report (list of lines) per failing or unknown scenario.
+    """
+    reports = []
+    for name, now in current.items():
+        then = baseline.get(name)
+        if then is None:
+            reports.append([f"{name}: not in the baseline, run with --update"])
+            continue
+        problems = []
+        if now['status'] != then['status']:
+            problems.append(f"status {then['status']} -> {now['status']}")
+        if now['queries'] > then['queries'] + tolerances['queries']:
+            problems.append(f"queries {then['queries']} -> {now['queries']}")
+        if now['sql_ms'] > then['sql_ms'] * tolerances['sql_ms_factor'] + tolerances['sql_ms_slack']:
+            problems.append(f"sql time {then['sql_ms']:.2f} ms -> {now['sql_ms']:.2f} ms")
+        if now['bytes'] > then['bytes'] * (1 + tolerances['bytes_ratio']):
+            problems.append(f"response {then['bytes']} B -> {now['bytes']} B")
+        if problems:
+            reports.append([f"{name}: {', '.join(problems)}", *statement_diff(then['statements'], now['statements'])])
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check query count, SQL time and response size against the baseline.")
+    parser.add_argument('--update', action='store_true', help='Record the current measurements as the new baseline')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help='Baseline file (default benchmarks/baseline.json)')
+    args = parser.parse_args(argv)
+    path = Path(args.baseline)
+
+    stored = json.loads(path.read_text()) if path.exists() else None
+    if stored is None and not args.update:
+        parser.error(f"{path} does not exist, run with --update first")
+    data = stored['data'] if stored else DATA
+    tolerances = stored['tolerances'] if stored else DEFAULT_TOLERANCES
+
+    with test_database():
+        current = collect(data)
+
+    if args.update:
+        path.write_text(json.dumps({'data': data, 'tolerances': tolerances, 'scenarios': current}, indent=2) + '\n')
+        print(f"Recorded {len(current)} scenarios in {path}")
+        return 0
+
+    reports = compare(stored['scenarios'], current, tolerances)
+    for report in reports:
+        print("\n".join(report), file=sys.stderr)
+    if reports:
+        print(f"\n{len(reports)} of {len(current)} scenarios regressed", file=sys.stderr)
+        return 1
+    print(f"All {len(current)} scenarios within the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Seeded synthetic data for the endpoint benchmarks.
+
+`generate` fills an empty database with invoices spread over every status,
+their request, withdrawal and replacement lines, and the reference rows the
+raw SQL joins against (`rpl_material`, `rpl_customer`, `rpl_user_list`,
+`rdl_route_wise_depot`, `rdl_users_list`). The same seed always gives the
+same data, so runs at the same size are comparable.
+"""
+import io
+import random
+from collections import namedtuple, defaultdict
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, transaction
+from material_app.models import RplMaterial
+from material_app.prices import units_per_pack
+from replacement_app.models import ReplacementList
+from withdrawal_app.models import WithdrawalInfo, WithdrawalRequestList, WithdrawalList
+from withdrawal_app.money import to_paisa, from_paisa, line_paisa
+
+Status = WithdrawalInfo.Status
+STATUSES = list(Status.values)
+
+# Reference tables written with raw SQL (rpl_material goes through its model)
+REFERENCE_TABLES = ['rpl_customer', 'rpl_user_list', 'rdl_route_wise_depot', 'rdl_users_list']
+
+PACK_SIZES = ["10's", "3x10's", "1 x 100", "14's", "1's"]
+ROUTES_PER_DEPOT = 5
+DAS_PER_DEPOT = 4
+INVOICES_PER_MIO = 100
+MIOS_PER_RM = 10
+MATERIALS = 300
+BATCH_SIZE = 2000
+
+# What a generated data set holds, for building scenario parameters.
+# `depots` and `das` map each depot to its routes and DAs; `by_status` maps each status to its invoice numbers.
+Dataset = namedtuple('Dataset', ['invoices', 'lines', 'seed', 'rms', 'mios', 'depots', 'das', 'partners', 'matnrs', 'by_status'])
+
+
+def _insert(table, rows):
+    """Insert dict rows into a table in batches with executemany."""
+    if not rows:
+        return
+    columns = list(rows[0])
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        connection.ops.quote_name(table),
+        ", ".join(connection.ops.quote_name(column) for column in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), BATCH_SIZE):
+            cursor.executemany(sql, [[row[column] for column in columns] for row in rows[start:start + BATCH_SIZE]])
+
+
+def clear_reference():
+    """Delete every row of the reference tables."""
+    RplMaterial.objects.all().delete()
+    with connection.cursor() as cursor:
+        for table in REFERENCE_TABLES:
+            cursor.execute(f"DELETE FROM {connection.ops.quote_name(table)}")
+
+
+def _reached(invoice_status, step):
+    return STATUSES.index(invoice_status) >= STATUSES.index(step)
+
+
+def _reference(rng, invoices):
+    """Build and insert the reference rows sized for `invoices` invoices."""
+    mio_count = max(1, invoices // INVOICES_PER_MIO)
+    rms = [f'RM{n:04d}' for n in range(max(1, mio_count // MIOS_PER_RM))]
+    mios = [f'MIO{n:05d}' for n in range(mio_count)]
+    depots = {f'D{n:03d}': [f'R{n:03d}{r:02d}' for r in range(ROUTES_PER_DEPOT)] for n in range(max(1, invoices // 1000))}
+    das = {depot: [f'DA{depot[1:]}{n:02d}' for n in range(DAS_PER_DEPOT)] for depot in depots}
+    routes = [(depot, route) for depot, depot_routes in depots.items() for route in depot_routes]
+    partners = {f'P{n:07d}': rng.choice(routes) for n in range(max(10, invoices // 4))}
+
+    parent = settings.HIERARCHY_PARENT_COLUMN
+    _insert('rpl_user_list', [
+        {'work_area_t': rm, parent: None, 'name': f'RM {rm}', 'mobile_number': f'017{n:08d}'}
+        for n, rm in enumerate(rms)
+    ] + [
+        {'work_area_t': mio, parent: rms[n % len(rms)], 'name': f'MIO {mio}', 'mobile_number': f'018{n:08d}'}
+        for n, mio in enumerate(mios)
+    ])
+    _insert('rdl_route_wise_depot', [
+        {'depot_code': depot, 'depot_name': f'Depot {depot}', 'route_code': route, 'route_name': f'Route {route}'}
+        for depot, route in routes
+    ])
+    _insert('rdl_users_list', [
+        {'sap_id': da, 'full_name': f'DA {da}', 'mobile_number': f'019{n:08d}'}
+        for n, da in enumerate(da for depot_das in das.values() for da in depot_das)
+    ])
+    _insert('rpl_customer', [
+        {
+            'partner': partner, 'name1': f'Pharmacy {partner}', 'name2': '', 'contact_person': f'Owner {partner}',
+            'mobile_no': f'016{n:08d}', 'street': f'{n} Road', 'street1': '', 'street2': '', 'street3': '',
+            'post_code': '1200', 'upazilla': 'Sadar', 'district': 'Dhaka', 'trans_p_zone': f'0000{route}',
+        }
+        for n, (partner, (depot, route)) in enumerate(partners.items())
+    ])
+
+    materials = []
+    for n in range(MATERIALS):
+        unit_tp = from_paisa(rng.randint(100, 50000))
+        materials.append(RplMaterial(
+            matnr=f'{n + 1:08d}', plant='1000', sales_org='1000', dis_channel='10',
+            material_name=f'Material {n + 1}', producer_company=f'{n % 7:03d}', pack_size=rng.choice(PACK_SIZES),
+            unit_tp=unit_tp, unit_vat=from_paisa(to_paisa(unit_tp) * 15 // 100), active='Y',
+        ))
+    RplMaterial.objects.bulk_create(materials, batch_size=BATCH_SIZE)
+    return rms, mios, depots, das, partners, materials
+
+
+def _line(rng, material, today):
+    """Pick quantities of a material and value them as the app does."""
+    units = units_per_pack(material.pack_size)
+    pack_qty, unit_qty = rng.randint(0, 5), rng.randint(0, units - 1)
+    if not pack_qty and not unit_qty:
+        pack_qty = 1
+    value = line_paisa(to_paisa(material.unit_tp) + to_paisa(material.unit_vat), units, pack_qty, unit_qty)
+    return {
+        'matnr': material.matnr, 'pack_qty': pack_qty, 'unit_qty': unit_qty, 'net_val': from_paisa(value),
+        'expire_date': today + timedelta(days=rng.randint(-180, 60)),
+    }
+
+
+def generate(invoices, lines, seed=41):
+    """
+    Fill the database with `invoices` invoices of `lines` lines each.
+
+    Call on an empty database (the benchmark runner flushes it first); the
+    reference tables are cleared here since `flush` leaves unmanaged tables
+    alone. Invoice ids start at 1, so invoice numbers are stable across runs.
+    Totals, the hierarchy closure, the inbox and the rollups are rebuilt from
+    the generated rows the way their management commands do.
+
+    Returns:
+        Dataset: Ids of the generated rows, to build scenario parameters from.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    with transaction.atomic():
+        clear_reference()
+        rms, mios, depots, das, partners, materials = _reference(rng, invoices)
+        partner_ids = list(partners)
+        mio_rm = {mio: rms[n % len(rms)] for n, mio in enumerate(mios)}
+
+        infos, request_lines, withdrawal_lines, replacement_lines = [], [], [], []
+        by_status = defaultdict(list)
+        for n in range(1, invoices + 1):
+            last_status = STATUSES[n % len(STATUSES)]
+            partner = rng.choice(partner_ids)
+            depot, route = partners[partner]
+            mio = rng.choice(mios)
+            requested = today - timedelta(days=rng.randint(0, 120))
+            withdrawn = requested + timedelta(days=2)
+            ordered = withdrawn + timedelta(days=2)
+            info = WithdrawalInfo(
+                id=n, invoice_no=f'50{n:08d}', invoice_type=rng.choice(['EXP', 'GEN']),
+                mio_id=mio, rm_id=mio_rm[mio], depot_id=depot, route_id=route, partner_id=partner,
+                last_status=last_status, request_date=requested,
+                request_approval=_reached(last_status, Status.REQUEST_APPROVED),
+                request_approval_date=requested + timedelta(days=1) if _reached(last_status, Status.REQUEST_APPROVED) else None,
+                da_id=rng.choice(das[depot]) if _reached(last_status, Status.WITHDRAWAL_PENDING) else None,
+                withdrawal_date=withdrawn if _reached(last_status, Status.WITHDRAWAL_APPROVAL) else None,
+                withdrawal_confirmation=_reached(last_status, Status.WITHDRAWAL_APPROVED),
+                withdrawal_approval_date=withdrawn if _reached(last_status, Status.WITHDRAWAL_APPROVED) else None,
+                replacement_order=_reached(last_status, Status.REPLACEMENT_APPROVAL),
+                order_date=ordered if _reached(last_status, Status.REPLACEMENT_APPROVAL) else None,
+                order_approval=_reached(last_status, Status.REPLACEMENT_APPROVED),
+                order_approval_date=ordered if _reached(last_status, Status.REPLACEMENT_APPROVED) else None,
+                delivery_da_id=rng.choice(das[depot]) if _reached(last_status, Status.DELIVERY_PENDING) else None,
+                order_delivery=last_status == Status.DELIVERED,
+                delivery_date=ordered + timedelta(days=3) if last_status == Status.DELIVERED else None,
+            )
+            infos.append(info)
+            by_status[last_status].append(info.invoice_no)
+            for material in rng.sample(materials, min(lines, len(materials))):
+                line = _line(rng, material, today)
+                request_lines.append(WithdrawalRequestList(invoice_id_id=n, batch=f'B{rng.randint(1000, 9999)}', **line))
+                if _reached(last_status, Status.WITHDRAWAL_APPROVAL):
+                    withdrawal_lines.append(WithdrawalList(invoice_id_id=n, batch=request_lines[-1].batch, **line))
+                if _reached(last_status, Status.REPLACEMENT_APPROVAL):
+                    replacement = {key: line[key] for key in ['matnr', 'pack_qty', 'unit_qty', 'net_val']}
+                    replacement_lines.append(ReplacementList(invoice_id=n, **replacement))
+
+        WithdrawalInfo.objects.bulk_create(infos, batch_size=BATCH_SIZE)
+        WithdrawalRequestList.objects.bulk_create(request_lines, batch_size=BATCH_SIZE)
+        WithdrawalList.objects.bulk_create(withdrawal_lines, batch_size=BATCH_SIZE)
+        ReplacementList.objects.bulk_create(replacement_lines, batch_size=BATCH_SIZE)
+        WithdrawalInfo.objects.update(**WithdrawalInfo.totals_expressions())
+
+    quiet = io.StringIO()
+    for command in ['sync_hierarchy', 'rebuild_inbox', 'rebuild_rollups']:
+        call_command(command, stdout=quiet)
+    return Dataset(
+        invoices=invoices, lines=lines, seed=seed, rms=rms, mios=mios, depots=depots, das=das,
+        partners=partner_ids, matnrs=[material.matnr for material in materials], by_status=dict(by_status),
+    )
@@ -0,0 +1,92 @@
+"""
+Microbenchmark of the logging a request pays for in its own thread: the
+former synchronous path (the request list's `print()` of its SQL, an
+f-string `logger.info` written through the rotating file handlers) against
+the queued path of `expire_product_api.log_pipeline` (the SQL at a gated
+`debug`, a %-style `info` put on the queue).
+
+Log files and stdout go to a temporary directory. Run from the project root:
+
+    python -m benchmarks.logging_bench [--requests N] [--repeat R]
+"""
+import argparse
+import copy
+import logging
+import logging.config
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# Stand-in for the request list's main query, about as long as the real one
+SQL = "SELECT wi.id, wi.invoice_no, wi.invoice_type, wi.mio_id, mio.name AS mio_name, " * 20
+
+
+def bench_config(directory, stream):
+    """`settings.LOGGING` with its files in `directory` and the console on `stream`."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'expire_product_api.local_settings')
+    from django.conf import settings
+    config = copy.deepcopy(settings.LOGGING)
+    for name, handler in config['handlers'].items():
+        if 'filename' in handler:
+            handler['filename'] = Path(directory) / f'{name}.log'
+        else:
+            handler['stream'] = stream
+    return config
+
+
+def before(logger, stdout, rows):
+    print(f"main_info_query: {SQL}", file=stdout)
+    logger.info(f"Fetched {len(rows)} withdrawal requests")
+
+
+def after(logger, stdout, rows):
+    logger.debug("main_info_query: %s", SQL)
+    logger.info("Fetched %s withdrawal requests", len(rows))
+
+
+def timed(call, logger, stdout, requests):
+    rows = list(range(200))
+    start = time.perf_counter()
+    for _ in range(requests):
+        call(logger, stdout, rows)
+    return time.perf_counter() - start
+
+
+def logged_lines(directory):
+    return sum(len(path.read_text().splitlines()) for path in Path(directory).glob('withdrawal_info.log*'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=5000, help='Simulated requests per run (default 5000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per case; the best is reported (default 5)')
+    args = parser.parse_args(argv)
+
+    from expire_product_api import log_pipeline
+    logger = logging.getLogger('withdrawal_app')
+    results = {}
+    for name, call, configure in [('before', before, logging.config.dictConfig), ('queued', after, log_pipeline.configure)]:
+        best = None
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as directory, open(os.path.join(directory, 'stdout'), 'w') as stdout:
+                configure(bench_config(directory, stdout))
+                seconds = timed(call, logger, stdout, args.requests)
+                drain = time.perf_counter()
+                log_pipeline.stop()
+                drain = time.perf_counter() - drain
+                # Every record must reach its file before the timing means anything
+                assert logged_lines(directory) == args.requests
+                logging.config.dictConfig({'version': 1, 'disable_existing_loggers': False})
+                best = min(best or (seconds, drain), (seconds, drain))
+        results[name] = best
+
+    print(f"{args.requests} requests, best of {args.repeat}")
+    print(f"{'path':<10}{'per request (us)':>18}{'left to the listener (ms)':>28}")
+    for name, (seconds, drain) in results.items():
+        print(f"{name:<10}{seconds / args.requests * 1e6:>18.2f}{drain * 1000:>28.1f}")
+    print(f"speed-up in the request thread: {results['before'][0] / results['queued'][0]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Microbenchmark of money arithmetic: the former `float` and `Decimal` code
+paths against the integer paisa helpers of `withdrawal_app.money`.
+
+Run from the project root, no database or settings needed:
+
+    python -m benchmarks.money_bench [--lines N] [--repeat R]
+"""
+import argparse
+import random
+import timeit
+from decimal import Decimal, ROUND_HALF_UP
+from withdrawal_app.money import to_paisa, from_paisa, unit_paisa, line_paisa
+
+CENT = Decimal('0.01')
+
+
+def make_lines(count, seed=40):
+    """Build `count` priced lines: (unit_tp, unit_vat, units_per_pack, pack_qty, unit_qty) in taka."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        unit_tp = Decimal(rng.randint(100, 500000)).scaleb(-2)
+        unit_vat = (unit_tp * Decimal('0.15')).quantize(CENT, rounding=ROUND_HALF_UP)
+        units = rng.choice([1, 10, 14, 30, 100])
+        lines.append((unit_tp, unit_vat, units, rng.randint(0, 20), rng.randint(0, units - 1)))
+    return lines
+
+
+# Former code paths
+
+def float_unit_price(lines):
+    return [(float(tp) + float(vat)) / units for tp, vat, units, _, _ in lines]
+
+
+def decimal_line_values(lines):
+    values = []
+    for tp, vat, units, pack_qty, unit_qty in lines:
+        value = (pack_qty * units + unit_qty) * (tp + vat) / units
+        values.append(value.quantize(CENT, rounding=ROUND_HALF_UP))
+    return values
+
+
+def decimal_total(values):
+    total = Decimal('0')
+    for value in values:
+        total += value
+    return total
+
+
+# Integer paisa
+
+def paisa_unit_price(packs):
+    return [unit_paisa(pack, units) for pack, units, _, _ in packs]
+
+
+def paisa_line_values(packs):
+    return [line_paisa(pack, units, pack_qty, unit_qty) for pack, units, pack_qty, unit_qty in packs]
+
+
+def paisa_total(values):
+    return sum(values)
+
+
+def to_packs(lines):
+    """Convert lines to paisa once, as `material_app.prices` does when it loads the price table."""
+    return [(to_paisa(tp) + to_paisa(vat), units, pack_qty, unit_qty) for tp, vat, units, pack_qty, unit_qty in lines]
+
+
+def best(statement, repeat, number):
+    return min(timeit.repeat(statement, repeat=repeat, number=number)) / number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--lines', type=int, default=10000, help='Lines per run (default 10000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per case; the best is reported (default 5)')
+    parser.add_argument('--number', type=int, default=20, help='Calls per run (default 20)')
+    args = parser.parse_args(argv)
+
+    lines = make_lines(args.lines)
+    packs = to_packs(lines)
+    decimal_values = decimal_line_values(lines)
+    paisa_values = paisa_line_values(packs)
+    # Both paths must agree to the paisa before their speed means anything
+    assert [to_paisa(value) for value in decimal_values] == paisa_values
+    assert decimal_total(decimal_values) == from_paisa(paisa_total(paisa_values))
+
+    cases = [
+        ('unit price', lambda: float_unit_price(lines), lambda: paisa_unit_price(packs)),
+        ('line values', lambda: decimal_line_values(lines), lambda: paisa_line_values(packs)),
+        ('total', lambda: decimal_total(decimal_values), lambda: paisa_total(paisa_values)),
+    ]
+    print(f"{args.lines} lines, best of {args.repeat} x {args.number}")
+    print(f"{'case':<14}{'before (ms)':>14}{'paisa (ms)':>14}{'speed-up':>10}")
+    for name, before, after in cases:
+        before_s = best(before, args.repeat, args.number)
+        after_s = best(after, args.repeat, args.number)
+        print(f"{name:<14}{before_s * 1000:>14.3f}{after_s * 1000:>14.3f}{before_s / after_s:>9.1f}x")
+    print(f"{'to_paisa':<14}{best(lambda: to_packs(lines), args.repeat, args.number) * 1000:>14.3f}{'':>14}  (one-off, at load)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+"""
+Replay captured traffic (`logs/traffic.jsonl`, written by
+`monitoring_app.capture`) against a local server, reporting throughput and
+latency percentiles per route.
+
+    python -m benchmarks.replay logs/traffic.jsonl --invoices 2000 --concurrency 8
+
+A test database is seeded by `benchmarks.generator`, and each anonymized
+identifier of the capture is mapped onto a generated entity of its kind:
+the same token always to the same entity, so the capture's mix of scopes
+and its hot MIOs and depots carry over. The project is then served by a
+threaded WSGI server on a free local port, and the captured requests are
+sent over HTTP in capture order by `--concurrency` client threads.
+
+Only reads are replayed unless `--writes` is given; replayed writes change
+the seeded data, so later requests may see other rows than the originals.
+On SQLite the test database is a temporary file, and since SQLite locks
+the whole database to write, each write waits for the requests in flight
+and runs alone.
+"""
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+from urllib.parse import urlencode
+from .run import percentile, test_database
+
+READ_METHODS = {'GET', 'HEAD'}
+_TOKEN = re.compile(r'^[0-9a-f]{12}$')
+# Worklist role to the kind of entity its `owner_id` is
+ROLE_KINDS = {'mio': 'mio', 'rm': 'rm', 'depot': 'depot', 'da': 'da', 'delivery_da': 'da'}
+
+
+def load_capture(paths, writes=False, limit=None):
+    """Read captured requests from JSONL files, keeping reads only unless `writes`."""
+    records = []
+    for path in paths:
+        with open(path) as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if writes or record['method'] in READ_METHODS:
+                    records.append(record)
+    return records[:limit] if limit else records
+
+
+class EntityMap:
+    """Maps anonymized identifier tokens onto the entities of a generated `Dataset`."""
+    def __init__(self, dataset):
+        self.pools = {
+            'mio': dataset.mios,
+            'rm': dataset.rms,
+            'depot': list(dataset.depots),
+            'route': [route for routes in dataset.depots.values() for route in routes],
+            'da': [da for das in dataset.das.values() for da in das],
+            'partner': dataset.partners,
+            'material': dataset.matnrs,
+            'invoice': [invoice for invoices in dataset.by_status.values() for invoice in invoices],
+        }
+        self.assigned = defaultdict(dict)
+
+    def entity(self, kind, token):
+        """The entity standing in for `token`, assigned in first-seen order."""
+        assigned = self.assigned[kind]
+        if token not in assigned:
+            pool = self.pools[kind]
+            assigned[token] = pool[len(assigned) % len(pool)]
+        return assigned[token]
+
+    def overflow(self):
+        """Kinds with more distinct tokens than generated entities: (kind, tokens, entities)."""
+        return [(kind, len(tokens), len(self.pools[kind])) for kind, tokens in self.assigned.items() if len(tokens) > len(self.pools[kind])]
+
+
+def materialize(value, entities, owner_kind='mio', in_body=False, today=None):
+    """Turn an anonymized capture value back into a concrete one; None drops it from a query string."""
+    today = today or date.today()
+    if isinstance(value, dict):
+        return {key: materialize(item, entities, owner_kind, in_body, today) for key, item in value.items()}
+    if isinstance(value, list):
+        return [materialize(item, entities, owner_kind, in_body, today) for item in value]
+    if not isinstance(value, str):
+        return value
+    prefix, _, rest = value.partition(':')
+    if prefix == 'owner':
+        return entities.entity(owner_kind, value)
+    if prefix in entities.pools and rest:
+        return entities.entity(prefix, value)
+    if _TOKEN.match(rest):
+        # Identifiers with no generated entity (phones, batches, ...) replay as their token
+        return rest
+    if prefix == 'date':
+        return (today + timedelta(days=int(rest))).isoformat()
+    if prefix == 'month':
+        months = today.year * 12 + today.month - 1 + int(rest)
+        return f'{months // 12:04d}-{months % 12 + 1:02d}'
+    if value.startswith('<str:'):
+        return 'x' * int(value[5:-1]) if in_body else None
+    return value
+
+
+def build_request(record, entities):
+    """
+    Build one replayable request from a captured record.
+
+    Returns:
+        tuple: (method, path with query string, JSON body bytes or None).
+    """
+    from django.urls import reverse
+
+    owner_kind = ROLE_KINDS.get(record['kwargs'].get('role'), 'mio')
+    kwargs = materialize(record['kwargs'], entities, owner_kind)
+    query = {key: value for key, value in materialize(record['query'], entities, owner_kind).items() if value is not None}
+    path = reverse(record['view'], kwargs=kwargs)
+    if query:
+        path += '?' + urlencode(query, doseq=True)
+    body = None
+    if record.get('body') is not None:
+        body = json.dumps(materialize(record['body'], entities, owner_kind, in_body=True)).encode()
+    return record['method'], path, body
+
+
+@contextmanager
+def local_server():
+    """Serve the project from a threaded WSGI server on a free port; yields its base URL."""
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+    from django.core.wsgi import get_wsgi_application
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler, allow_reuse_address=False)
+    server.set_app(get_wsgi_application())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class WriteGate:
+    """Lets reads run together and each write run alone (a readers-writer lock)."""
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._reads = 0
+        self._writing = False
+
+    @contextmanager
+    def enter(self, method):
+        exclusive = method not in READ_METHODS
+        with self._condition:
+            self._condition.wait_for(lambda: not self._writing and not (exclusive and self._reads))
+            if exclusive:
+                self._writing = True
+            else:
+                self._reads += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                if exclusive:
+                    self._writing = False
+                else:
+                    self._reads -= 1
+                self._condition.notify_all()
+
+
+def send(base, request):
+    """Send one request and read the whole response; returns (status code, seconds)."""
+    method, path, body = request
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(base + path, data=body, method=method, headers=headers), timeout=120) as response:
+            response.read()
+            status_code = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status_code = e.code
+    return status_code, time.perf_counter() - start
+
+
+def replay(base, requests, concurrency, gate=None):
+    """
+    Send (view, request) pairs in order from `concurrency` threads, through
+    `gate` when given.
+
+    Returns:
+        tuple: (list of (view, status code, seconds), wall time in seconds).
+    """
+    def run(item):
+        view, request = item
+        if gate is None:
+            return view, *send(base, request)
+        with gate.enter(request[0]):
+            return view, *send(base, request)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(run, requests))
+    return outcomes, time.perf_counter() - start
+
+
+def summarize(outcomes, elapsed):
+    """Per-route count, share, status classes and latency percentiles, busiest route first."""
+    by_view = defaultdict(list)
+    for view, status_code, seconds in outcomes:
+        by_view[view].append((status_code, seconds))
+    rows = []
+    for view, results in sorted(by_view.items(), key=lambda item: -len(item[1])):
+        timings = [seconds for _, seconds in results]
+        rows.append({
+            'route': view,
+            'requests': len(results),
+            'share': len(results) / len(outcomes),
+            'rps': len(results) / elapsed,
+            'client_errors': sum(1 for status_code, _ in results if 400 <= status_code < 500),
+            'server_errors': sum(1 for status_code, _ in results if status_code >= 500),
+            'p50_ms': percentile(timings, 0.50) * 1000,
+            'p95_ms': percentile(timings, 0.95) * 1000,
+            'p99_ms': percentile(timings, 0.99) * 1000,
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay captured traffic against a local seeded server.")
+    parser.add_argument('capture', nargs='+', help='Capture files (logs/traffic.jsonl and its rotations)')
+    parser.add_argument('--invoices', type=int, default=2000, help='Invoices to generate (default 2000)')
+    parser.add_argument('--lines', type=int, default=5, help='Lines per invoice (default 5)')
+    parser.add_argument('--seed', type=int, default=50, help='Generator seed (default 50)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Client threads (default 8)')
+    parser.add_argument('--limit', type=int, help='Replay only the first N captured requests')
+    parser.add_argument('--writes', action='store_true', help='Also replay POST, PUT, PATCH and DELETE requests')
+    parser.add_argument('--json', dest='json_path', help='Also write the per-route results to this file')
+    args = parser.parse_args(argv)
+    if args.invoices < 9:
+        parser.error("--invoices needs at least 9 invoices, one per status")
+
+    records = load_capture(args.capture, args.writes, args.limit)
+    if not records:
+        parser.error("no replayable requests in the capture")
+
+    with test_database(sqlite_file=True):
+        from django.db import connection
+        from django.urls import NoReverseMatch
+        from .generator import generate
+
+        dataset = generate(args.invoices, args.lines, seed=args.seed)
+        entities = EntityMap(dataset)
+        requests, skipped = [], 0
+        for record in records:
+            try:
+                requests.append((record['view'], build_request(record, entities)))
+            except NoReverseMatch:
+                skipped += 1
+        for kind, tokens, pool in entities.overflow():
+            print(f"note: {tokens} distinct {kind} ids captured but {pool} generated; raise --invoices to keep them apart")
+        with local_server() as base:
+            gate = WriteGate() if args.writes and connection.vendor == 'sqlite' else None
+            outcomes, elapsed = replay(base, requests, args.concurrency, gate)
+
+    rows = summarize(outcomes, elapsed)
+    print(f"\n{len(outcomes)} requests in {elapsed:.1f}s at concurrency {args.concurrency}: {len(outcomes) / elapsed:.1f} req/s"
+          + (f" ({skipped} skipped, route no longer exists)" if skipped else ""))
+    print(f"{'route':<34}{'requests':>9}{'share':>8}{'req/s':>8}{'4xx':>6}{'5xx':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for row in rows:
+        print(
+            f"{row['route']:<34}{row['requests']:>9}{row['share']:>8.1%}{row['rps']:>8.1f}{row['client_errors']:>6}"
+            f"{row['server_errors']:>6}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+        )
+    if args.json_path:
+        with open(args.json_path, 'w') as handle:
+            json.dump({'requests': len(outcomes), 'seconds': elapsed, 'concurrency': args.concurrency, 'routes': rows}, handle, indent=2)
+    return 1 if any(row['server_errors'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Endpoint benchmarks: time every scenario of `benchmarks.scenarios` at
+several data sizes.
+
+For each size the test database is flushed and refilled by
+`benchmarks.generator`, then each scenario is sent through the Django test
+client: once to warm up, once instrumented (query count, SQL time, rows
+fetched, response bytes), `--repeat` times for latency, and once under
+tracemalloc for peak memory, so the instrumentation does not skew the
+timings.
+
+    python -m benchmarks.run --sizes 1000,10000 --lines 5 --repeat 20
+
+Runs against the test database (`test_<NAME>`), never the configured one.
+Uses `expire_product_api.local_settings` (SQLite, with stand-in reference
+tables) unless DJANGO_SETTINGS_MODULE says otherwise.
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class RowCounter:
+    """
+    Execute wrapper counting queries, SQL time and fetched rows.
+
+    Install with `connection.execute_wrapper(counter)`. Rows are counted by
+    swapping each cursor's DB-API cursor for a counting proxy on its first
+    execute, so ORM and raw queries are both covered.
+    """
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        cursor = context['cursor']
+        if not isinstance(cursor.cursor, _CountingCursor):
+            cursor.cursor = _CountingCursor(cursor.cursor, self)
+        self.queries += 1
+        self.statements.append(sql)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - start
+
+
+class _CountingCursor:
+    def __init__(self, cursor, counter):
+        self._cursor = cursor
+        self._counter = counter
+
+    def __getattr__(self, attr):
+        return getattr(self._cursor, attr)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._counter.rows += 1
+            yield row
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._counter.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._counter.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._counter.rows += len(rows)
+        return rows
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def call(client, scenario, request):
+    """
+    Send one scenario request in a rolled-back transaction.
+
+    Returns:
+        tuple: (status code, response body size in bytes).
+    """
+    from django.db import transaction
+    from django.urls import reverse
+
+    url = reverse(scenario.url_name, kwargs=request.get('kwargs'))
+    options = {}
+    if 'body' in request:
+        options = {'data': json.dumps(request['body']), 'content_type': 'application/json'}
+    elif 'query' in request:
+        options = {'data': request['query']}
+    with transaction.atomic():
+        response = getattr(client, scenario.method)(url, **options)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        transaction.set_rollback(True)
+    return response.status_code, len(body)
+
+
+def instrumented(client, scenario, request):
+    """
+    Send one scenario request with a `RowCounter` installed.
+
+    Returns:
+        tuple: (status code, response bytes, RowCounter).
+    """
+    from django.db import connection
+
+    counter = RowCounter()
+    with connection.execute_wrapper(counter):
+        status_code, size = call(client, scenario, request)
+    return status_code, size, counter
+
+
+def measure(client, scenario, dataset, repeat):
+    """Benchmark one scenario on the current data; returns a result dict."""
+    request = scenario.build(dataset)
+    call(client, scenario, request)
+    status_code, size, counter = instrumented(client, scenario, request)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call(client, scenario, request)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        call(client, scenario, request)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'scenario': scenario.name,
+        'status': status_code,
+        'p50_ms': percentile(timings, 0.50) * 1000,
+        'p95_ms': percentile(timings, 0.95) * 1000,
+        'queries': counter.queries,
+        'sql_ms': counter.sql_seconds * 1000,
+        'rows': counter.rows,
+        'bytes': size,
+        'peak_kib': peak / 1024,
+        'statements': counter.statements,
+    }
+
+
+def run(sizes, lines, repeat, only=None, seed=41):
+    """
+    Generate each data size in turn and benchmark the selected scenarios on it.
+
+    Returns:
+        list: One result dict per size and scenario.
+    """
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.test import Client
+    from .generator import generate
+    from .scenarios import SCENARIOS
+
+    scenarios = [scenario for scenario in SCENARIOS if not only or any(name in scenario.name for name in only)]
+    client = Client()
+    results = []
+    for size in sizes:
+        call_command('flush', interactive=False, verbosity=0)
+        cache.clear()
+        started = time.perf_counter()
+        dataset = generate(size, lines, seed=seed)
+        print(f"\n{size} invoices x {lines} lines (generated in {time.perf_counter() - started:.1f}s)")
+        print(f"{'scenario':<34}{'status':>7}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'sql ms':>9}{'rows':>9}{'bytes':>10}{'peak KiB':>10}")
+        for scenario in scenarios:
+            result = {'size': size, 'lines': lines, **measure(client, scenario, dataset, repeat)}
+            results.append(result)
+            print(
+                f"{result['scenario']:<34}{result['status']:>7}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                f"{result['queries']:>9}{result['sql_ms']:>9.2f}{result['rows']:>9}{result['bytes']:>10}{result['peak_kib']:>10.0f}"
+            )
+    return results
+
+
+@contextmanager
+def test_database(keepdb=False, sqlite_file=False):
+    """
+    Set Django up and run the block on a fresh test database.
+
+    With `sqlite_file`, a SQLite test database lives in a temporary file
+    instead of the shared-cache in-memory database, whose connections
+    serialize on one lock; for serving requests from several threads.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'expire_product_api.local_settings')
+    import django
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    directory = None
+    if sqlite_file and connection.vendor == 'sqlite':
+        directory = tempfile.mkdtemp()
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'test.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the API endpoints on synthetic data.")
+    parser.add_argument('--sizes', default='1000,10000', help='Comma separated invoice counts (default 1000,10000)')
+    parser.add_argument('--lines', type=int, default=5, help='Lines per invoice (default 5)')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed requests per scenario (default 20)')
+    parser.add_argument('--only', help='Comma separated scenario name fragments to run')
+    parser.add_argument('--seed', type=int, default=41, help='Generator seed (default 41)')
+    parser.add_argument('--json', dest='json_path', help='Also write the results to this file')
+    parser.add_argument('--keepdb', action='store_true', help='Reuse the test database and keep it afterwards')
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',')]
+    if min(sizes) < 9:
+        parser.error("each size needs at least 9 invoices, one per status")
+
+    with test_database(args.keepdb):
+        results = run(sizes, args.lines, args.repeat, args.only.split(',') if args.only else None, args.seed)
+    if args.json_path:
+        with open(args.json_path, 'w') as handle:
+            json.dump(results, handle, indent=2)
+    failed = [result['scenario'] for result in results if result['status'] >= 500]
+    if failed:
+        print(f"\nServer errors in: {', '.join(sorted(set(failed)))}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+The requests the endpoint benchmarks run, covering every route of
+`withdrawal_app`, `replacement_app` and `material_app`.
+
+Each scenario builds its URL kwargs, query string and JSON body from the
+generated `Dataset`, so it hits rows that exist at every data size. Writes
+run inside a transaction that is rolled back, so every scenario sees the
+same data on every repetition.
+"""
+from collections import namedtuple
+from datetime import date, timedelta
+from withdrawal_app.models import WithdrawalInfo
+
+Status = WithdrawalInfo.Status
+
+# `build(dataset)` returns a dict with any of `kwargs`, `query` and `body`
+Scenario = namedtuple('Scenario', ['name', 'method', 'url_name', 'build'])
+
+
+def _invoice(ds, last_status):
+    return ds.by_status[last_status][0]
+
+
+def _depot(ds):
+    return next(iter(ds.depots))
+
+
+def _window():
+    today = date.today()
+    return {'from_date': (today - timedelta(days=180)).isoformat(), 'to_date': today.isoformat()}
+
+
+def _request_lines(ds):
+    return [
+        {
+            'matnr': matnr, 'batch': 'B1000', 'pack_qty': 1, 'strip_qty': 0, 'unit_qty': 0,
+            'net_val': '10.00', 'expire_date': date.today().isoformat(),
+        }
+        for matnr in ds.matnrs[:ds.lines]
+    ]
+
+
+def _withdrawal_body(ds):
+    return {
+        'mio_id': ds.mios[0], 'rm_id': ds.rms[0], 'partner_id': ds.partners[0],
+        'invoice_type': 'Expired', 'request_list': _request_lines(ds),
+    }
+
+
+SCENARIOS = [
+    # withdrawal_app
+    Scenario('withdrawal_list[mio]', 'get', 'withdrawal_list', lambda ds: {'query': {'mio_id': ds.mios[0], 'status': 'all'}}),
+    Scenario('withdrawal_request_list[mio]', 'get', 'withdrawal_request_list', lambda ds: {'query': {'mio_id': ds.mios[0], 'status': 'all'}}),
+    Scenario('withdrawal_request_list[rm]', 'get', 'withdrawal_request_list', lambda ds: {'query': {'rm_id': ds.rms[0], 'status': 'all'}}),
+    Scenario('withdrawal_request_list[depot]', 'get', 'withdrawal_request_list', lambda ds: {'query': {'depot_id': _depot(ds), 'status': 'all'}}),
+    Scenario('withdrawal_request', 'post', 'withdrawal_request', lambda ds: {'body': _withdrawal_body(ds)}),
+    Scenario('withdrawal_request_edit', 'put', 'withdrawal_request_edit', lambda ds: {
+        'body': {'invoice_no': _invoice(ds, Status.REQUEST_PENDING), 'invoice_type': 'EXP', 'request_list': _request_lines(ds)},
+    }),
+    Scenario('request_approve', 'put', 'request_approve', lambda ds: {'kwargs': {'invoice_no': _invoice(ds, Status.REQUEST_PENDING)}}),
+    Scenario('da_assign', 'put', 'da_assign', lambda ds: {
+        'body': {'invoice_no': _invoice(ds, Status.REQUEST_APPROVED), 'da_id': ds.das[_depot(ds)][0]},
+    }),
+    Scenario('da_auto_assign', 'post', 'da_auto_assign', lambda ds: {
+        'body': {'depot_id': _depot(ds), 'stage': 'withdrawal', 'da_ids': ds.das[_depot(ds)], 'dry_run': True},
+    }),
+    Scenario('withdrawal_save', 'post', 'withdrawal_save', lambda ds: {
+        'kwargs': {'invoice_no': _invoice(ds, Status.WITHDRAWAL_PENDING)},
+        'body': [{key: line[key] for key in ['matnr', 'batch', 'pack_qty', 'net_val', 'expire_date']} for line in _request_lines(ds)],
+    }),
+    Scenario('withdrawal_confirmation', 'put', 'withdrawal_confirmation', lambda ds: {
+        'body': {'invoice_no': _invoice(ds, Status.WITHDRAWAL_APPROVAL)},
+    }),
+    Scenario('withdrawal_approval[mio]', 'get', 'withdrawal_approval', lambda ds: {'query': {'mio_id': ds.mios[0], 'status': 'withdrawal_approved'}}),
+    Scenario('withdrawal_export', 'get', 'withdrawal_export', lambda ds: {'query': {'depot_id': _depot(ds), **_window()}}),
+    # replacement_app
+    Scenario('available_list[mio]', 'get', 'available_list', lambda ds: {'query': {'mio_id': ds.mios[0]}}),
+    Scenario('available_list[depot]', 'get', 'available_list', lambda ds: {'query': {'depot_id': _depot(ds)}}),
+    Scenario('replacement_create', 'post', 'replacement_create', lambda ds: {
+        'body': {
+            'invoice_no': _invoice(ds, Status.WITHDRAWAL_APPROVED),
+            'materials': [{'matnr': matnr, 'pack_qty': 0, 'unit_qty': 1} for matnr in ds.matnrs[:ds.lines]],
+        },
+    }),
+    Scenario('replacement_approve', 'put', 'replacement approve', lambda ds: {
+        'body': {'invoice_no': _invoice(ds, Status.REPLACEMENT_APPROVAL)},
+    }),
+    Scenario('replacement_approval_list[rm]', 'get', 'replacement_approval_list', lambda ds: {'query': {'rm_id': ds.rms[0]}}),
+    Scenario('replacement_request_list[mio]', 'get', 'replacement_request_list', lambda ds: {'query': {'mio_id': ds.mios[0]}}),
+    Scenario('assign_delivery_da', 'put', 'assign_delivery_da', lambda ds: {
+        'body': {'invoice_no': _invoice(ds, Status.REPLACEMENT_APPROVED), 'delivery_da_id': ds.das[_depot(ds)][0]},
+    }),
+    Scenario('delivery_pending_list[depot]', 'get', 'delivery_pending_list', lambda ds: {'query': {'depot_id': _depot(ds)}}),
+    Scenario('delivered_list[depot]', 'get', 'delivered_list', lambda ds: {'query': {'depot_id': _depot(ds)}}),
+    Scenario('replacement_delivery', 'put', 'replacement_delivery', lambda ds: {
+        'kwargs': {'invoice_no': _invoice(ds, Status.DELIVERY_PENDING)},
+    }),
+    Scenario('replacement_picklist[depot]', 'get', 'replacement_picklist', lambda ds: {'query': {'depot_id': _depot(ds)}}),
+    Scenario('replacement_suggest', 'get', 'replacement_suggest', lambda ds: {'query': {'invoice_no': _invoice(ds, Status.WITHDRAWAL_APPROVED)}}),
+    Scenario('replacement_export', 'get', 'replacement_export', lambda ds: {'query': {'depot_id': _depot(ds), **_window()}}),
+    # material_app
+    Scenario('material_list', 'get', 'material_list', lambda ds: {}),
+]
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from outbox_app.visibility import advance, encode_position, prune, unread
+from withdrawal_app.models import WithdrawalTransition
+
+SCOPE_FIELDS = ['mio_id', 'rm_id', 'depot_id', 'da_id', 'delivery_da_id']
+EVENT_FIELDS = ['id', 'invoice_id', 'invoice_no', 'from_status', 'to_status', 'actor', *SCOPE_FIELDS, 'created_at']
+# Transitions read per poll, in any scope; a larger backlog drains without waiting between polls
+BATCH_SIZE = 200
+
+
+def fetch_transitions(scope, position):
+    """
+    Read the next `BATCH_SIZE` transitions not read yet from `position`.
+
+    The whole log is read in id order, with the gaps of `outbox_app.visibility`,
+    and the scope is applied here: a gap is only noticed by a reader that
+    sees the ids around it, whichever scope they belong to.
+
+    Returns:
+        tuple: (list of (resume token, transition) in `scope`, position
+        after the batch, number of transitions read).
+    """
+    position = prune(position)
+    rows = list(WithdrawalTransition.objects.filter(unread(position)).order_by('id').values(*EVENT_FIELDS)[:BATCH_SIZE])
+    events = []
+    for row in rows:
+        position = advance(position, [row['id']])
+        if all(row[field] == value for field, value in scope.items()):
+            events.append((encode_position(position), row))
+    return events, position, len(rows)
+
+
+def format_event(token, transition):
+    """Format one transition as an SSE `transition` event carrying the resume token as its id."""
+    data = json.dumps(transition, cls=DjangoJSONEncoder)
+    return f"id: {token}\nevent: transition\ndata: {data}\n\n"
+
+
+async def event_stream(scope, position, once=False):
+    """
+    Yield SSE messages for the transitions in `scope` not read yet from `position`.
+
+    Polls the transition log every `SSE_POLL_INTERVAL` seconds, sending a
+    comment line as keep-alive when idle, and ends after `SSE_MAX_SECONDS`
+    so connections are recycled; the client reconnects with
+    `Last-Event-ID` and misses nothing that commits within
+    `OUTBOX_GAP_SECONDS` of a later transition. With `once`, sends what is
+    pending and ends.
+    """
+    fetch = sync_to_async(fetch_transitions)
+    yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+    deadline = time.monotonic() + settings.SSE_MAX_SECONDS
+    idle_since = time.monotonic()
+    while True:
+        events, position, read = await fetch(scope, position)
+        token = None
+        for token, transition in events:
+            yield format_event(token, transition)
+        if read and token != encode_position(position):
+            # An id without data moves the client's resume token past other scopes' transitions
+            yield f"id: {encode_position(position)}\n\n"
+        if events:
+            idle_since = time.monotonic()
+        elif time.monotonic() - idle_since >= settings.SSE_KEEPALIVE_SECONDS:
+            idle_since = time.monotonic()
+            yield ": keep-alive\n\n"
+        if time.monotonic() >= deadline:
+            return
+        if read == BATCH_SIZE:
+            continue
+        if once:
+            return
+        await asyncio.sleep(settings.SSE_POLL_INTERVAL)
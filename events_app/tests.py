@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase, TestCase
+from outbox_app.visibility import Gap, Position, decode_position, encode_position
+from withdrawal_app.models import WithdrawalInfo, WithdrawalTransition
+from .stream import fetch_transitions
+
+
+class PositionTokenTests(SimpleTestCase):
+    def test_round_trip(self):
+        position = Position(42, (Gap(3, 3, 1760000000), Gap(7, 9, 1760000005)))
+        self.assertEqual(encode_position(position), '42.3-3@1760000000.7-9@1760000005')
+        self.assertEqual(decode_position(encode_position(position)), position)
+
+    def test_plain_id(self):
+        self.assertEqual(decode_position('17'), Position(17, ()))
+
+    def test_malformed(self):
+        for token in ['', 'abc', '4.5', '4.5-6', '4.x-6@1']:
+            with self.assertRaises(ValueError):
+                decode_position(token)
+
+
+class FetchTransitionsTests(TestCase):
+    def log(self, id_, mio_id):
+        WithdrawalTransition.objects.create(
+            id=id_, invoice_id=id_, to_status=WithdrawalInfo.Status.REQUEST_PENDING, mio_id=mio_id, rm_id='R1',
+        )
+
+    def test_late_commit_in_scope_is_sent(self):
+        self.log(1, 'M1')
+        self.log(3, 'M2')
+        events, position, read = fetch_transitions({'mio_id': 'M1'}, Position(0, ()))
+        self.assertEqual([transition['id'] for _, transition in events], [1])
+        self.assertEqual(read, 2)
+        self.assertEqual((position.last_id, [gap[:2] for gap in position.gaps]), (3, [(2, 2)]))
+
+        # Id 2 commits after id 3 was read
+        self.log(2, 'M1')
+        events, position, read = fetch_transitions({'mio_id': 'M1'}, position)
+        self.assertEqual([transition['id'] for _, transition in events], [2])
+        self.assertEqual(events[0][0], '3')
+        self.assertEqual(position, Position(3, ()))
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views as events_views
+
+urlpatterns = [
+    path('', events_views.worklist_events, name='worklist_events'),
+]
@@ -0,0 +1,48 @@
+import logging
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from outbox_app.visibility import current_position, decode_position
+from .stream import SCOPE_FIELDS, event_stream
+
+# Set logger
+logger = logging.getLogger("events_app")
+
+
+# Create your views here.
+@require_GET
+async def worklist_events(request):
+    """
+    Stream the status changes of the caller's scope as Server-Sent Events.
+
+    Filter with any of `mio_id`, `rm_id`, `depot_id`, `da_id` and
+    `delivery_da_id`. Each event carries a resume token (the log position
+    after it, see `outbox_app.visibility`); a client resumes with the
+    `Last-Event-ID` header (sent automatically by EventSource) or
+    `?last_event_id=`. Without either, the stream starts from now.
+
+    Served as a long-lived stream under ASGI (`expire_product_api.asgi`).
+    Under WSGI the pending events are sent once and the response ends; the
+    client's automatic reconnect then turns it into long polling.
+    """
+    scope = {field: request.GET[field] for field in SCOPE_FIELDS if request.GET.get(field)}
+    if not scope:
+        return JsonResponse({"success":False,"message": "Please provide at least one ID (mio_id, rm_id, depot_id, da_id or delivery_da_id)."}, status=400)
+    token = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        position = decode_position(token) if token else await sync_to_async(current_position)()
+    except ValueError:
+        return JsonResponse({"success":False,"message": "Invalid resume token."}, status=400)
+
+    logger.info("Event stream opened for %s from %s", scope, position.last_id)
+    if isinstance(request, ASGIRequest):
+        stream = event_stream(scope, position)
+    else:
+        # WSGI can only serve a synchronous iterator: collect what is pending
+        stream = [message async for message in event_stream(scope, position, once=True)]
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -3,6 +3,13 @@ ASGI config for expire_product_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project through this module (e.g. ``uvicorn expire_product_api.asgi:application``)
+for the Server-Sent Events stream at /api/v1/events to stay open; under WSGI
+it degrades to long polling. The other streaming responses, the
+withdrawal and replacement exports, hand ASGI an async iterator
+(`withdrawal_app.utils.async_stream`) so they stay chunked here as well
+instead of being buffered whole.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -0,0 +1,30 @@
+"""
+Settings for local benchmarks and regression tests on SQLite.
+
+    DJANGO_SETTINGS_MODULE=expire_product_api.local_settings python manage.py migrate
+
+Needs no `.env` or MySQL server. Installs `reference_app`, whose migrations
+create stand-ins for the reference tables, and `withdrawal_app.dialect`
+fills in the MySQL functions the raw SQL uses.
+"""
+import os
+
+# Required by settings.py; nothing here connects anywhere
+for name, value in {
+    'SECRET_KEY': 'local-only-insecure-key',
+    'ALLOWED_HOSTS': 'localhost,127.0.0.1,testserver',
+    'DEFAULT_DB_NAME': '', 'DEFAULT_DB_USER': '', 'DEFAULT_DB_PASSWORD': '',
+    'DEFAULT_DB_HOST': '', 'DEFAULT_DB_PORT': '',
+}.items():
+    os.environ.setdefault(name, value)
+
+from .settings import *  # noqa: E402,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': env.str('LOCAL_DB_PATH', default=str(BASE_DIR / 'local.sqlite3')),  # noqa: F405
+    }
+}
+
+INSTALLED_APPS = [*INSTALLED_APPS, 'reference_app']  # noqa: F405
@@ -0,0 +1,116 @@
+"""
+Non-blocking logging: request threads only put records on a queue, and one
+background thread formats them (Dhaka time and all) and writes the rotating
+log files.
+
+Used as `LOGGING_CONFIG`: `settings.LOGGING` is applied as usual, then the
+handlers of each configured logger are moved behind a `QueueHandler` and
+handed to a single `QueueListener`, which routes every record back to the
+handlers of the logger it was queued by.
+"""
+import atexit
+import copy
+import logging
+import logging.config
+import os
+import queue
+from datetime import date, datetime
+from decimal import Decimal
+from logging.handlers import QueueHandler, QueueListener
+
+_listener = None
+# Argument types that cannot change while a record waits in the queue, so
+# interpolating them on the listener gives the message they were logged with
+_IMMUTABLE_ARGS = (str, int, float, bool, type(None), Decimal, date, datetime)
+
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+class RoutedQueueHandler(QueueHandler):
+    """Queue handler tagging each record with the logger whose handlers should write it."""
+    def __init__(self, log_queue, route):
+        super().__init__(log_queue)
+        self.route = route
+
+    def prepare(self, record):
+        """
+        Copy the record for the queue without formatting it.
+
+        `QueueHandler.prepare` interpolates the message in the calling
+        thread; here that is left to the listener unless an argument is
+        mutable (and could change before the listener gets to it). An
+        exception is rendered to text now, as its traceback keeps the
+        request's frames alive.
+        """
+        record = copy.copy(record)
+        args = record.args
+        if not isinstance(record.msg, str) or (args and not (
+            isinstance(args, tuple) and all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args)
+        )):
+            record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        record.log_route = self.route
+        return record
+
+
+class RoutingQueueListener(QueueListener):
+    """Queue listener passing each record only to the handlers of its route."""
+    def __init__(self, log_queue, routes):
+        super().__init__(log_queue, *[handler for handlers in routes.values() for handler in handlers], respect_handler_level=True)
+        self.routes = routes
+
+    def handle(self, record):
+        record = self.prepare(record)
+        for handler in self.routes[record.log_route]:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def configure(config):
+    """
+    `LOGGING_CONFIG` callable: apply `config` with `dictConfig`, then queue
+    every configured logger's handlers behind one background listener.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    logging.config.dictConfig(config)
+
+    log_queue = queue.SimpleQueue()
+    routes = {}
+    for name in config.get('loggers', {}):
+        logger = logging.getLogger(name)
+        if not logger.handlers:
+            continue
+        routes[name] = list(logger.handlers)
+        for handler in routes[name]:
+            logger.removeHandler(handler)
+        logger.addHandler(RoutedQueueHandler(log_queue, name))
+    if not routes:
+        return
+    _listener = RoutingQueueListener(log_queue, routes)
+    _listener.start()
+
+
+def stop():
+    """Write out the records still queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_in_child():
+    # A forked worker (a pre-loading server) inherits the queue but not the listener thread
+    if _listener is not None:
+        _listener._thread = None
+        _listener.start()
+
+
+atexit.register(stop)
+os.register_at_fork(after_in_child=_restart_in_child)
@@ -44,14 +44,27 @@ INSTALLED_APPS = [
     'material_app',
     'withdrawal_app',
     'replacement_app',
+    'report_app',
+    'archive_app',
+    'sync_app',
+    'batch_app',
+    'hierarchy_app',
+    'inbox_app',
+    'events_app',
+    'outbox_app',
+    'monitoring_app',
 ]
 
 MIDDLEWARE = [
+    'monitoring_app.middleware.ServerTimingMiddleware',
+    'monitoring_app.middleware.TracingMiddleware',
+    'monitoring_app.middleware.TrafficCaptureMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'monitoring_app.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -145,6 +158,84 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 runserver.default_port = "5001"
 
+# Delivered invoices older than this are moved to the archive tables by `archive_delivered`
+ARCHIVE_DELIVERED_AFTER_DAYS = env.int('ARCHIVE_DELIVERED_AFTER_DAYS', default=365)
+
+# Cache holding the price table, the pick-lists and their invalidation versions.
+# The default local-memory cache is per process: under several workers a write
+# only drops the pick-lists of the worker that served it, and the others serve
+# theirs until PICKLIST_CACHE_TIMEOUT. Set CACHE_URL to a shared cache in that
+# case, e.g. dbcache://expr_cache (then run `manage.py createcachetable`) or
+# rediscache://host:6379/1 (needs the redis package).
+CACHES = {'default': env.cache('CACHE_URL', default='locmemcache://')}
+
+# Seconds the material price table used for replacement valuation stays cached
+MATERIAL_PRICE_CACHE_TIMEOUT = env.int('MATERIAL_PRICE_CACHE_TIMEOUT', default=600)
+
+# Seconds a depot pick-list stays cached; assignments and deliveries drop it sooner
+PICKLIST_CACHE_TIMEOUT = env.int('PICKLIST_CACHE_TIMEOUT', default=60)
+
+# Column of rpl_user_list holding the parent user's work_area_t (MIO -> RM -> ...)
+HIERARCHY_PARENT_COLUMN = env.str('HIERARCHY_PARENT_COLUMN', default='parent_work_area_t')
+
+# Delta sync feed (/api/v1/sync): how old an invoice change must be before it is
+# returned, so a write transaction committing a few seconds late cannot slip an
+# older updated_at in behind a cursor already handed out
+SYNC_SETTLE_SECONDS = env.int('SYNC_SETTLE_SECONDS', default=2)
+
+# Server-Sent Events (/api/v1/events): seconds between polls of the transition
+# log, idle seconds before a keep-alive, seconds before a stream is recycled,
+# and the reconnect delay advertised to clients (ms); skipped ids are waited
+# for as long as the outbox consumers do (OUTBOX_GAP_SECONDS)
+SSE_POLL_INTERVAL = env.float('SSE_POLL_INTERVAL', default=2.0)
+SSE_KEEPALIVE_SECONDS = env.int('SSE_KEEPALIVE_SECONDS', default=15)
+SSE_MAX_SECONDS = env.int('SSE_MAX_SECONDS', default=300)
+SSE_RETRY_MS = env.int('SSE_RETRY_MS', default=3000)
+
+# Transition log consumers run by `consume_transitions`, and how long a reader
+# of the log waits for an id it skipped to commit before giving it up; keep it
+# above the longest transition transaction (see `outbox_app.visibility`)
+OUTBOX_CONSUMERS = [
+    'report_app.consumers.StatusCountConsumer',
+]
+OUTBOX_GAP_SECONDS = env.int('OUTBOX_GAP_SECONDS', default=60)
+
+# Requests kept per view for the rolling figures of /api/v1/_stats
+REQUEST_STATS_WINDOW = env.int('REQUEST_STATS_WINDOW', default=500)
+
+# /metrics: directory the server's worker processes share their metrics through
+# (empty keeps them per process), how often each writes its file, and the bearer
+# token scrapes must send (empty allows any)
+METRICS_DIR = env.str('METRICS_DIR', default='')
+METRICS_FLUSH_SECONDS = env.float('METRICS_FLUSH_SECONDS', default=1.0)
+METRICS_TOKEN = env.str('METRICS_TOKEN', default='')
+
+# Slow-query log (logs/slow_queries.jsonl): statements slower than this many ms
+# (0 turns it off), the share of them recorded, the most recorded per minute per
+# process, and whether their plan is captured with EXPLAIN
+SLOW_QUERY_MS = env.float('SLOW_QUERY_MS', default=200.0)
+SLOW_QUERY_SAMPLE_RATE = env.float('SLOW_QUERY_SAMPLE_RATE', default=1.0)
+SLOW_QUERY_MAX_PER_MINUTE = env.int('SLOW_QUERY_MAX_PER_MINUTE', default=30)
+SLOW_QUERY_EXPLAIN = env.bool('SLOW_QUERY_EXPLAIN', default=True)
+
+# ?_profile=cpu|mem captures: where they are saved, how many are kept, and how
+# many functions or allocation sites the response lists
+PROFILE_DIR = env.str('PROFILE_DIR', default=str(BASE_DIR / 'logs/profiles'))
+PROFILE_KEEP = env.int('PROFILE_KEEP', default=50)
+PROFILE_TOP = env.int('PROFILE_TOP', default=30)
+
+# Tracing (logs/traces.jsonl): share of requests traced when no traceparent
+# header decides, and the most spans kept per trace
+TRACE_SAMPLE_RATE = env.float('TRACE_SAMPLE_RATE', default=0.01)
+TRACE_MAX_SPANS = env.int('TRACE_MAX_SPANS', default=500)
+
+# Share of API requests written, anonymized, to logs/traffic.jsonl for
+# `python -m benchmarks.replay` (0 turns capture off)
+CAPTURE_SAMPLE_RATE = env.float('CAPTURE_SAMPLE_RATE', default=0.0)
+
+# Maximum number of sub-requests accepted by /api/v1/batch
+BATCH_MAX_REQUESTS = env.int('BATCH_MAX_REQUESTS', default=20)
+
 # API documentation setup
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -166,8 +257,10 @@ os.makedirs(BASE_DIR / 'logs/material_app', exist_ok=True)
 
 # Custom Date Formatter to format date and time into Dhaka timezone
 class DhakaFormatter(logging.Formatter):
+    timezone = pytz.timezone("Asia/Dhaka")
+
     def converter(self, timestamp):
-        dt = datetime.fromtimestamp(timestamp, pytz.timezone("Asia/Dhaka"))
+        dt = datetime.fromtimestamp(timestamp, self.timezone)
         return dt
 
     def formatTime(self, record, datefmt=None):
@@ -186,6 +279,9 @@ class LevelFilter(logging.Filter):
         record.levelname = self.level
         return record.levelno == self.level
 
+# Request threads only queue log records; a background thread formats and writes them
+LOGGING_CONFIG = 'expire_product_api.log_pipeline.configure'
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -201,7 +297,11 @@ LOGGING = {
             'format': '{levelname} {lineno} {asctime} {filename} {funcName} {message}',
             'style': '{',
             'datefmt': '%d-%m-%Y %H:%M:%S'
-        }    
+        },
+        'message_only': {
+            'format': '{message}',
+            'style': '{',
+        },
     },
     'filters':{
         'info_only':{
@@ -275,6 +375,30 @@ LOGGING = {
             'maxBytes': 1024 * 1024 * 5,  # 5 MB        
             'backupCount': 5, 
         },
+        'slow_queries': {
+            'level': 'INFO',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'logs/slow_queries.jsonl',
+            'formatter': 'message_only',
+            'maxBytes': 1024 * 1024 * 5,  # 5 MB
+            'backupCount': 5,
+        },
+        'traces': {
+            'level': 'INFO',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'logs/traces.jsonl',
+            'formatter': 'message_only',
+            'maxBytes': 1024 * 1024 * 20,  # 20 MB
+            'backupCount': 5,
+        },
+        'traffic': {
+            'level': 'INFO',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'logs/traffic.jsonl',
+            'formatter': 'message_only',
+            'maxBytes': 1024 * 1024 * 20,  # 20 MB
+            'backupCount': 5,
+        },
     },
     'loggers':{
         '': {
@@ -292,6 +416,21 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False
         },
+        'monitoring_app.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'INFO',
+            'propagate': False
+        },
+        'monitoring_app.tracing': {
+            'handlers': ['traces'],
+            'level': 'INFO',
+            'propagate': False
+        },
+        'monitoring_app.capture': {
+            'handlers': ['traffic'],
+            'level': 'INFO',
+            'propagate': False
+        },
     }
 }
 
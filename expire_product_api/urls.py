@@ -13,4 +13,10 @@ urlpatterns = [
     path('api/v1/material/', include('material_app.urls')),
     path('api/v1/withdrawal/', include('withdrawal_app.urls')),
     path('api/v1/replacement/', include('replacement_app.urls')),
+    path('api/v1/reports/', include('report_app.urls')),
+    path('api/v1/sync', include('sync_app.urls')),
+    path('api/v1/batch', include('batch_app.urls')),
+    path('api/v1/inbox/', include('inbox_app.urls')),
+    path('api/v1/events', include('events_app.urls')),
+    path('', include('monitoring_app.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
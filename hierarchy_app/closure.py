@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from .models import HierarchyClosure
+
+
+def load_parents():
+    """
+    Read each user's parent from `rpl_user_list` in one query.
+
+    The parent column is `HIERARCHY_PARENT_COLUMN`; it holds the parent's
+    `work_area_t`. Self-references are treated as roots.
+
+    Returns:
+        dict: `work_area_t` to parent `work_area_t` (or None).
+    """
+    column = connection.ops.quote_name(settings.HIERARCHY_PARENT_COLUMN)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT work_area_t, {column} FROM rpl_user_list WHERE work_area_t IS NOT NULL")
+        rows = cursor.fetchall()
+    return {node: parent if parent and parent != node else None for node, parent in rows}
+
+
+def build_closure(parents):
+    """
+    Expand a parent map into closure pairs by walking each node up to its root.
+
+    A cycle in the user master stops the walk where it closes, so a bad row
+    cannot loop forever.
+
+    Returns:
+        dict: (ancestor, descendant) to depth.
+    """
+    closure = {}
+    for node in parents:
+        ancestor, depth, seen = node, 0, set()
+        while ancestor is not None and ancestor not in seen:
+            seen.add(ancestor)
+            closure[(ancestor, node)] = depth
+            ancestor, depth = parents.get(ancestor), depth + 1
+    return closure
+
+
+def sync_closure(batch_size=1000):
+    """
+    Bring `expr_hierarchy_closure` in line with `rpl_user_list`.
+
+    Only the difference is written, in one transaction, so readers never see
+    an empty or half built table and an unchanged hierarchy costs no writes.
+
+    Returns:
+        tuple: (rows added, rows removed).
+    """
+    wanted = build_closure(load_parents())
+    with transaction.atomic():
+        current = {
+            (ancestor, descendant): (pk, depth)
+            for pk, ancestor, descendant, depth in HierarchyClosure.objects.values_list('id', 'ancestor', 'descendant', 'depth')
+        }
+        stale = [pk for pair, (pk, depth) in current.items() if wanted.get(pair) != depth]
+        for start in range(0, len(stale), batch_size):
+            HierarchyClosure.objects.filter(id__in=stale[start:start + batch_size]).delete()
+        missing = [
+            HierarchyClosure(ancestor=ancestor, descendant=descendant, depth=depth)
+            for (ancestor, descendant), depth in wanted.items()
+            if current.get((ancestor, descendant), (None, None))[1] != depth
+        ]
+        HierarchyClosure.objects.bulk_create(missing, batch_size=batch_size)
+    return len(missing), len(stale)
+
+
+def subtree_sql(column, user_id):
+    """
+    Raw SQL filter matching rows whose `column` is `user_id` or any user below it.
+
+    Returns:
+        tuple: (clause, params) for the WHERE clause.
+    """
+    return f"{column} IN (SELECT hc.descendant FROM expr_hierarchy_closure hc WHERE hc.ancestor = %s)", [user_id]
+
+
+def subtree_q(field, user_id):
+    """ORM counterpart of `subtree_sql`."""
+    return Q(**{f'{field}__in': HierarchyClosure.objects.filter(ancestor=user_id).values('descendant')})
+
+
+def rm_scope_sql(rm_id, scope):
+    """
+    Raw SQL filter for an RM: the invoices it is stamped on, or with
+    `scope=subtree` the invoices of every MIO currently under it.
+    """
+    if scope == 'subtree':
+        return subtree_sql('wi.mio_id', rm_id)
+    return "wi.rm_id = %s", [rm_id]
+
+
+def rm_scope_q(rm_id, scope):
+    """ORM counterpart of `rm_scope_sql`."""
+    if scope == 'subtree':
+        return subtree_q('mio_id', rm_id)
+    return Q(rm_id=rm_id)
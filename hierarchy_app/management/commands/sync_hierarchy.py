@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from hierarchy_app.closure import sync_closure
+
+
+class Command(BaseCommand):
+    help = "Rebuild the hierarchy closure table from rpl_user_list, writing only what changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows written per query.")
+
+    def handle(self, *args, **options):
+        added, removed = sync_closure(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Hierarchy closure synced: {added} rows added, {removed} removed."))
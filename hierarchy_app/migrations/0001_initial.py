@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-19 23:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HierarchyClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ancestor', models.CharField(max_length=40)),
+                ('descendant', models.CharField(max_length=40)),
+                ('depth', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Hierarchy Closure',
+                'verbose_name_plural': 'Hierarchy Closure',
+                'db_table': 'expr_hierarchy_closure',
+                'indexes': [models.Index(fields=['descendant'], name='expr_hc_descendant_idx')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import models
+
+# Create your models here.
+class HierarchyClosure(models.Model):
+    """
+    Model representing one ancestor/descendant pair of the user hierarchy.
+
+    Every user of `rpl_user_list` (keyed by `work_area_t`) has a row for
+    itself at depth 0 and one for each user below it, at any depth, so a
+    whole subtree is a single indexed lookup on `ancestor`.
+    """
+    ancestor = models.CharField(max_length=40)
+    descendant = models.CharField(max_length=40)
+    depth = models.PositiveSmallIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.ancestor} > {self.descendant} ({self.depth})'
+
+    class Meta:
+        db_table = 'expr_hierarchy_closure'
+        verbose_name = 'Hierarchy Closure'
+        verbose_name_plural = 'Hierarchy Closure'
+        unique_together = (('ancestor', 'descendant'),)
+        indexes = [
+            models.Index(fields=['descendant'], name='expr_hc_descendant_idx'),
+        ]
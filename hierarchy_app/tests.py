@@ -0,0 +1,33 @@
+from django.test import SimpleTestCase
+from .closure import build_closure
+
+
+class BuildClosureTests(SimpleTestCase):
+    def test_chain(self):
+        closure = build_closure({'mio': 'rm', 'rm': 'zm', 'zm': None})
+        self.assertEqual(closure, {
+            ('mio', 'mio'): 0, ('rm', 'mio'): 1, ('zm', 'mio'): 2,
+            ('rm', 'rm'): 0, ('zm', 'rm'): 1,
+            ('zm', 'zm'): 0,
+        })
+
+    def test_parent_missing_from_the_map_is_still_an_ancestor(self):
+        closure = build_closure({'mio': 'rm'})
+        self.assertEqual(closure, {('mio', 'mio'): 0, ('rm', 'mio'): 1})
+
+    def test_cycle_stops_where_it_closes(self):
+        closure = build_closure({'a': 'b', 'b': 'c', 'c': 'a'})
+        self.assertEqual(len(closure), 9)
+        self.assertEqual(closure[('a', 'a')], 0)
+        self.assertEqual(closure[('b', 'a')], 1)
+        self.assertEqual(closure[('c', 'a')], 2)
+
+    def test_cycle_above_a_chain(self):
+        closure = build_closure({'mio': 'rm', 'rm': 'zm', 'zm': 'rm'})
+        self.assertEqual(closure[('zm', 'mio')], 2)
+        self.assertEqual(closure[('rm', 'mio')], 1)
+        self.assertNotIn(('mio', 'rm'), closure)
+        self.assertEqual(len(closure), 7)
+
+    def test_self_loop(self):
+        self.assertEqual(build_closure({'a': 'a'}), {('a', 'a'): 0})
@@ -0,0 +1,86 @@
+from django.db import connection, transaction
+from withdrawal_app.models import WithdrawalInfo
+from .models import WorklistInbox
+
+# Role to the invoice column naming its owner
+ROLE_FIELDS = {
+    WorklistInbox.Role.MIO: 'mio_id',
+    WorklistInbox.Role.RM: 'rm_id',
+    WorklistInbox.Role.DEPOT: 'depot_id',
+    WorklistInbox.Role.DA: 'da_id',
+    WorklistInbox.Role.DELIVERY_DA: 'delivery_da_id',
+}
+# Invoice columns copied as-is onto every inbox row
+COPIED_FIELDS = [
+    'invoice_no', 'invoice_type', 'last_status', 'mio_id', 'rm_id', 'partner_id', 'depot_id', 'route_id',
+    'da_id', 'delivery_da_id', 'request_date', 'withdrawal_date', 'order_date',
+    'request_total', 'withdrawal_total', 'replacement_total', 'updated_at',
+]
+
+
+def _lookup(sql, keys):
+    """Run a `key IN (...)` lookup on an external table and map key to the rest of the row."""
+    keys = sorted({key for key in keys if key})
+    if not keys:
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(placeholders=", ".join(["%s"] * len(keys))), keys)
+        return {row[0]: row[1:] for row in cursor.fetchall()}
+
+
+def display_names(invoices):
+    """
+    Fetch partner and user display fields for `invoices`, one query per table.
+
+    Returns:
+        tuple: (partner id to (name, address), work area to (name,)).
+    """
+    partners = _lookup(
+        """
+        SELECT partner,
+               CONCAT(COALESCE(name1, ''), ' ', COALESCE(name2, '')),
+               CONCAT(COALESCE(street, ''), ' ', COALESCE(street1, ''), ' ', COALESCE(street2, ''), ' ', COALESCE(district, ''))
+        FROM rpl_customer WHERE partner IN ({placeholders})
+        """,
+        [invoice['partner_id'] for invoice in invoices],
+    )
+    users = _lookup(
+        "SELECT work_area_t, `name` FROM rpl_user_list WHERE work_area_t IN ({placeholders})",
+        [invoice[field] for invoice in invoices for field in ('mio_id', 'rm_id')],
+    )
+    return partners, users
+
+
+def sync_inbox(invoice_ids):
+    """
+    Rewrite the inbox rows of `invoice_ids` from their current state.
+
+    Call in the transaction that changed the invoices. Delivered (or missing)
+    invoices end up with no rows. Runs a fixed number of queries whatever
+    the number of invoices.
+    """
+    invoice_ids = list(invoice_ids)
+    with transaction.atomic():
+        invoices = list(
+            WithdrawalInfo.objects
+            .filter(id__in=invoice_ids)
+            .exclude(last_status=WithdrawalInfo.Status.DELIVERED)
+            .values('id', *COPIED_FIELDS)
+        )
+        partners, users = display_names(invoices)
+        rows = []
+        for invoice in invoices:
+            partner_name, partner_address = partners.get(invoice['partner_id'], ('', ''))
+            fields = {field: invoice[field] for field in COPIED_FIELDS}
+            fields.update(
+                invoice_id=invoice['id'],
+                mio_name=users.get(invoice['mio_id'], ('',))[0] or '',
+                rm_name=users.get(invoice['rm_id'], ('',))[0] or '',
+                partner_name=(partner_name or '').strip(),
+                partner_address=(partner_address or '').strip(),
+            )
+            for role, field in ROLE_FIELDS.items():
+                if invoice[field]:
+                    rows.append(WorklistInbox(role=role, owner_id=invoice[field], **fields))
+        WorklistInbox.objects.filter(invoice_id__in=invoice_ids).delete()
+        WorklistInbox.objects.bulk_create(rows)
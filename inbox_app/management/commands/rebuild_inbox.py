@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from inbox_app.fanout import sync_inbox
+from inbox_app.models import WorklistInbox
+from withdrawal_app.models import WithdrawalInfo
+
+
+class Command(BaseCommand):
+    help = "Rebuild the worklist inbox rows of every open invoice (backfill or repair)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Invoices rebuilt per transaction.")
+
+    def handle(self, *args, **options):
+        # Drop rows of invoices that are delivered or gone, then rebuild the open ones
+        open_ids = WithdrawalInfo.objects.exclude(last_status=WithdrawalInfo.Status.DELIVERED).values('id')
+        removed, _ = WorklistInbox.objects.exclude(invoice_id__in=open_ids).delete()
+
+        queryset = open_ids.order_by('id').values_list('id', flat=True)
+        last_id = 0
+        rebuilt = 0
+        while True:
+            ids = list(queryset.filter(id__gt=last_id)[:options['batch_size']])
+            if not ids:
+                break
+            last_id = ids[-1]
+            sync_inbox(ids)
+            rebuilt += len(ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the inbox of {rebuilt} open invoices, removed {removed} stale rows."))
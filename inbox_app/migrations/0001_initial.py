@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-19 23:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorklistInbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('mio', 'MIO'), ('rm', 'RM'), ('depot', 'Depot'), ('da', 'DA'), ('delivery_da', 'Delivery DA')], max_length=12)),
+                ('owner_id', models.CharField(max_length=40)),
+                ('invoice_id', models.BigIntegerField()),
+                ('invoice_no', models.CharField(blank=True, max_length=12, null=True)),
+                ('invoice_type', models.CharField(choices=[('EXP', 'Expired'), ('GEN', 'General')], max_length=12)),
+                ('last_status', models.CharField(choices=[('request_pending', 'Request Pending'), ('request_approved', 'Request Approved'), ('withdrawal_pending', 'Withdrawal Pending'), ('withdrawal_approval', 'Withdrawal Approval'), ('withdrawal_approved', 'Withdrawal Approved'), ('replacement_approval', 'Replacement Approval'), ('replacement_approved', 'Replacement Approved'), ('delivery_pending', 'Delivery Pending'), ('delivered', 'Delivered')], max_length=40)),
+                ('mio_id', models.CharField(max_length=40)),
+                ('mio_name', models.CharField(blank=True, default='', max_length=150)),
+                ('rm_id', models.CharField(max_length=40)),
+                ('rm_name', models.CharField(blank=True, default='', max_length=150)),
+                ('partner_id', models.CharField(max_length=40)),
+                ('partner_name', models.CharField(blank=True, default='', max_length=255)),
+                ('partner_address', models.CharField(blank=True, default='', max_length=500)),
+                ('depot_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('route_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('da_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('delivery_da_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('request_date', models.DateField(blank=True, null=True)),
+                ('withdrawal_date', models.DateField(blank=True, null=True)),
+                ('order_date', models.DateField(blank=True, null=True)),
+                ('request_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('withdrawal_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('replacement_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Worklist Inbox',
+                'verbose_name_plural': 'Worklist Inbox',
+                'db_table': 'expr_worklist_inbox',
+                'indexes': [models.Index(fields=['role', 'owner_id', 'last_status', 'invoice_id'], name='expr_inbox_worklist_idx'), models.Index(fields=['invoice_id'], name='expr_inbox_invoice_idx')],
+                'unique_together': {('role', 'owner_id', 'invoice_id')},
+            },
+        ),
+    ]
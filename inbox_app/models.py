@@ -0,0 +1,58 @@
+from django.db import models
+from withdrawal_app.models import WithdrawalInfo
+
+# Create your models here.
+class WorklistInbox(models.Model):
+    """
+    Model representing one open invoice in one user's worklist.
+
+    Every open invoice has a row per role holding it (its MIO, RM, depot, DA
+    and delivery DA), rewritten in the same transaction as each change of
+    the invoice and removed once it is delivered. The display fields are
+    copied onto the row, so a worklist is one range scan on
+    (role, owner_id, last_status) with no joins.
+    """
+    class Role(models.TextChoices):
+        MIO = 'mio', 'MIO'
+        RM = 'rm', 'RM'
+        DEPOT = 'depot', 'Depot'
+        DA = 'da', 'DA'
+        DELIVERY_DA = 'delivery_da', 'Delivery DA'
+    role = models.CharField(max_length=12, choices=Role.choices)
+    owner_id = models.CharField(max_length=40)
+    # Plain id, not a foreign key: the invoice may later move to the archive tables
+    invoice_id = models.BigIntegerField()
+    invoice_no = models.CharField(max_length=12, blank=True, null=True)
+    invoice_type = models.CharField(max_length=12, choices=WithdrawalInfo.InvoiceType.choices)
+    last_status = models.CharField(max_length=40, choices=WithdrawalInfo.Status.choices)
+    mio_id = models.CharField(max_length=40)
+    mio_name = models.CharField(max_length=150, blank=True, default='')
+    rm_id = models.CharField(max_length=40)
+    rm_name = models.CharField(max_length=150, blank=True, default='')
+    partner_id = models.CharField(max_length=40)
+    partner_name = models.CharField(max_length=255, blank=True, default='')
+    partner_address = models.CharField(max_length=500, blank=True, default='')
+    depot_id = models.CharField(max_length=40, null=True, blank=True)
+    route_id = models.CharField(max_length=40, null=True, blank=True)
+    da_id = models.CharField(max_length=40, null=True, blank=True)
+    delivery_da_id = models.CharField(max_length=40, null=True, blank=True)
+    request_date = models.DateField(null=True, blank=True)
+    withdrawal_date = models.DateField(null=True, blank=True)
+    order_date = models.DateField(null=True, blank=True)
+    request_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    withdrawal_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    replacement_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.role} {self.owner_id}: {self.invoice_no}'
+
+    class Meta:
+        db_table = 'expr_worklist_inbox'
+        verbose_name = 'Worklist Inbox'
+        verbose_name_plural = 'Worklist Inbox'
+        unique_together = (('role', 'owner_id', 'invoice_id'),)
+        indexes = [
+            models.Index(fields=['role', 'owner_id', 'last_status', 'invoice_id'], name='expr_inbox_worklist_idx'),
+            models.Index(fields=['invoice_id'], name='expr_inbox_invoice_idx'),
+        ]
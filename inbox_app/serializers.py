@@ -0,0 +1,8 @@
+from rest_framework import serializers
+from .models import WorklistInbox
+
+
+class WorklistInboxSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WorklistInbox
+        exclude = ['id', 'role', 'owner_id']
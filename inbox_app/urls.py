@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views as inbox_views
+
+urlpatterns = [
+    path('<str:role>', inbox_views.WorklistView.as_view(), name='worklist'),
+]
@@ -0,0 +1,68 @@
+import logging
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from withdrawal_app.models import WithdrawalInfo
+from .models import WorklistInbox
+from .serializers import WorklistInboxSerializer
+
+# Set logger
+logger = logging.getLogger("inbox_app")
+
+
+# Create your views here.
+class WorklistView(APIView):
+    """
+    View returning a user's worklist from the inbox table.
+
+    One range scan on (role, owner_id, last_status, invoice_id), newest
+    invoice first, paged with a `before` invoice id instead of an offset.
+    """
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='owner_id', description='ID of the user in that role (MIO, RM, depot, DA or delivery DA)', required=True, type=str),
+            OpenApiParameter(name='status', description='Only invoices in these statuses (comma separated)', required=False, type=str),
+            OpenApiParameter(name='before', description='Invoice id to continue after, from the previous page', required=False, type=int),
+            OpenApiParameter(name='limit', description='Page size (max 200)', required=False, type=int),
+        ],
+        responses={
+            status.HTTP_200_OK: WorklistInboxSerializer(many=True),
+            status.HTTP_400_BAD_REQUEST: OpenApiResponse(description="Invalid request parameters"),
+        }
+    )
+    def get(self, request, role):
+        """
+        Return the open invoices of `owner_id` in `role`.
+
+        Keep calling with the returned `next` as `before` until it is null.
+        """
+        if role not in WorklistInbox.Role.values:
+            return Response({"success":False,"message": f"Unknown role. Use one of: {', '.join(WorklistInbox.Role.values)}."}, status=status.HTTP_400_BAD_REQUEST)
+        owner_id = request.query_params.get('owner_id')
+        if not owner_id:
+            return Response({"success":False,"message": "Please provide owner_id."}, status=status.HTTP_400_BAD_REQUEST)
+        statuses = [s for s in request.query_params.get('status', '').split(',') if s]
+        if any(s not in WithdrawalInfo.Status.values for s in statuses):
+            return Response({"success":False,"message": "Invalid status."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            before = int(request.query_params['before']) if request.query_params.get('before') else None
+            limit = min(int(request.query_params.get('limit', 50)), 200)
+        except ValueError:
+            return Response({"success":False,"message": "Invalid 'before' or 'limit'."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit <= 0:
+            return Response({"success":False,"message": "Invalid 'limit'. Must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = WorklistInbox.objects.filter(role=role, owner_id=owner_id)
+        if statuses:
+            rows = rows.filter(last_status__in=statuses)
+        if before:
+            rows = rows.filter(invoice_id__lt=before)
+        rows = list(rows.order_by('-invoice_id')[:limit + 1])
+        next_before = rows[limit - 1].invoice_id if len(rows) > limit else None
+        return Response({
+            "success": True,
+            "message": "Worklist fetched successfully." if rows else "No Items Found!",
+            "next": next_before,
+            "data": WorklistInboxSerializer(rows[:limit], many=True).data,
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,91 @@
+from collections import namedtuple
+from django.conf import settings
+from material_app.models import RplMaterial
+from withdrawal_app.money import to_paisa, line_paisa
+from monitoring_app.metrics import cached
+
+PRICE_CACHE_KEY = 'material_app:price_table'
+
+# Prices of one material: a pack costs `pack_paisa` (TP + VAT, in paisa) and holds `units_per_pack` units
+MaterialPrice = namedtuple('MaterialPrice', ['matnr', 'material_name', 'pack_paisa', 'units_per_pack'])
+
+
+def units_per_pack(pack_size):
+    """
+    Parse a pack size such as `10's`, `3x10's` or `1 x 100` into units per pack.
+
+    Raises:
+        ValueError: If the pack size is not a count or a `strips x units` product.
+    """
+    clean = pack_size.replace("'", "").replace("s", "").lower().replace(" ", "")
+    if "x" in clean:
+        parts = clean.split("x")
+        return int(parts[0]) * int(parts[1])
+    return int(clean)
+
+
+def load_price_table():
+    """
+    Build the price table from `rpl_material` in one query.
+
+    rpl_material holds one row per plant and sales org; the first priced row
+    of each material wins. Materials whose pack size cannot be parsed keep
+    `units_per_pack=None` and can only be priced in whole packs.
+
+    Returns:
+        dict: Material number to `MaterialPrice`.
+    """
+    table = {}
+    rows = (
+        RplMaterial.objects
+        .filter(unit_tp__isnull=False)
+        .order_by('matnr', 'id')
+        .values_list('matnr', 'material_name', 'unit_tp', 'unit_vat', 'pack_size')
+    )
+    for matnr, material_name, unit_tp, unit_vat, pack_size in rows:
+        if matnr in table:
+            continue
+        try:
+            units = units_per_pack(pack_size or '')
+        except ValueError:
+            units = None
+        table[matnr] = MaterialPrice(matnr, material_name, to_paisa(unit_tp) + to_paisa(unit_vat), units or None)
+    return table
+
+
+def price_table():
+    """
+    Return the cached price table, loading it on a miss.
+
+    Cached for `MATERIAL_PRICE_CACHE_TIMEOUT` seconds in the default cache;
+    lookups count towards the `material_prices` hit ratio of `/metrics`.
+    """
+    return cached('material_prices', PRICE_CACHE_KEY, load_price_table, settings.MATERIAL_PRICE_CACHE_TIMEOUT)
+
+
+def line_values(lines, prices):
+    """
+    Value replacement lines from the price table in one pass.
+
+    A line is worth `pack_qty` packs plus `unit_qty` loose units, the unit
+    price being the pack price split over the units in a pack. The value is
+    computed in integer paisa on the total unit count, so it is rounded once.
+
+    Args:
+        lines (list): Dicts with `matnr`, `pack_qty` and `unit_qty`.
+        prices (dict): Material number to `MaterialPrice`.
+
+    Returns:
+        list: One net value in paisa per line.
+
+    Raises:
+        KeyError: If a line's material has no price.
+        ValueError: If loose units are requested for a material without a pack size.
+    """
+    values = []
+    for line in lines:
+        price = prices[line['matnr']]
+        if line['unit_qty'] and not price.units_per_pack:
+            raise ValueError(line['matnr'])
+        values.append(line_paisa(price.pack_paisa, price.units_per_pack or 1, line['pack_qty'], line['unit_qty']))
+    return values
@@ -29,5 +29,5 @@ class RplMaterialListView(APIView):
             logger.info("Material list fetched successfully")
             return Response({"success": True, "data": serializer.data}, status=status.HTTP_200_OK)
         except Exception as e:
-            logger.error(f"Error fetching materials: {str(e)}", exc_info=True)
+            logger.error("Error fetching materials: %s", e, exc_info=True)
             return Response({"success": False, "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
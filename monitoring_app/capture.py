@@ -0,0 +1,133 @@
+"""
+Anonymized traffic capture for `benchmarks.replay`.
+
+`TrafficCaptureMiddleware` writes a sample (`CAPTURE_SAMPLE_RATE`) of API
+requests as JSON lines to `logs/traffic.jsonl` (through the
+`monitoring_app.capture` logger): view name, URL kwargs, query string and
+JSON body, with status and duration. Values are anonymized so the file
+keeps the traffic's shape and not its people:
+
+- identifiers (`mio_id`, `depot_id`, `invoice_no`, `rel_mio_phone`, ...)
+  become `<kind>:<token>`, a keyed hash that is the same for the same
+  value, so the mix of scopes and how often each one recurs survive;
+- dates become days from the capture day (`date:-30`), months likewise;
+- quantities, values and paging (`NUMBER_FIELDS`), the enumerated filters
+  (`status`, `scope`, ...) and booleans are kept;
+- any other value, numbers included, becomes `<str:length>`.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import re
+from datetime import date
+from django.conf import settings
+
+logger = logging.getLogger("monitoring_app.capture")
+
+# Request fields naming an entity, to the kind of entity
+ID_KINDS = {
+    'mio_id': 'mio',
+    'rm_id': 'rm',
+    'depot_id': 'depot',
+    'route_id': 'route',
+    'da_id': 'da',
+    'delivery_da_id': 'da',
+    'partner_id': 'partner',
+    'invoice_no': 'invoice',
+    'matnr': 'material',
+    'owner_id': 'owner',
+    'da_ids': 'da',
+    'rel_invoice_no': 'rel_invoice',
+    'rel_mio_phone': 'phone',
+    'batch': 'batch',
+    'id': 'record',
+    'invoice_id': 'invoice_pk',
+    'line_id': 'record',
+}
+# Request fields whose numbers are kept: quantities, values and paging
+NUMBER_FIELDS = {'pack_qty', 'strip_qty', 'unit_qty', 'net_val', 'page', 'per_page', 'limit'}
+# Request fields holding one of a few fixed values, kept as they are
+ENUM_FIELDS = {'status', 'scope', 'group_by', 'file_format', 'role', 'stage', 'invoice_type', 'gzip'}
+# Views not captured: monitoring itself, long-lived streams, and batches, whose
+# sub-request paths cannot be anonymized field by field
+SKIP_VIEWS = {'request_stats', 'metrics', 'worklist_events', 'batch'}
+MAX_BODY = 64 * 1024
+
+_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_MONTH = re.compile(r'^\d{4}-\d{2}$')
+_NUMBER = re.compile(r'^-?\d+(\.\d+)?$')
+_ENUM = re.compile(r'^[A-Za-z0-9_]{1,40}$')
+
+
+def token(kind, value):
+    """Stable keyed hash of an identifier; not reversible without `SECRET_KEY`."""
+    digest = hmac.new(settings.SECRET_KEY.encode(), f'{kind}:{value}'.encode(), hashlib.sha256)
+    return f'{kind}:{digest.hexdigest()[:12]}'
+
+
+def anonymize(field, value, today=None):
+    """Anonymize one request value (recursing into JSON lists and objects) by the field it is under."""
+    today = today or date.today()
+    if isinstance(value, dict):
+        return {key: anonymize(key, item, today) for key, item in value.items()}
+    if isinstance(value, list):
+        return [anonymize(field, item, today) for item in value]
+    if value is None or isinstance(value, bool):
+        return value
+    if field in NUMBER_FIELDS and isinstance(value, (int, float)):
+        return value
+    value = str(value)
+    if field in ID_KINDS:
+        return token(ID_KINDS[field], value)
+    if _DATE.match(value):
+        try:
+            return f'date:{(date.fromisoformat(value) - today).days}'
+        except ValueError:
+            pass
+    if _MONTH.match(value):
+        year, month = map(int, value.split('-'))
+        return f'month:{(year - today.year) * 12 + month - today.month}'
+    if field in NUMBER_FIELDS and _NUMBER.match(value):
+        return value
+    if field in ENUM_FIELDS and _ENUM.match(value):
+        return value
+    return f'<str:{len(value)}>'
+
+
+def read_body(request):
+    """
+    The parsed JSON body of a request, or None.
+
+    Call before the view runs: reading `request.body` first keeps it
+    readable for DRF afterwards.
+    """
+    if request.content_type != 'application/json':
+        return None
+    try:
+        if int(request.META.get('CONTENT_LENGTH') or 0) > MAX_BODY:
+            return None
+        return json.loads(request.body or b'null')
+    except ValueError:
+        return None
+
+
+def record(request, body, response, elapsed):
+    """Write one captured request, if it is an API view worth replaying."""
+    match = request.resolver_match
+    if match is None or not match.view_name or match.view_name in SKIP_VIEWS:
+        return
+    if not request.path.startswith('/api/') or '_profile' in request.GET:
+        return
+    today = date.today()
+    query = {key: values[0] if len(values) == 1 else values for key, values in request.GET.lists()}
+    logger.info("%s", json.dumps({
+        'date': today.isoformat(),
+        'method': request.method,
+        'view': match.view_name,
+        'kwargs': anonymize('', match.kwargs, today),
+        'query': anonymize('', query, today),
+        'body': anonymize('', body, today) if body is not None else None,
+        'status': response.status_code,
+        'duration_ms': round(elapsed * 1000, 2),
+    }, separators=(',', ':')))
@@ -0,0 +1,240 @@
+"""
+In-process metrics exported in the Prometheus text format at `/metrics`.
+
+Every metric here only adds up (counters, histogram buckets and sums), so
+the figures of several worker processes merge by summing. With
+`METRICS_DIR` set, each process writes its values to its own file there (at
+most every `METRICS_FLUSH_SECONDS`, and on exit) and `/metrics` sums every
+file, so a pre-fork server reports all of its workers whichever one serves
+the scrape. Clear the directory when the server starts.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS'}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A count per label set."""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, *labels, amount=1):
+        with registry.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+        registry.maybe_flush()
+
+    @staticmethod
+    def merge(total, value):
+        return (total or 0) + value
+
+    def lines(self, values):
+        for labels, value in sorted(values.items()):
+            yield f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}'
+
+
+class Histogram:
+    """Observations per label set, counted in cumulative `le` buckets."""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Label values to [count per bucket (not cumulative), count above the last bucket, sum]
+        self.values = {}
+
+    def observe(self, value, *labels):
+        with registry.lock:
+            slots = self.values.setdefault(labels, [0] * (len(self.buckets) + 1) + [0.0])
+            index = next((n for n, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            slots[index] += 1
+            slots[-1] += value
+        registry.maybe_flush()
+
+    @staticmethod
+    def merge(total, value):
+        return [a + b for a, b in zip(total, value)] if total else list(value)
+
+    def lines(self, values):
+        for labels, slots in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), slots):
+                cumulative += count
+                le = bound if isinstance(bound, str) else _number(float(bound))
+                yield f'{self.name}_bucket{_labels(self.labelnames, labels, [("le", le)])} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(float(slots[-1]))}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}'
+
+
+class Registry:
+    """The metrics of this process, and the file store shared with the others."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = []
+        self._pid = os.getpid()
+        self._path = None
+        self._flushed = 0.0
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def reset_in_child(self):
+        # A forked worker starts from zero rather than recounting its parent's
+        # values, and with a fresh lock in case a parent thread held it at the fork
+        self.lock = threading.Lock()
+        self._pid, self._path, self._flushed = os.getpid(), None, 0.0
+        for metric in self.metrics:
+            metric.values = {}
+
+    def state(self):
+        """This process's values: metric name to {labels (JSON list): value}."""
+        with self.lock:
+            return {
+                metric.name: {json.dumps(labels): value for labels, value in metric.values.items()}
+                for metric in self.metrics
+            }
+
+    def flush(self):
+        """Write this process's values to its file in `METRICS_DIR`, atomically."""
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        state = self.state()
+        if self._path is None:
+            if not any(state.values()):
+                return
+            os.makedirs(directory, exist_ok=True)
+            # The start time keeps a reused pid from overwriting a finished worker's file
+            self._path = os.path.join(directory, f'{self._pid}-{time.time_ns()}.json')
+        temporary = f'{self._path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump(state, handle)
+        os.replace(temporary, self._path)
+        self._flushed = time.monotonic()
+
+    def maybe_flush(self):
+        if settings.METRICS_DIR and time.monotonic() - self._flushed >= settings.METRICS_FLUSH_SECONDS:
+            self.flush()
+
+    def collect(self):
+        """Values of every process: this one's live, the others' from their files."""
+        states = [self.state()]
+        directory = settings.METRICS_DIR
+        if directory:
+            self.flush()
+            states = []
+            for name in os.listdir(directory):
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(directory, name)) as handle:
+                        states.append(json.load(handle))
+                except (OSError, ValueError):
+                    continue
+        merged = {}
+        for metric in self.metrics:
+            values = {}
+            for state in states:
+                for labels, value in state.get(metric.name, {}).items():
+                    key = tuple(json.loads(labels))
+                    values[key] = metric.merge(values.get(key), value)
+            merged[metric.name] = values
+        return merged
+
+    def exposition(self):
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        merged = self.collect()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.lines(merged[metric.name]))
+        lines.extend(_hit_ratios(merged[CACHE_REQUESTS.name]))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+atexit.register(registry.flush)
+os.register_at_fork(after_in_child=registry.reset_in_child)
+
+REQUEST_LATENCY = registry.register(Histogram(
+    'http_request_duration_seconds', 'Request latency by view.', ['view', 'method'], LATENCY_BUCKETS,
+))
+REQUESTS = registry.register(Counter(
+    'http_requests_total', 'Requests by view and status code.', ['view', 'method', 'status'],
+))
+DB_QUERIES = registry.register(Histogram(
+    'db_queries_per_request', 'SQL queries run per request, by view.', ['view'], QUERY_BUCKETS,
+))
+DB_DURATION = registry.register(Histogram(
+    'db_duration_seconds', 'SQL time per request, by view.', ['view'], LATENCY_BUCKETS,
+))
+CACHE_REQUESTS = registry.register(Counter(
+    'cache_requests_total', 'Cache lookups by cache and result (hit or miss).', ['cache', 'result'],
+))
+
+
+def _hit_ratios(lookups):
+    """`cache_hit_ratio` gauge lines, derived from the merged cache lookup counts."""
+    totals, hits = {}, {}
+    for (name, result), count in lookups.items():
+        totals[name] = totals.get(name, 0) + count
+        if result == 'hit':
+            hits[name] = hits.get(name, 0) + count
+    yield '# HELP cache_hit_ratio Share of cache lookups that were hits, since the counters started.'
+    yield '# TYPE cache_hit_ratio gauge'
+    for name, total in sorted(totals.items()):
+        yield f'cache_hit_ratio{_labels(["cache"], [name])} {_number(hits.get(name, 0) / total)}'
+
+
+def observe_request(view, method, status_code, timing):
+    """Record a finished request (a `RequestTiming`) against its view."""
+    method = method if method in METHODS else 'other'
+    REQUEST_LATENCY.observe(timing.total, view, method)
+    REQUESTS.inc(view, method, str(status_code))
+    DB_QUERIES.observe(timing.queries, view)
+    DB_DURATION.observe(timing.db, view)
+
+
+def cached(name, key, load, timeout):
+    """`cache.get_or_set` on the default cache, counting the lookup as a hit or miss of `name`."""
+    missed = False
+
+    def loader():
+        nonlocal missed
+        missed = True
+        return load()
+
+    value = cache.get_or_set(key, loader, timeout=timeout)
+    CACHE_REQUESTS.inc(name, 'miss' if missed else 'hit')
+    return value
@@ -0,0 +1,174 @@
+import random
+import threading
+import time
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+from . import capture, metrics, stats, tracing
+from .profiling import PROFILERS
+from .slow_queries import SlowQueryHook
+from .timing import RequestTiming
+
+
+class ServerTimingMiddleware:
+    """
+    Time each request and add a `Server-Timing` header splitting it into
+    SQL (`db`, with the query count), Python (`app`), response rendering
+    (`render`) and `total`; then add it to its view's rolling stats and
+    to the `/metrics` histograms. Slow statements go to the slow-query log.
+
+    Keep first in `MIDDLEWARE` so `total` covers the other middleware.
+    Streamed responses (the exports) produce their body after this returns,
+    so only the work done before the first byte is counted for them.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = RequestTiming()
+        request.timing = timing
+        with connection.execute_wrapper(timing), connection.execute_wrapper(SlowQueryHook(request)):
+            response = self.get_response(request)
+        timing.finish()
+        response['Server-Timing'] = timing.header()
+        match = request.resolver_match
+        view = match.view_name if match is not None and match.view_name else None
+        if view:
+            stats.record(view, timing, response.status_code)
+        metrics.observe_request(view or 'unmatched', request.method, response.status_code, timing)
+        return response
+
+    def process_template_response(self, request, response):
+        timing = request.timing
+        start = time.perf_counter()
+
+        def rendered(response):
+            timing.render += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request when a staff user adds `?_profile=cpu` (cProfile) or
+    `?_profile=mem` (tracemalloc), replacing its response with the summary
+    of `monitoring_app.profiling`; the capture is saved in `PROFILE_DIR`.
+
+    Staff are recognized by their session, so place after
+    `AuthenticationMiddleware`. The flag is ignored for anyone else, and one
+    request per process is profiled at a time.
+    """
+    _busy = threading.Lock()
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.GET.get('_profile')
+        if mode is None or not getattr(request, 'user', None) or not request.user.is_staff:
+            return self.get_response(request)
+        if mode not in PROFILERS:
+            return JsonResponse({"success": False, "message": f"_profile must be one of: {', '.join(PROFILERS)}."}, status=400)
+        if not self._busy.acquire(blocking=False):
+            return JsonResponse({"success": False, "message": "Another request is being profiled, try again."}, status=409)
+        try:
+            summary = PROFILERS[mode](self.get_response, request)
+        finally:
+            self._busy.release()
+        return JsonResponse({"success": True, "profile": mode, "data": summary})
+
+
+class TracingMiddleware:
+    """
+    Trace head-sampled requests (see `monitoring_app.tracing`): a root span
+    named after the view, with child spans for the middleware and URL
+    resolution before the view, the view itself, each SQL statement and the
+    rendering. The trace id is returned in `X-Trace-Id`.
+
+    Place second in `MIDDLEWARE`, after `ServerTimingMiddleware`.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sampled, trace_id, parent_id = tracing.head_sample(request.headers.get('traceparent'))
+        if not sampled:
+            return self.get_response(request)
+        trace = tracing.Trace(trace_id)
+        root = trace.start(request.method, tracing.SERVER, parent_id, **{
+            'http.method': request.method,
+            'http.target': request.path,
+        })
+        request.trace_root = root
+        token = tracing.activate(root)
+        try:
+            with connection.execute_wrapper(tracing.sql_span):
+                response = self.get_response(request)
+        finally:
+            tracing.restore(token)
+
+        match = request.resolver_match
+        if match is not None:
+            root.name = f'{request.method} {match.view_name or match.route}'
+            root.set('http.route', match.route)
+        root.set('http.status_code', response.status_code)
+        if response.status_code >= 500:
+            root.error = f'HTTP {response.status_code}'
+        view = getattr(request, 'trace_view', None)
+        if view is not None:
+            view.finish()
+        root.finish()
+        trace.export()
+        response['X-Trace-Id'] = trace.trace_id
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        root = getattr(request, 'trace_root', None)
+        if root is None:
+            return None
+        before = root.trace.start('middleware and resolve', parent_id=root.span_id)
+        if before is not None:
+            before.start = root.start
+            before.finish()
+        target = getattr(view_func, 'view_class', view_func)
+        view = root.trace.start('view', parent_id=root.span_id, **{
+            'code.namespace': getattr(target, '__module__', ''),
+            'code.function': getattr(target, '__qualname__', str(target)),
+        })
+        if view is not None:
+            request.trace_view = view
+            tracing.activate(view)
+        return None
+
+    def process_template_response(self, request, response):
+        root = getattr(request, 'trace_root', None)
+        if root is None:
+            return response
+        view = getattr(request, 'trace_view', None)
+        if view is not None:
+            view.finish()
+        render = root.trace.start('render', parent_id=root.span_id)
+        if render is not None:
+            tracing.activate(render)
+            response.add_post_render_callback(lambda response: render.finish())
+        return response
+
+
+class TrafficCaptureMiddleware:
+    """
+    Write a sample (`CAPTURE_SAMPLE_RATE`) of API requests, anonymized, to
+    the traffic capture replayed by `benchmarks.replay`; see
+    `monitoring_app.capture`.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.CAPTURE_SAMPLE_RATE:
+            return self.get_response(request)
+        body = capture.read_body(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        capture.record(request, body, response, time.perf_counter() - start)
+        return response
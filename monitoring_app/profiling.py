@@ -0,0 +1,144 @@
+"""
+Run one request under cProfile or tracemalloc and summarize where its time
+or memory went. Used by `ProfilingMiddleware` for `?_profile=cpu|mem`.
+
+Each capture is also saved in `PROFILE_DIR` (the newest `PROFILE_KEEP`
+are kept) for a closer look:
+
+    python -m pstats logs/profiles/<capture>.prof
+    tracemalloc.Snapshot.load('logs/profiles/<capture>.tracemalloc')
+"""
+import cProfile
+import os
+import pstats
+import time
+import tracemalloc
+from datetime import datetime
+from django.conf import settings
+
+MODES = {'cpu': '.prof', 'mem': '.tracemalloc'}
+# `?_profile_sort=` to the pstats field the cpu summary is ranked by
+CPU_SORTS = {'cumulative': 3, 'own': 2}
+TRACEMALLOC_FRAMES = 10
+
+
+def _consume(response):
+    # Streamed bodies are produced while iterating, so iterate inside the capture
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def _capture_path(request, mode):
+    match = request.resolver_match
+    view = match.view_name if match is not None and match.view_name else 'unmatched'
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{view.replace(':', '.')}-{mode}{MODES[mode]}"
+    return os.path.join(settings.PROFILE_DIR, name)
+
+
+def _prune():
+    """Delete all but the newest `PROFILE_KEEP` captures."""
+    captures = sorted(
+        (entry for entry in os.scandir(settings.PROFILE_DIR) if entry.name.endswith(tuple(MODES.values()))),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in captures[settings.PROFILE_KEEP:]:
+        os.remove(entry.path)
+
+
+def profile_cpu(get_response, request):
+    """
+    Run the request under cProfile.
+
+    Returns:
+        dict: Response status and size, wall time, capture file name and the
+        `PROFILE_TOP` functions by cumulative time, or by own time with
+        `?_profile_sort=own`.
+    """
+    sort = CPU_SORTS.get(request.GET.get('_profile_sort'), CPU_SORTS['cumulative'])
+    profile = cProfile.Profile()
+    start = time.perf_counter()
+    profile.enable()
+    try:
+        response = get_response(request)
+        size = _consume(response)
+    finally:
+        profile.disable()
+    elapsed = time.perf_counter() - start
+    path = _capture_path(request, 'cpu')
+    profile.dump_stats(path)
+    _prune()
+
+    stats = pstats.Stats(profile).stats
+    ranked = sorted(stats.items(), key=lambda item: item[1][sort], reverse=True)[:settings.PROFILE_TOP]
+    return {
+        'status': response.status_code,
+        'bytes': size,
+        'duration_ms': round(elapsed * 1000, 2),
+        'capture': os.path.basename(path),
+        'top': [
+            {
+                'function': function,
+                'file': filename,
+                'line': line,
+                'calls': calls,
+                'own_ms': round(own * 1000, 3),
+                'cumulative_ms': round(cumulative * 1000, 3),
+            }
+            for (filename, line, function), (_, calls, own, cumulative, _) in ranked
+        ],
+    }
+
+
+def profile_mem(get_response, request):
+    """
+    Run the request under tracemalloc.
+
+    tracemalloc traces the whole process, so allocations of requests served
+    at the same time by other threads are counted too.
+
+    Returns:
+        dict: Response status and size, peak traced memory, capture file name
+        and the `PROFILE_TOP` allocation sites of memory still held when the
+        response was ready.
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    try:
+        response = get_response(request)
+        size = _consume(response)
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ])
+    path = _capture_path(request, 'mem')
+    snapshot.dump(path)
+    _prune()
+
+    return {
+        'status': response.status_code,
+        'bytes': size,
+        'peak_kib': round(peak / 1024, 1),
+        'capture': os.path.basename(path),
+        'top': [
+            {
+                'file': stat.traceback[0].filename,
+                'line': stat.traceback[0].lineno,
+                'size_kib': round(stat.size / 1024, 1),
+                'blocks': stat.count,
+            }
+            for stat in snapshot.statistics('lineno')[:settings.PROFILE_TOP]
+        ],
+    }
+
+
+PROFILERS = {'cpu': profile_cpu, 'mem': profile_mem}
@@ -0,0 +1,162 @@
+"""
+Slow-query log: statements slower than `SLOW_QUERY_MS` are written as JSON
+lines to `logs/slow_queries.jsonl` (through the `monitoring_app.slow_queries`
+logger) with their view, redacted parameters, row count and query plan.
+
+Recording is sampled (`SLOW_QUERY_SAMPLE_RATE`) and capped per process
+(`SLOW_QUERY_MAX_PER_MINUTE`). The `EXPLAIN` runs on a background thread
+with its own connection, so the request only pays for building the record.
+Records carry a `fingerprint` of the statement's shape, to follow one
+`WHERE {where_clause}` variant's plan across days.
+"""
+import hashlib
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("monitoring_app.slow_queries")
+
+EXPLAIN_QUEUE_SIZE = 100
+
+_PLACEHOLDER_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """Fold whitespace and placeholder lists, so statements of one shape read the same."""
+    return _PLACEHOLDER_LIST.sub('(%s, ...)', _SPACE.sub(' ', sql).strip())
+
+
+def fingerprint(sql):
+    return hashlib.sha1(normalize(sql).encode()).hexdigest()[:12]
+
+
+def redact(value):
+    """
+    Keep what shapes a plan and drop what identifies people: numbers,
+    dates, booleans and None stay, strings become `<str:length>`.
+    """
+    if value is None or isinstance(value, (bool, int, float, Decimal, date, datetime)):
+        return value if not isinstance(value, Decimal) else str(value)
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, str):
+        return f'<str:{len(value)}>'
+    return f'<{type(value).__name__}>'
+
+
+class _RateLimit:
+    """At most `limit` events per minute, counted in fixed one-minute windows."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._window = 0
+        self._count = 0
+
+    def allow(self, limit):
+        window = int(time.monotonic() // 60)
+        with self._lock:
+            if window != self._window:
+                self._window, self._count = window, 0
+            if self._count >= limit:
+                return False
+            self._count += 1
+            return True
+
+
+def _explain(alias, sql, params):
+    """Plan of one statement as a list of row dicts, on this thread's own connection."""
+    connection = connections[alias]
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        connection.close()
+
+
+class _ExplainWorker:
+    """Background thread adding the plan to each queued record, then writing it."""
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, record, alias, sql, params):
+        with self._lock:
+            # Started lazily, and again in a forked worker, which does not inherit the thread
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='slow-query-explain', daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait((record, alias, sql, params))
+        except queue.Full:
+            record['explain_error'] = 'explain queue full'
+            _write(record)
+
+    def _run(self):
+        while True:
+            record, alias, sql, params = self._queue.get()
+            try:
+                record['explain'] = _explain(alias, sql, params)
+            except Exception as e:
+                record['explain_error'] = str(e)
+            _write(record)
+
+
+def _write(record):
+    logger.info("%s", json.dumps(record, default=str))
+
+
+_limit = _RateLimit()
+_worker = _ExplainWorker()
+
+
+class SlowQueryHook:
+    """
+    Execute wrapper recording the slow statements of one request; the
+    middleware installs it with `connection.execute_wrapper`.
+    """
+    def __init__(self, request):
+        self.request = request
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed = (time.perf_counter() - start) * 1000
+        if elapsed >= settings.SLOW_QUERY_MS > 0:
+            self.record(sql, params, many, context, elapsed)
+        return result
+
+    def record(self, sql, params, many, context, elapsed):
+        if random.random() >= settings.SLOW_QUERY_SAMPLE_RATE or not _limit.allow(settings.SLOW_QUERY_MAX_PER_MINUTE):
+            return
+        match = self.request.resolver_match
+        rowcount = context['cursor'].rowcount
+        record = {
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'view': match.view_name if match is not None else None,
+            'method': self.request.method,
+            'path': self.request.path,
+            'duration_ms': round(elapsed, 2),
+            'rows': rowcount if rowcount is not None and rowcount >= 0 else None,
+            'fingerprint': fingerprint(sql),
+            'sql': _SPACE.sub(' ', sql).strip(),
+            'params': f'<{len(params)} parameter sets>' if many else redact(params),
+        }
+        is_select = sql.lstrip().upper().startswith(('SELECT', 'WITH'))
+        if many or not is_select or not settings.SLOW_QUERY_EXPLAIN:
+            _write(record)
+            return
+        _worker.submit(record, context['connection'].alias, sql, params)
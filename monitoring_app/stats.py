@@ -0,0 +1,57 @@
+import math
+import threading
+from collections import defaultdict, deque
+from django.conf import settings
+
+_lock = threading.Lock()
+# View name to its latest samples: (total, db, app, render) in seconds, query count, status code
+_samples = defaultdict(lambda: deque(maxlen=settings.REQUEST_STATS_WINDOW))
+
+
+def record(view, timing, status_code):
+    """Add one finished request of `view` to its rolling window."""
+    sample = (timing.total, timing.db, timing.app, timing.render, timing.queries, status_code)
+    with _lock:
+        _samples[view].append(sample)
+
+
+def reset():
+    """Drop every sample."""
+    with _lock:
+        _samples.clear()
+
+
+def _percentile(ordered, fraction):
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def snapshot():
+    """
+    Summarize the rolling window of every view, slowest p95 first.
+
+    Figures are per process: each server worker keeps its own window.
+
+    Returns:
+        list: One dict per view with request count, latency percentiles,
+        mean time per phase (ms), mean and max queries and error count.
+    """
+    with _lock:
+        windows = {view: list(samples) for view, samples in _samples.items()}
+    rows = []
+    for view, samples in windows.items():
+        count = len(samples)
+        totals = sorted(sample[0] for sample in samples)
+        rows.append({
+            'view': view,
+            'requests': count,
+            'p50_ms': round(_percentile(totals, 0.50) * 1000, 2),
+            'p95_ms': round(_percentile(totals, 0.95) * 1000, 2),
+            'max_ms': round(totals[-1] * 1000, 2),
+            'db_ms': round(sum(sample[1] for sample in samples) / count * 1000, 2),
+            'app_ms': round(sum(sample[2] for sample in samples) / count * 1000, 2),
+            'render_ms': round(sum(sample[3] for sample in samples) / count * 1000, 2),
+            'queries': round(sum(sample[4] for sample in samples) / count, 1),
+            'max_queries': max(sample[4] for sample in samples),
+            'errors': sum(1 for sample in samples if sample[5] >= 500),
+        })
+    return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
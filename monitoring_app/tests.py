@@ -0,0 +1,43 @@
+from datetime import date
+from django.test import SimpleTestCase
+from .capture import anonymize, token
+
+TODAY = date(2026, 10, 19)
+
+
+class AnonymizeTests(SimpleTestCase):
+    def test_identifiers_become_stable_tokens(self):
+        self.assertEqual(anonymize('mio_id', 'M100', TODAY), token('mio', 'M100'))
+        self.assertEqual(anonymize('mio_id', 'M100', TODAY), anonymize('mio_id', 'M100', TODAY))
+        self.assertNotEqual(anonymize('mio_id', 'M100', TODAY), anonymize('mio_id', 'M101', TODAY))
+        self.assertRegex(anonymize('invoice_no', '5000000001', TODAY), r'^invoice:[0-9a-f]{12}$')
+
+    def test_personal_numbers_are_not_kept(self):
+        line = {'rel_mio_phone': '01711000000', 'rel_invoice_no': '9000123', 'rel_mio_name': 'Karim'}
+        anonymized = anonymize('', line, TODAY)
+        self.assertRegex(anonymized['rel_mio_phone'], r'^phone:[0-9a-f]{12}$')
+        self.assertRegex(anonymized['rel_invoice_no'], r'^rel_invoice:[0-9a-f]{12}$')
+        self.assertEqual(anonymized['rel_mio_name'], '<str:5>')
+        self.assertNotIn('01711000000', str(anonymized))
+
+    def test_numbers_kept_only_for_allowed_fields(self):
+        anonymized = anonymize('', {'pack_qty': 3, 'net_val': '12.50', 'page': '2', 'limit': 50, 'amount': 1234, 'code': '98765'}, TODAY)
+        self.assertEqual(anonymized, {'pack_qty': 3, 'net_val': '12.50', 'page': '2', 'limit': 50, 'amount': '<str:4>', 'code': '<str:5>'})
+
+    def test_dates_and_months_become_offsets(self):
+        self.assertEqual(anonymize('from_date', '2026-09-19', TODAY), 'date:-30')
+        self.assertEqual(anonymize('to_date', '2026-10-20', TODAY), 'date:1')
+        self.assertEqual(anonymize('from_month', '2025-12', TODAY), 'month:-10')
+        self.assertEqual(anonymize('from_date', '2026-02-30', TODAY), '<str:10>')
+
+    def test_enumerations_and_flags_kept(self):
+        self.assertEqual(anonymize('status', 'withdrawal_pending', TODAY), 'withdrawal_pending')
+        self.assertEqual(anonymize('gzip', '1', TODAY), '1')
+        self.assertEqual(anonymize('status', 'not an enum', TODAY), '<str:11>')
+        self.assertIs(anonymize('dry_run', True, TODAY), True)
+        self.assertIsNone(anonymize('da_id', None, TODAY))
+
+    def test_lists_and_nested_objects(self):
+        anonymized = anonymize('', {'da_ids': ['D1', 'D2'], 'items': [{'matnr': 'X1', 'unit_qty': 4}]}, TODAY)
+        self.assertEqual(anonymized['da_ids'], [token('da', 'D1'), token('da', 'D2')])
+        self.assertEqual(anonymized['items'], [{'matnr': token('material', 'X1'), 'unit_qty': 4}])
@@ -0,0 +1,41 @@
+import time
+
+
+class RequestTiming:
+    """
+    Where the time of one request went.
+
+    Doubles as the execute wrapper counting its queries and SQL time; the
+    middleware installs it with `connection.execute_wrapper` for the request.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.queries = 0
+        self.db = 0.0
+        self.render = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - start
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    @property
+    def app(self):
+        """Python time outside SQL and rendering: parsing, grouping and building the response data."""
+        return max(0.0, self.total - self.db - self.render)
+
+    def header(self):
+        """`Server-Timing` header value, durations in milliseconds."""
+        return (
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries", '
+            f'app;dur={self.app * 1000:.2f}, '
+            f'render;dur={self.render * 1000:.2f}, '
+            f'total;dur={self.total * 1000:.2f}'
+        )
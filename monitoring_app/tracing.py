@@ -0,0 +1,222 @@
+"""
+Minimal in-process tracing, written as OpenTelemetry (OTLP/JSON) traces to
+`logs/traces.jsonl` (one `ExportTraceServiceRequest` per line) through the
+`monitoring_app.tracing` logger; no collector needed. The file loads in any
+OTLP/JSON aware viewer, or replays into a collector's `otlpjsonfile` receiver.
+
+`TracingMiddleware` decides per request whether to trace it (head
+sampling): a `traceparent` header's sampled flag when there is one,
+`TRACE_SAMPLE_RATE` otherwise. Traced requests get a root span, spans for
+the middleware and URL resolution, the view, each SQL statement and the
+rendering, and whatever the view marks as a stage of its own. `span()`
+times a block, `traced()` a single call, and `start_span()` a run of
+statements up to its `finish()`, so that a stage can be marked without
+reindenting the code it covers:
+
+    with span('query') as current, connection.cursor() as cursor:
+        ...
+        current.set('rows', len(rows))
+    group = start_span('group', rows=len(rows))
+    ...
+    group.finish()
+    results = traced('paginate', paginate, data_list, page=page, per_page=page_size)
+
+Each costs one context variable lookup when the request is not traced.
+"""
+import json
+import logging
+import random
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+
+logger = logging.getLogger("monitoring_app.tracing")
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+STATUS_ERROR = 2
+SERVICE_NAME = 'expire-product-api'
+STATEMENT_LIMIT = 2000
+
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+_SPACE = re.compile(r'\s+')
+_active = ContextVar('monitoring_app_span', default=None)
+
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        typed = {'boolValue': value}
+    elif isinstance(value, int):
+        typed = {'intValue': str(value)}
+    elif isinstance(value, float):
+        typed = {'doubleValue': value}
+    else:
+        typed = {'stringValue': str(value)}
+    return {'key': key, 'value': typed}
+
+
+class Span:
+    """One timed operation of a trace; `set` adds an attribute."""
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'kind', 'start', 'end', 'attributes', 'error')
+
+    def __init__(self, trace, name, kind, parent_id, attributes):
+        self.trace = trace
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end = None
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self):
+        if self.end is None:
+            self.end = time.time_ns()
+
+    def to_otlp(self):
+        data = {
+            'traceId': self.trace.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start),
+            'endTimeUnixNano': str(self.end or time.time_ns()),
+            'attributes': [_attribute(key, value) for key, value in self.attributes.items()],
+        }
+        if self.parent_id:
+            data['parentSpanId'] = self.parent_id
+        if self.error:
+            data['status'] = {'code': STATUS_ERROR, 'message': self.error}
+        return data
+
+
+class _NoSpan:
+    """Stands in for a span when the request is not traced."""
+    def set(self, key, value):
+        pass
+
+    def finish(self):
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+
+class Trace:
+    """The spans of one traced request, at most `TRACE_MAX_SPANS`."""
+    def __init__(self, trace_id=None):
+        self.trace_id = trace_id or f'{random.getrandbits(128):032x}'
+        self.spans = []
+        self.dropped = 0
+
+    def start(self, name, kind=INTERNAL, parent_id=None, **attributes):
+        """Start a span, or return None once the trace is full."""
+        if len(self.spans) >= settings.TRACE_MAX_SPANS:
+            self.dropped += 1
+            return None
+        current = Span(self, name, kind, parent_id, attributes)
+        self.spans.append(current)
+        return current
+
+    def export(self):
+        """Write the trace to the trace file as one OTLP/JSON line."""
+        if self.dropped:
+            self.spans[0].set('dropped_spans', self.dropped)
+        payload = {'resourceSpans': [{
+            'resource': {'attributes': [_attribute('service.name', SERVICE_NAME)]},
+            'scopeSpans': [{
+                'scope': {'name': __name__},
+                'spans': [current.to_otlp() for current in self.spans],
+            }],
+        }]}
+        logger.info("%s", json.dumps(payload, separators=(',', ':')))
+
+
+def active():
+    """The span the current code runs in, or None when the request is not traced."""
+    return _active.get()
+
+
+def activate(current):
+    """Make `current` the active span; returns the token to restore the previous one with."""
+    return _active.set(current)
+
+
+def restore(token):
+    _active.reset(token)
+
+
+@contextmanager
+def span(name, kind=INTERNAL, **attributes):
+    """Time the block as a child of the active span; a no-op when the request is not traced."""
+    parent = _active.get()
+    current = parent.trace.start(name, kind, parent.span_id, **attributes) if parent is not None else None
+    if current is None:
+        yield NO_SPAN
+        return
+    token = _active.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.error = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        current.finish()
+        _active.reset(token)
+
+
+def start_span(name, kind=INTERNAL, **attributes):
+    """
+    Start a child of the active span without making it the active one;
+    the caller ends it with `finish()`. A span left open by an exception
+    ends when the trace is exported.
+
+    Returns:
+        Span: the started span, or `NO_SPAN` when the request is not traced.
+    """
+    parent = _active.get()
+    current = parent.trace.start(name, kind, parent.span_id, **attributes) if parent is not None else None
+    return current if current is not None else NO_SPAN
+
+
+def traced(name, func, *args, **kwargs):
+    """Call `func(*args, **kwargs)` inside a span named `name` and return its result."""
+    if _active.get() is None:
+        return func(*args, **kwargs)
+    with span(name):
+        return func(*args, **kwargs)
+
+
+def head_sample(traceparent):
+    """
+    Decide whether to trace a request.
+
+    Returns:
+        tuple: (sampled, trace id, remote parent span id); the ids are None
+        unless a valid `traceparent` header carried them.
+    """
+    match = _TRACEPARENT.match(traceparent or '')
+    if match:
+        trace_id, parent_id, flags = match.groups()
+        return bool(int(flags, 16) & 1), trace_id, parent_id
+    return random.random() < settings.TRACE_SAMPLE_RATE, None, None
+
+
+def sql_span(execute, sql, params, many, context):
+    """Execute wrapper timing each statement as a client span of the active span."""
+    parent = _active.get()
+    if parent is None:
+        return execute(sql, params, many, context)
+    statement = _SPACE.sub(' ', sql).strip()
+    operation = statement.split(' ', 1)[0].upper()
+    with span(operation, CLIENT, **{
+        'db.system': context['connection'].vendor,
+        'db.statement': statement[:STATEMENT_LIMIT],
+    }):
+        return execute(sql, params, many, context)
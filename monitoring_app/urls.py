@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import RequestStatsView, metrics_view
+
+urlpatterns = [
+    path('api/v1/_stats', RequestStatsView.as_view(), name='request_stats'),
+    path('metrics', metrics_view, name='metrics'),
+]
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+from . import metrics, stats
+
+
+class RequestStatsView(APIView):
+    """
+    Rolling per-view request statistics of this server process, slowest
+    p95 first: latency percentiles, mean SQL, Python and render time, and
+    query counts. Staff only. `DELETE` clears the window.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({"success": True, "data": stats.snapshot()})
+
+    def delete(self, request):
+        stats.reset()
+        return Response({"success": True, "message": "Request stats cleared."})
+
+
+def metrics_view(request):
+    """
+    All metrics in the Prometheus text format, summed over the server's
+    worker processes. Requires `Authorization: Bearer <METRICS_TOKEN>` when
+    `METRICS_TOKEN` is set.
+    """
+    if settings.METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {settings.METRICS_TOKEN}':
+        return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    return HttpResponse(metrics.registry.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,87 @@
+import logging
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from withdrawal_app.models import WithdrawalTransition
+from .models import ConsumerCheckpoint
+from .visibility import advance, current_position, prune, unread
+
+# Set logger
+logger = logging.getLogger("outbox_app")
+
+
+class TransitionConsumer:
+    """
+    Base class of a transition log consumer.
+
+    Subclasses set `name` and implement `handle`, which gets the next batch
+    of transitions in id order; a transition that commits late, behind
+    the checkpoint, comes in a later batch (see `outbox_app.visibility`).
+    Each batch runs in one transaction with the checkpoint update, so a
+    failed batch is retried whole on the next run. Override `reset` to
+    rebuild the derived data from scratch; it returns the log position the
+    rebuilt state is current up to, usually `current_position()` read
+    before the data it rebuilds from.
+    """
+    name = None
+    batch_size = 500
+
+    def handle(self, transitions):
+        raise NotImplementedError
+
+    def reset(self):
+        return current_position()
+
+    def pending(self, position):
+        """Return the next batch of transitions not read yet from `position`, in id order."""
+        return list(WithdrawalTransition.objects.filter(unread(position)).order_by('id')[:self.batch_size])
+
+    def run_once(self):
+        """
+        Process one batch.
+
+        Returns:
+            int: The number of transitions processed.
+        """
+        with transaction.atomic():
+            ConsumerCheckpoint.objects.get_or_create(name=self.name)
+            checkpoint = ConsumerCheckpoint.objects.select_for_update().get(name=self.name)
+            position = prune(checkpoint.position)
+            transitions = self.pending(position)
+            if transitions:
+                self.handle(transitions)
+            position = advance(position, [transition.id for transition in transitions])
+            if position != checkpoint.position:
+                checkpoint.position = position
+                checkpoint.save(update_fields=['last_id', 'gaps', 'updated_at'])
+        return len(transitions)
+
+    def run(self):
+        """
+        Process batches until caught up.
+
+        Returns:
+            int: The number of transitions processed.
+        """
+        total = 0
+        while True:
+            count = self.run_once()
+            total += count
+            if count < self.batch_size:
+                return total
+
+    def rebuild(self):
+        """Rebuild the derived data with `reset` and move the checkpoint to where it leaves off."""
+        with transaction.atomic():
+            ConsumerCheckpoint.objects.get_or_create(name=self.name)
+            checkpoint = ConsumerCheckpoint.objects.select_for_update().get(name=self.name)
+            checkpoint.position = self.reset()
+            checkpoint.save(update_fields=['last_id', 'gaps', 'updated_at'])
+        logger.info("Consumer %s rebuilt up to transition %s", self.name, checkpoint.last_id)
+        return checkpoint.last_id
+
+
+def load_consumers():
+    """Instantiate the consumers listed in `OUTBOX_CONSUMERS`, keyed by name."""
+    consumers = [import_string(path)() for path in settings.OUTBOX_CONSUMERS]
+    return {consumer.name: consumer for consumer in consumers}
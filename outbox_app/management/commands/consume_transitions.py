@@ -0,0 +1,37 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from outbox_app.consumers import load_consumers
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the transition log consumers (OUTBOX_CONSUMERS) from their checkpoints, "
+        "once or in a loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--consumer', action='append', dest='names', help="Only run this consumer; repeat for more.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting once caught up.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --loop.")
+        parser.add_argument('--rebuild', action='store_true', help="Rebuild the consumers' data from scratch first.")
+
+    def handle(self, *args, **options):
+        consumers = load_consumers()
+        names = options['names'] or list(consumers)
+        unknown = [name for name in names if name not in consumers]
+        if unknown:
+            raise CommandError(f"Unknown consumers: {', '.join(unknown)}. Known: {', '.join(consumers) or 'none'}.")
+
+        if options['rebuild']:
+            for name in names:
+                last_id = consumers[name].rebuild()
+                self.stdout.write(f"{name}: rebuilt up to transition {last_id}")
+        while True:
+            for name in names:
+                count = consumers[name].run()
+                if count or not options['loop']:
+                    self.stdout.write(f"{name}: processed {count} transitions")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS("Consumers caught up."))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-19 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Consumer Checkpoint',
+                'verbose_name_plural': 'Consumer Checkpoints',
+                'db_table': 'expr_outbox_checkpoint',
+            },
+        ),
+    ]
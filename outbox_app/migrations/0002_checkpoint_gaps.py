@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-20 00:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consumercheckpoint',
+            name='gaps',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import models
+from .visibility import Gap, Position
+
+# Create your models here.
+class ConsumerCheckpoint(models.Model):
+    """
+    Model representing how far one consumer has read the transition log.
+
+    `last_id` is the id of the last `WithdrawalTransition` the consumer has
+    fully processed and `gaps` the id ranges below it that were not visible
+    yet, as `[low, high, noticed]` lists (see `outbox_app.visibility`). Both
+    are advanced in the same transaction as the consumer's own writes, so a
+    transition is applied once; one whose commit comes later than
+    `OUTBOX_GAP_SECONDS` after its gap was noticed is never applied.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    gaps = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def position(self):
+        return Position(self.last_id, tuple(Gap(*gap) for gap in self.gaps))
+
+    @position.setter
+    def position(self, position):
+        self.last_id = position.last_id
+        self.gaps = [list(gap) for gap in position.gaps]
+
+    def __str__(self):
+        return f'{self.name} @ {self.last_id}'
+
+    class Meta:
+        db_table = 'expr_outbox_checkpoint'
+        verbose_name = 'Consumer Checkpoint'
+        verbose_name_plural = 'Consumer Checkpoints'
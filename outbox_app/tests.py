@@ -0,0 +1,64 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+from report_app.consumers import StatusCountConsumer
+from report_app.models import InvoiceStatusCount
+from withdrawal_app.models import WithdrawalInfo, WithdrawalTransition
+from .models import ConsumerCheckpoint
+from .visibility import Gap, Position, advance, prune
+
+Status = WithdrawalInfo.Status
+
+
+class AdvanceTests(SimpleTestCase):
+    def test_skipped_ids_open_a_gap(self):
+        position = advance(Position(0, ()), [1, 2, 5, 6], now=100)
+        self.assertEqual(position, Position(6, (Gap(3, 4, 100),)))
+
+    def test_late_ids_close_the_gap(self):
+        position = Position(9, (Gap(3, 7, 100),))
+        self.assertEqual(advance(position, [5], now=200), Position(9, (Gap(3, 4, 100), Gap(6, 7, 100))))
+        self.assertEqual(advance(position, [3, 4, 5, 6, 7, 10], now=200), Position(10, ()))
+
+    @override_settings(OUTBOX_GAP_SECONDS=60)
+    def test_prune_gives_up_old_gaps(self):
+        position = Position(9, (Gap(2, 2, 100), Gap(5, 5, 150)))
+        with self.assertLogs('outbox_app', 'WARNING'):
+            self.assertEqual(prune(position, now=170), Position(9, (Gap(5, 5, 150),)))
+
+
+class StatusCountConsumerTests(TestCase):
+    def log(self, id_, invoice_id, from_status, to_status):
+        WithdrawalTransition.objects.create(
+            id=id_, invoice_id=invoice_id, invoice_no=f'INV{invoice_id}', from_status=from_status,
+            to_status=to_status, mio_id='M1', rm_id='R1', depot_id='D1',
+        )
+
+    def counts(self):
+        return dict(InvoiceStatusCount.objects.filter(invoices__gt=0).values_list('status', 'invoices'))
+
+    def test_late_commit_behind_the_checkpoint_is_applied_once(self):
+        consumer = StatusCountConsumer()
+        self.log(1, 1, '', Status.REQUEST_PENDING)
+        self.log(2, 2, '', Status.REQUEST_PENDING)
+        self.log(4, 1, Status.REQUEST_PENDING, Status.REQUEST_APPROVED)
+        self.assertEqual(consumer.run(), 3)
+        checkpoint = ConsumerCheckpoint.objects.get(name=consumer.name)
+        self.assertEqual(checkpoint.last_id, 4)
+        self.assertEqual([gap[:2] for gap in checkpoint.gaps], [[3, 3]])
+
+        # Id 3 commits after id 4 was read
+        self.log(3, 2, Status.REQUEST_PENDING, Status.REQUEST_APPROVED)
+        self.assertEqual(consumer.run(), 1)
+        self.assertEqual(consumer.run(), 0)
+        self.assertEqual(self.counts(), {Status.REQUEST_APPROVED: 2})
+        checkpoint.refresh_from_db()
+        self.assertEqual((checkpoint.last_id, checkpoint.gaps), (4, []))
+
+    @override_settings(OUTBOX_GAP_SECONDS=0)
+    def test_gap_is_given_up_after_the_timeout(self):
+        consumer = StatusCountConsumer()
+        self.log(1, 1, '', Status.REQUEST_PENDING)
+        self.log(3, 2, '', Status.REQUEST_PENDING)
+        consumer.run()
+        with self.assertLogs('outbox_app', 'WARNING'):
+            consumer.run()
+        self.assertEqual(ConsumerCheckpoint.objects.get(name=consumer.name).gaps, [])
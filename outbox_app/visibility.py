@@ -0,0 +1,106 @@
+"""
+Reading the transition log in id order without losing slow commits.
+
+Ids are allocated at insert but become visible at commit, so a reader that
+has seen id 12 can find id 11 committed later. A reader's `Position` is
+therefore the last id it has read plus the gaps below it: id ranges it
+passed over that were not visible yet. `unread()` selects the rows after
+the last id and the rows inside the gaps, so a late commit is read as soon
+as it is visible; `advance()` moves the position over the ids read. The
+delta sync feed reads its tombstones the same way.
+
+A gap is given up `OUTBOX_GAP_SECONDS` after it was noticed, with a
+warning: its ids belong to rolled back transactions, ids the database
+skipped, or a transaction open for longer than that, whose rows are then
+never read. Keep the setting above the longest transition transaction.
+"""
+import logging
+import time
+from collections import namedtuple
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+from withdrawal_app.models import WithdrawalTransition
+
+logger = logging.getLogger("outbox_app")
+
+# Ids low..high (inclusive) not visible yet, noticed at `noticed` (epoch seconds)
+Gap = namedtuple('Gap', ['low', 'high', 'noticed'])
+Position = namedtuple('Position', ['last_id', 'gaps'])
+
+
+def prune(position, now=None):
+    """Return `position` without the gaps open for longer than `OUTBOX_GAP_SECONDS`."""
+    now = time.time() if now is None else now
+    gaps = []
+    for gap in position.gaps:
+        if now - gap.noticed >= settings.OUTBOX_GAP_SECONDS:
+            logger.warning("Transitions %s-%s never became visible; giving them up", gap.low, gap.high)
+        else:
+            gaps.append(gap)
+    return Position(position.last_id, tuple(gaps))
+
+
+def unread(position):
+    """Return the filter matching the transitions not read yet from `position`."""
+    condition = Q(id__gt=position.last_id)
+    for gap in position.gaps:
+        condition |= Q(id__range=(gap.low, gap.high))
+    return condition
+
+
+def advance(position, ids, now=None):
+    """
+    Move `position` over `ids`, the ids read from `unread(position)` in ascending order.
+
+    Ids past the last id open a gap for the ones skipped; ids inside a gap
+    close that part of it.
+    """
+    now = time.time() if now is None else now
+    last_id = position.last_id
+    gaps = list(position.gaps)
+    for id_ in ids:
+        if id_ > last_id:
+            if id_ > last_id + 1:
+                gaps.append(Gap(last_id + 1, id_ - 1, now))
+            last_id = id_
+            continue
+        for index, gap in enumerate(gaps):
+            if gap.low <= id_ <= gap.high:
+                pieces = [Gap(gap.low, id_ - 1, gap.noticed), Gap(id_ + 1, gap.high, gap.noticed)]
+                gaps[index:index + 1] = [piece for piece in pieces if piece.low <= piece.high]
+                break
+    return Position(last_id, tuple(gaps))
+
+
+def current_position(model=WithdrawalTransition, created_field='created_at'):
+    """
+    Return the position of a reader that has read everything visible now.
+
+    Missing ids among the rows written in the last `OUTBOX_GAP_SECONDS` are
+    gaps, so a transaction still open is read once it commits.
+
+    Args:
+        model: The append-only model read, the transition log by default.
+        created_field (str): Its insert time column.
+    """
+    window = timezone.now() - timedelta(seconds=settings.OUTBOX_GAP_SECONDS)
+    before = model.objects.filter(**{f'{created_field}__lt': window}).aggregate(latest=Max('id'))['latest'] or 0
+    recent = model.objects.filter(id__gt=before).order_by('id').values_list('id', flat=True)
+    return advance(Position(before, ()), list(recent))
+
+def encode_position(position):
+    """Encode `position` as a token: the last id, then `low-high@noticed` per gap, dot separated."""
+    return '.'.join([str(position.last_id), *(f'{gap.low}-{gap.high}@{gap.noticed:.0f}' for gap in position.gaps)])
+
+
+def decode_position(token):
+    """Decode a token from `encode_position`; raises ValueError when malformed."""
+    last_id, *parts = token.split('.')
+    gaps = []
+    for part in parts:
+        span, noticed = part.split('@')
+        low, high = span.split('-')
+        gaps.append(Gap(int(low), int(high), int(noticed)))
+    return Position(int(last_id), tuple(gaps))
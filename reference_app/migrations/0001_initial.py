@@ -0,0 +1,101 @@
+# Generated by Django 5.2 on 2026-10-19 23:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Customer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('partner', models.CharField(max_length=40, unique=True)),
+                ('name1', models.CharField(blank=True, max_length=100, null=True)),
+                ('name2', models.CharField(blank=True, max_length=100, null=True)),
+                ('contact_person', models.CharField(blank=True, max_length=100, null=True)),
+                ('mobile_no', models.CharField(blank=True, max_length=20, null=True)),
+                ('street', models.CharField(blank=True, max_length=100, null=True)),
+                ('street1', models.CharField(blank=True, max_length=100, null=True)),
+                ('street2', models.CharField(blank=True, max_length=100, null=True)),
+                ('street3', models.CharField(blank=True, max_length=100, null=True)),
+                ('post_code', models.CharField(blank=True, max_length=10, null=True)),
+                ('upazilla', models.CharField(blank=True, max_length=50, null=True)),
+                ('district', models.CharField(blank=True, max_length=50, null=True)),
+                ('trans_p_zone', models.CharField(blank=True, max_length=20, null=True)),
+            ],
+            options={
+                'db_table': 'rpl_customer',
+            },
+        ),
+        migrations.CreateModel(
+            name='DepotUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sap_id', models.CharField(max_length=40, unique=True)),
+                ('full_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('mobile_number', models.CharField(blank=True, max_length=20, null=True)),
+            ],
+            options={
+                'db_table': 'rdl_users_list',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserList',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('work_area_t', models.CharField(max_length=40, unique=True)),
+                ('parent_work_area_t', models.CharField(blank=True, max_length=40, null=True)),
+                ('name', models.CharField(blank=True, max_length=100, null=True)),
+                ('mobile_number', models.CharField(blank=True, max_length=20, null=True)),
+            ],
+            options={
+                'db_table': 'rpl_user_list',
+            },
+        ),
+        migrations.CreateModel(
+            name='Material',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matnr', models.CharField(max_length=40)),
+                ('plant', models.CharField(max_length=4)),
+                ('sales_org', models.CharField(max_length=4)),
+                ('dis_channel', models.CharField(max_length=2)),
+                ('material_name', models.CharField(blank=True, max_length=40, null=True)),
+                ('producer_company', models.CharField(blank=True, max_length=3, null=True)),
+                ('team1', models.CharField(blank=True, max_length=3, null=True)),
+                ('pack_size', models.TextField(blank=True, null=True)),
+                ('unit_tp', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('unit_vat', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('mrp', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('brand_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('brand_description', models.CharField(blank=True, max_length=255, null=True)),
+                ('active', models.CharField(blank=True, max_length=1, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'rpl_material',
+                'unique_together': {('matnr', 'plant', 'sales_org', 'dis_channel')},
+            },
+        ),
+        migrations.CreateModel(
+            name='RouteWiseDepot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depot_code', models.CharField(max_length=40)),
+                ('depot_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('route_code', models.CharField(max_length=40)),
+                ('route_name', models.CharField(blank=True, max_length=100, null=True)),
+            ],
+            options={
+                'db_table': 'rdl_route_wise_depot',
+                'indexes': [models.Index(fields=['depot_code', 'route_code'], name='rdl_rwd_depot_route_idx'), models.Index(fields=['route_code'], name='rdl_rwd_route_idx')],
+            },
+        ),
+    ]
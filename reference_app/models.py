@@ -0,0 +1,87 @@
+from django.db import models
+
+# Stand-ins for the reference tables the raw SQL joins against. In production
+# they belong to other systems and are never migrated from here; this app is
+# only installed by `expire_product_api.local_settings`, so local benchmarks
+# and tests get the same tables on SQLite. Only the columns the API reads.
+
+class Customer(models.Model):
+    """Stand-in for `rpl_customer`: one row per pharmacy (partner)."""
+    partner = models.CharField(max_length=40, unique=True)
+    name1 = models.CharField(max_length=100, blank=True, null=True)
+    name2 = models.CharField(max_length=100, blank=True, null=True)
+    contact_person = models.CharField(max_length=100, blank=True, null=True)
+    mobile_no = models.CharField(max_length=20, blank=True, null=True)
+    street = models.CharField(max_length=100, blank=True, null=True)
+    street1 = models.CharField(max_length=100, blank=True, null=True)
+    street2 = models.CharField(max_length=100, blank=True, null=True)
+    street3 = models.CharField(max_length=100, blank=True, null=True)
+    post_code = models.CharField(max_length=10, blank=True, null=True)
+    upazilla = models.CharField(max_length=50, blank=True, null=True)
+    district = models.CharField(max_length=50, blank=True, null=True)
+    # Route code left-padded with '0000'
+    trans_p_zone = models.CharField(max_length=20, blank=True, null=True)
+
+    class Meta:
+        db_table = 'rpl_customer'
+
+
+class UserList(models.Model):
+    """Stand-in for `rpl_user_list`: MIOs, RMs and above, keyed by work area."""
+    work_area_t = models.CharField(max_length=40, unique=True)
+    # Named after the default HIERARCHY_PARENT_COLUMN
+    parent_work_area_t = models.CharField(max_length=40, blank=True, null=True)
+    name = models.CharField(max_length=100, blank=True, null=True)
+    mobile_number = models.CharField(max_length=20, blank=True, null=True)
+
+    class Meta:
+        db_table = 'rpl_user_list'
+
+
+class RouteWiseDepot(models.Model):
+    """Stand-in for `rdl_route_wise_depot`: the routes of each depot."""
+    depot_code = models.CharField(max_length=40)
+    depot_name = models.CharField(max_length=100, blank=True, null=True)
+    route_code = models.CharField(max_length=40)
+    route_name = models.CharField(max_length=100, blank=True, null=True)
+
+    class Meta:
+        db_table = 'rdl_route_wise_depot'
+        indexes = [
+            models.Index(fields=['depot_code', 'route_code'], name='rdl_rwd_depot_route_idx'),
+            models.Index(fields=['route_code'], name='rdl_rwd_route_idx'),
+        ]
+
+
+class DepotUser(models.Model):
+    """Stand-in for `rdl_users_list`: depot staff (DAs), keyed by SAP id."""
+    sap_id = models.CharField(max_length=40, unique=True)
+    full_name = models.CharField(max_length=100, blank=True, null=True)
+    mobile_number = models.CharField(max_length=20, blank=True, null=True)
+
+    class Meta:
+        db_table = 'rdl_users_list'
+
+
+class Material(models.Model):
+    """Managed twin of the unmanaged `material_app.RplMaterial` (`rpl_material`)."""
+    matnr = models.CharField(max_length=40)
+    plant = models.CharField(max_length=4)
+    sales_org = models.CharField(max_length=4)
+    dis_channel = models.CharField(max_length=2)
+    material_name = models.CharField(max_length=40, blank=True, null=True)
+    producer_company = models.CharField(max_length=3, blank=True, null=True)
+    team1 = models.CharField(max_length=3, blank=True, null=True)
+    pack_size = models.TextField(blank=True, null=True)
+    unit_tp = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    unit_vat = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    mrp = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    brand_name = models.CharField(max_length=255, blank=True, null=True)
+    brand_description = models.CharField(max_length=255, blank=True, null=True)
+    active = models.CharField(max_length=1, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'rpl_material'
+        unique_together = (('matnr', 'plant', 'sales_org', 'dis_channel'),)
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from material_app.prices import price_table
+from monitoring_app.metrics import cached
+
+PICKLIST_SQL = """
+SELECT wi.route_id, rl.matnr, SUM(rl.pack_qty) AS pack_qty, SUM(rl.unit_qty) AS unit_qty,
+       COUNT(DISTINCT wi.id) AS invoices
+FROM expr_replacement_list rl
+INNER JOIN expr_withdrawal_info wi ON wi.id = rl.invoice_id
+WHERE wi.depot_id = %s AND wi.last_status = 'delivery_pending' {route_filter}
+GROUP BY wi.route_id, rl.matnr
+ORDER BY wi.route_id, rl.matnr
+"""
+
+
+def _version_key(depot_id):
+    return f'replacement_app:picklist:{depot_id}:version'
+
+
+def invalidate_picklist(depot_id):
+    """
+    Drop the cached pick-lists of a depot once the current transaction commits.
+
+    Bumping the depot's version orphans every cached route variant at once;
+    they expire on their own after `PICKLIST_CACHE_TIMEOUT`. The bump only
+    reaches other worker processes when `CACHE_URL` names a shared cache;
+    with the default per-process cache they keep their copy until it expires.
+    """
+    def bump():
+        try:
+            cache.incr(_version_key(depot_id))
+        except ValueError:
+            cache.set(_version_key(depot_id), 1, timeout=None)
+    transaction.on_commit(bump)
+
+
+def load_picklist(depot_id, route_id=None):
+    """
+    Sum pack and unit quantities per route and material over the depot's
+    `delivery_pending` invoices, in one GROUP BY query.
+
+    Returns:
+        list: One dict per route with its material lines, each counting the invoices it is on.
+    """
+    params = [depot_id]
+    route_filter = ""
+    if route_id:
+        route_filter = "AND wi.route_id = %s"
+        params.append(route_id)
+    with connection.cursor() as cursor:
+        cursor.execute(PICKLIST_SQL.format(route_filter=route_filter), params)
+        rows = cursor.fetchall()
+
+    prices = price_table()
+    routes = {}
+    for route, matnr, pack_qty, unit_qty, invoices in rows:
+        entry = routes.setdefault(route, {"route_id": route, "materials": []})
+        material = prices.get(matnr)
+        entry["materials"].append({
+            "matnr": matnr,
+            "material_name": material.material_name if material else "",
+            "pack_qty": int(pack_qty or 0),
+            "unit_qty": int(unit_qty or 0),
+            "invoices": invoices,
+        })
+    return list(routes.values())
+
+
+def depot_picklist(depot_id, route_id=None):
+    """Return the pick-list of a depot (or one of its routes), cached for `PICKLIST_CACHE_TIMEOUT` seconds."""
+    version = cache.get(_version_key(depot_id), 0)
+    key = f'replacement_app:picklist:{depot_id}:{route_id or "*"}:{version}'
+    return cached('picklist', key, lambda: load_picklist(depot_id, route_id), settings.PICKLIST_CACHE_TIMEOUT)
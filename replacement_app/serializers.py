@@ -15,7 +15,7 @@ class WithdrawalListSerializer(serializers.ModelSerializer):
 
 class AvailableReplacementListSerializer(serializers.ModelSerializer):
     total_amount = serializers.DecimalField(
-        max_digits=12, decimal_places=2, read_only=True
+        source='withdrawal_total', max_digits=12, decimal_places=2, read_only=True
     )
     request_list = RequestListSerializer(many=True, read_only = True)
     withdrawal_list = WithdrawalListSerializer(many=True, read_only = True)
@@ -28,6 +28,10 @@ class AvailableReplacementListSerializer(serializers.ModelSerializer):
         read_only_fields = ['total_amount']  
 
 class ReplacementListSerializer(serializers.ModelSerializer):
+    pack_qty = serializers.IntegerField(min_value=0, default=0)
+    unit_qty = serializers.IntegerField(min_value=0, default=0)
+    # Valued server-side from the material price table; any client value is ignored
+    net_val = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     material_name = serializers.CharField(max_length=150, default="", read_only=True)
     strip_qty = serializers.CharField(max_length=2, default=0, read_only=True)
     expire_date = serializers.DateField(default=date.today(),read_only=True) 
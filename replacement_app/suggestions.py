@@ -0,0 +1,80 @@
+from withdrawal_app.money import line_paisa
+
+
+def _units_for(price, budget):
+    """
+    Return the most sellable units of a material whose line value fits `budget` paisa.
+
+    A unit is a loose unit when the pack size is known, a whole pack otherwise.
+    The count is derived from the unrounded unit price, then stepped down
+    while the rounded line value still overshoots.
+    """
+    if budget <= 0:
+        return 0
+    units = price.units_per_pack or 1
+    count = budget * units // price.pack_paisa
+    while count > 0 and _value(price, count) > budget:
+        count -= 1
+    return count
+
+
+def _value(price, count):
+    units = price.units_per_pack or 1
+    return line_paisa(price.pack_paisa, units, count // units, count % units)
+
+
+def suggest_mix(target, weights, prices):
+    """
+    Propose replacement quantities worth at most `target`, as close to it as possible.
+
+    Bounded greedy in two passes, each visiting every candidate once:
+    first each material gets its share of the target in proportion to its
+    weight (the value withdrawn of it), then what is left is topped up with
+    loose units, most expensive unit first, so the remainder ends up below
+    the cheapest unit price. Runs in O(n log n) for n candidates, in integer
+    paisa throughout.
+
+    Args:
+        target (int): Value to fill, in paisa.
+        weights (dict): Material number to weight (int); only priced materials are used.
+        prices (dict): Material number to `MaterialPrice`.
+
+    Returns:
+        tuple: (lines, total) where lines are dicts with `matnr`, `material_name`,
+        `pack_qty`, `unit_qty` and `net_val` (paisa), and total their summed value.
+    """
+    candidates = [matnr for matnr in weights if matnr in prices and prices[matnr].pack_paisa > 0]
+    if not candidates or target <= 0:
+        return [], 0
+    total_weight = sum(weights[matnr] for matnr in candidates)
+    counts = dict.fromkeys(candidates, 0)
+    values = dict.fromkeys(candidates, 0)
+
+    for matnr in candidates:
+        share = target * weights[matnr] // total_weight if total_weight else target // len(candidates)
+        counts[matnr] = _units_for(prices[matnr], share)
+        values[matnr] = _value(prices[matnr], counts[matnr]) if counts[matnr] else 0
+
+    left = target - sum(values.values())
+    by_unit_price = sorted(candidates, key=lambda m: prices[m].pack_paisa / (prices[m].units_per_pack or 1), reverse=True)
+    for matnr in by_unit_price:
+        price = prices[matnr]
+        count = _units_for(price, values[matnr] + left)
+        if count > counts[matnr]:
+            value = _value(price, count)
+            left -= value - values[matnr]
+            counts[matnr], values[matnr] = count, value
+
+    lines = []
+    for matnr in candidates:
+        if not counts[matnr]:
+            continue
+        units = prices[matnr].units_per_pack or 1
+        lines.append({
+            'matnr': matnr,
+            'material_name': prices[matnr].material_name,
+            'pack_qty': counts[matnr] // units,
+            'unit_qty': counts[matnr] % units,
+            'net_val': values[matnr],
+        })
+    return lines, target - left
@@ -1,3 +1,53 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
+from material_app.prices import MaterialPrice
+from withdrawal_app.money import line_paisa
+from .suggestions import suggest_mix
 
-# Create your tests here.
+PRICES = {
+    'M1': MaterialPrice('M1', 'Tablet 10s', 10000, 10),
+    'M2': MaterialPrice('M2', 'Syrup', 4550, None),
+    'M3': MaterialPrice('M3', 'Capsule 3x10s', 9000, 30),
+}
+
+
+class SuggestMixTests(SimpleTestCase):
+    def assertConsistent(self, lines, total):
+        for line in lines:
+            price = PRICES[line['matnr']]
+            self.assertEqual(line['net_val'], line_paisa(price.pack_paisa, price.units_per_pack or 1, line['pack_qty'], line['unit_qty']))
+            self.assertLess(line['unit_qty'], price.units_per_pack or 1)
+        self.assertEqual(total, sum(line['net_val'] for line in lines))
+
+    def test_never_exceeds_the_target(self):
+        for target in [1, 299, 1000, 4549, 4550, 12345, 100000, 987654]:
+            lines, total = suggest_mix(target, {'M1': 3, 'M2': 1, 'M3': 2}, PRICES)
+            self.assertLessEqual(total, target)
+            self.assertConsistent(lines, total)
+
+    def test_remainder_is_below_the_cheapest_unit(self):
+        target = 123457
+        lines, total = suggest_mix(target, {'M1': 1, 'M2': 1, 'M3': 1}, PRICES)
+        # Cheapest unit is M3's 3.00 taka
+        self.assertLess(target - total, 300)
+
+    def test_exact_fill(self):
+        lines, total = suggest_mix(20000, {'M1': 1}, PRICES)
+        self.assertEqual(total, 20000)
+        self.assertEqual(lines, [{'matnr': 'M1', 'material_name': 'Tablet 10s', 'pack_qty': 2, 'unit_qty': 0, 'net_val': 20000}])
+
+    def test_whole_packs_without_a_pack_size(self):
+        lines, total = suggest_mix(10000, {'M2': 1}, PRICES)
+        self.assertEqual((lines[0]['pack_qty'], lines[0]['unit_qty'], total), (2, 0, 9100))
+
+    def test_no_candidates(self):
+        self.assertEqual(suggest_mix(10000, {'M9': 1}, PRICES), ([], 0))
+        self.assertEqual(suggest_mix(0, {'M1': 1}, PRICES), ([], 0))
+        self.assertEqual(suggest_mix(10000, {'M1': 1}, {'M1': MaterialPrice('M1', 'Free', 0, 10)}), ([], 0))
+
+    def test_target_below_every_unit_price(self):
+        self.assertEqual(suggest_mix(100, {'M1': 1, 'M3': 1}, PRICES), ([], 0))
+
+    def test_zero_weights_share_the_target_evenly(self):
+        lines, total = suggest_mix(20000, {'M1': 0, 'M3': 0}, PRICES)
+        self.assertEqual({line['matnr'] for line in lines}, {'M1', 'M3'})
+        self.assertLessEqual(total, 20000)
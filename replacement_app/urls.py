@@ -11,4 +11,7 @@ urlpatterns = [
     path('delivery_pending_list', replacement_views.ReplacementDeliveryPendingList.as_view(), name='delivery_pending_list'),
     path('delivered_list', replacement_views.ReplacementDeliveredList.as_view(), name='delivered_list'),
     path('delivery/<str:invoice_no>', replacement_views.ReplacementDelivery.as_view(), name='replacement_delivery'),
+    path('picklist', replacement_views.ReplacementPickListView.as_view(), name='replacement_picklist'),
+    path('suggest', replacement_views.ReplacementSuggestView.as_view(), name='replacement_suggest'),
+    path('export', replacement_views.ReplacementExportView.as_view(), name='replacement_export'),
 ]
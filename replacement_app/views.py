@@ -1,14 +1,37 @@
-from django.db.models import Sum
-from django.db import connection
+from django.db import connection, transaction
+from django.utils.dateparse import parse_date
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from withdrawal_app.models import WithdrawalInfo
+from django.db.models import Sum
+from withdrawal_app.models import WithdrawalInfo, WithdrawalList
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from .serializers import AvailableReplacementListSerializer, ReplacementListSerializer, ReplacementApprovalListSerializer
-from withdrawal_app.utils import paginate
+from withdrawal_app.utils import paginate, iter_keyset, export_response, parse_export_params
 from .models import ReplacementList
+from report_app.rollups import record_replacement_lines
+from archive_app.tier import table_tiers
+from hierarchy_app.closure import rm_scope_sql, rm_scope_q
+from material_app.prices import price_table, line_values
+from withdrawal_app.money import to_paisa, from_paisa
+from .suggestions import suggest_mix
+from .picklist import depot_picklist, invalidate_picklist
+from withdrawal_app.transitions import transition, actor_of
+from monitoring_app.tracing import span, start_span, traced
 from datetime import date
 from collections import defaultdict
+from itertools import chain
+
+# Invoice columns in their table order. The grouping loops below read rows by
+# position, so list them explicitly instead of `wi.*`, which grows with the model.
+INFO_COLUMNS = """
+    wi.id, wi.invoice_no, wi.mio_id, wi.rm_id, wi.da_id, wi.depot_id, wi.route_id, wi.partner_id,
+    wi.request_approval, wi.withdrawal_confirmation, wi.replacement_order, wi.order_approval, wi.order_delivery,
+    wi.request_date, wi.request_approval_date, wi.withdrawal_date, wi.withdrawal_approval_date,
+    wi.order_date, wi.order_approval_date, wi.delivery_date, wi.last_status, wi.created_at, wi.updated_at,
+    wi.invoice_type, wi.delivery_da_id
+"""
+
 # Create your views here.
 class AvailableReplacementListView(APIView):
     def get(self, request):
@@ -19,7 +42,6 @@ class AvailableReplacementListView(APIView):
         withdrawal_info = (
             WithdrawalInfo.objects
             .filter(last_status='withdrawal_approved', mio_id=mio_id)
-            .annotate(total_amount=Sum('withdrawal_list__net_val'))
             .order_by('-withdrawal_date')
         )
         if withdrawal_info.exists():
@@ -28,12 +50,21 @@ class AvailableReplacementListView(APIView):
             per_page = int(request.query_params.get('per_page', 10))
             if page <= 0 or per_page <= 0:
                 return Response({"success":False,"message": "Invalid page or per_page parameters."}, status=status.HTTP_400_BAD_REQUEST)
-            results = paginate(serializer.data, page=page, per_page=per_page)
+            data = traced('serialize', getattr, serializer, 'data')
+            results = traced('paginate', paginate, data, page=page, per_page=per_page)
             return Response(results, status=status.HTTP_200_OK)
         else:
             return Response(paginate([], message="No available replacements found."), status=status.HTTP_404_NOT_FOUND)
 
 class ReplacementListCreateAPIView(APIView):
+    """
+    Create the replacement order of an invoice.
+
+    Line values are computed server-side from the cached material price
+    table, and the whole order must not exceed the withdrawn value. The
+    invoice row is locked and everything is written in one transaction with
+    a fixed number of queries, however many lines are sent.
+    """
     def post(self, request, *args, **kwargs):
         invoice_no = request.data.get('invoice_no')
         materials = request.data.get('materials', [])
@@ -44,31 +75,48 @@ class ReplacementListCreateAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        serializer = ReplacementListSerializer(data=materials, many=True)
+        if not serializer.is_valid():
+            return Response({"success":False,"message":serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        lines = serializer.validated_data
+
+        prices = price_table()
+        unknown = sorted({line['matnr'] for line in lines if line['matnr'] not in prices})
+        if unknown:
+            return Response({"success":False,"message": f"No price found for materials: {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            invoice = WithdrawalInfo.objects.get(invoice_no=invoice_no)
-        except WithdrawalInfo.DoesNotExist:
-            return Response(
-                {"success":False,"message": "Invoice not found."},
-                status=status.HTTP_404_NOT_FOUND
-            )
+            values = line_values(lines, prices)
+        except ValueError as e:
+            return Response({"success":False,"message": f"Material {e} has no pack size; order whole packs only."}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            try:
+                invoice = WithdrawalInfo.objects.select_for_update().get(invoice_no=invoice_no)
+            except WithdrawalInfo.DoesNotExist:
+                return Response(
+                    {"success":False,"message": "Invoice not found."},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            order_total = sum(values) + to_paisa(invoice.replacement_total)
+            if order_total > to_paisa(invoice.withdrawal_total):
+                return Response(
+                    {"success":False,"message": f"Replacement total {from_paisa(order_total)} exceeds withdrawn total {invoice.withdrawal_total}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-        serializer = ReplacementListSerializer(data=materials, many=True)
-        if serializer.is_valid():
             replacement_objects = [
-                ReplacementList(invoice=invoice, **item)
-                for item in serializer.validated_data
+                ReplacementList(invoice=invoice, net_val=from_paisa(value), **line)
+                for line, value in zip(lines, values)
             ]
             ReplacementList.objects.bulk_create(replacement_objects)
-            invoice.last_status=invoice.Status.REPLACEMENT_APPROVAL
-            invoice.replacement_order=True
-            invoice.order_date = date.today()
-            invoice.save()
+            invoice.refresh_totals()
+            transition(invoice, invoice.Status.REPLACEMENT_APPROVAL, actor_of(request), replacement_order=True, order_date=date.today())
+            record_replacement_lines(invoice, replacement_objects)
 
-            return Response(
-                {"success":True,"message": "Replacement list created successfully","data":serializer.data},
-                status=status.HTTP_201_CREATED
-            )
-        return Response({"success":False,"message":serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"success":True,"message": "Replacement list created successfully","data":ReplacementListSerializer(replacement_objects, many=True).data},
+            status=status.HTTP_201_CREATED
+        )
     
 class ReplacementApprovalListView(APIView):
     def get(self, request):
@@ -76,14 +124,15 @@ class ReplacementApprovalListView(APIView):
         if not rm_id:
             return Response({"success":False, "message":"You Must need to pass rm id."}, status=status.HTTP_400_BAD_REQUEST)
         
-        withdrawal_info = WithdrawalInfo.objects.filter(rm_id=rm_id, last_status=WithdrawalInfo.Status.REPLACEMENT_APPROVAL)
+        withdrawal_info = WithdrawalInfo.objects.filter(rm_scope_q(rm_id, request.query_params.get('scope')), last_status=WithdrawalInfo.Status.REPLACEMENT_APPROVAL)
         if withdrawal_info.exists():
             serializer = ReplacementApprovalListSerializer(withdrawal_info, many=True)
             page = int(request.query_params.get('page', 1))
             per_page = int(request.query_params.get('per_page', 10))
             if page <= 0 or per_page <= 0:
                 return Response({"success":False,"message": "Invalid page or per_page parameters."}, status=status.HTTP_400_BAD_REQUEST)
-            results = paginate(serializer.data, page=page, per_page=per_page)
+            data = traced('serialize', getattr, serializer, 'data')
+            results = traced('paginate', paginate, data, page=page, per_page=per_page)
             return Response(results, status=status.HTTP_200_OK)
         else:
             return Response(paginate([], message="No available replacements found."), status=status.HTTP_404_NOT_FOUND)
@@ -95,10 +144,10 @@ class ReplacementApproveView(APIView):
         invoice_no = request.data.get("invoice_no")
         try:
             withdrawal_info = WithdrawalInfo.objects.get(invoice_no= invoice_no)
-            withdrawal_info.order_approval = True
-            withdrawal_info.last_status = withdrawal_info.Status.REPLACEMENT_APPROVED
-            withdrawal_info.order_approval_date = date.today()
-            withdrawal_info.save()
+            transition(
+                withdrawal_info, withdrawal_info.Status.REPLACEMENT_APPROVED, actor_of(request),
+                order_approval=True, order_approval_date=date.today(),
+            )
             return Response({"success":True, "message":"Successfully approved", "data":invoice_no}, status=status.HTTP_200_OK)
         except WithdrawalInfo.DoesNotExist:
             return Response({"success":False, "message":"invoice not found!"}, status=status.HTTP_404_NOT_FOUND)
@@ -118,8 +167,9 @@ class ReplacementOrderRequestList(APIView):
             filters.append("wi.mio_id = %s")
             params.append(mio_id)
         if rm_id:
-            filters.append("wi.rm_id = %s")
-            params.append(rm_id)
+            clause, clause_params = rm_scope_sql(rm_id, request.query_params.get('scope'))
+            filters.append(clause)
+            params.extend(clause_params)
         if depot_id:
             filters.append("wi.depot_id = %s")
             params.append(depot_id)
@@ -145,6 +195,7 @@ class ReplacementOrderRequestList(APIView):
             wi.order_approval_date,
             wi.delivery_da_id,
             wi.last_status,
+            wi.replacement_total,
             rl.matnr,
             m.material_name,
             rl.pack_qty,
@@ -157,12 +208,13 @@ class ReplacementOrderRequestList(APIView):
         INNER JOIN rdl_route_wise_depot r ON wi.route_id = r.route_code
         WHERE {where_clause} AND wi.last_status='replacement_approved' AND wi.delivery_da_id is NULL;
         """
-        with connection.cursor() as cursor:
+        with span('query') as current, connection.cursor() as cursor:
                 cursor.execute(sql, params)
                 if cursor.description is None:
                     return Response(paginate([],message="No data found.", page=1, per_page=10), status=status.HTTP_200_OK)
                 columns = [col[0] for col in cursor.description]
                 rows = cursor.fetchall()
+                current.set('rows', len(rows))
         # Column mapping
         material_cols = ["matnr", "material_name", "batch", "pack_qty", "unit_qty","net_val"]
         data_map = defaultdict(lambda: {
@@ -171,6 +223,7 @@ class ReplacementOrderRequestList(APIView):
         })
         if not rows:
             return Response(paginate([],message="No data found.", page=1, per_page=10), status=status.HTTP_200_OK)
+        group = start_span('group', rows=len(rows))
         for row in rows:
             row_dict = dict(zip(columns, row))
             invoice_no = row_dict["invoice_no"]
@@ -193,6 +246,7 @@ class ReplacementOrderRequestList(APIView):
 
         # Convert to list
         data_list = list(data_map.values())
+        group.finish()
 
         # pagination
         page = int(request.query_params.get('page', 1))
@@ -202,7 +256,7 @@ class ReplacementOrderRequestList(APIView):
                 "success": False,
                 "message": "Invalid 'page' or 'per_page'. Must be positive integers."
             }, status=status.HTTP_400_BAD_REQUEST)
-        paginate_results= paginate(data_list,page=page,per_page=page_size)
+        paginate_results= traced('paginate', paginate, data_list,page=page,per_page=page_size)
         return Response(paginate_results, status=status.HTTP_200_OK)
 
 class AssignDeliveryDA(APIView):
@@ -215,9 +269,8 @@ class AssignDeliveryDA(APIView):
             info = WithdrawalInfo.objects.get(invoice_no=invoice_no)
         except WithdrawalInfo.DoesNotExist:
             return Response({"success":False,"message": "Withdrawal info does not exist"}, status=status.HTTP_404_NOT_FOUND)
-        info.delivery_da_id = delivery_da_id
-        info.last_status = info.Status.DELIVERY_PENDING
-        info.save()
+        transition(info, info.Status.DELIVERY_PENDING, actor_of(request), delivery_da_id=delivery_da_id)
+        invalidate_picklist(info.depot_id)
         return Response({"success":True,"message": "DA assigned successfully.", "data":{"invoice_no":invoice_no, "delivery_da_id":delivery_da_id}}, status=status.HTTP_200_OK)
     
 class ReplacementDeliveryPendingList(APIView):
@@ -235,8 +288,9 @@ class ReplacementDeliveryPendingList(APIView):
             filters.append("wi.mio_id = %s")
             params.append(mio_id)
         if rm_id:
-            filters.append("wi.rm_id = %s")
-            params.append(rm_id)
+            clause, clause_params = rm_scope_sql(rm_id, request.query_params.get('scope'))
+            filters.append(clause)
+            params.extend(clause_params)
         if depot_id:
             filters.append("wi.depot_id = %s")
             params.append(depot_id)
@@ -262,6 +316,7 @@ class ReplacementDeliveryPendingList(APIView):
             wi.order_approval_date,
             wi.delivery_da_id,
             wi.last_status,
+            wi.replacement_total,
             rl.matnr,
             m.material_name,
             rl.pack_qty,
@@ -274,12 +329,13 @@ class ReplacementDeliveryPendingList(APIView):
         INNER JOIN rdl_route_wise_depot r ON wi.route_id = r.route_code
         WHERE {where_clause} AND wi.last_status='delivery_pending';
         """
-        with connection.cursor() as cursor:
+        with span('query') as current, connection.cursor() as cursor:
                 cursor.execute(sql, params)
                 if cursor.description is None:
                     return Response(paginate([],message="No data found.", page=1, per_page=10), status=status.HTTP_200_OK)
                 columns = [col[0] for col in cursor.description]
                 rows = cursor.fetchall()
+                current.set('rows', len(rows))
         # Column mapping
         material_cols = ["matnr", "material_name", "batch", "pack_qty", "unit_qty","net_val"]
         data_map = defaultdict(lambda: {
@@ -288,6 +344,7 @@ class ReplacementDeliveryPendingList(APIView):
         })
         if not rows:
             return Response(paginate([],message="No data found.", page=1, per_page=10), status=status.HTTP_200_OK)
+        group = start_span('group', rows=len(rows))
         for row in rows:
             row_dict = dict(zip(columns, row))
             invoice_no = row_dict["invoice_no"]
@@ -310,6 +367,7 @@ class ReplacementDeliveryPendingList(APIView):
 
         # Convert to list
         data_list = list(data_map.values())
+        group.finish()
 
         # pagination
         page = int(request.query_params.get('page', 1))
@@ -319,7 +377,7 @@ class ReplacementDeliveryPendingList(APIView):
                 "success": False,
                 "message": "Invalid 'page' or 'per_page'. Must be positive integers."
             }, status=status.HTTP_400_BAD_REQUEST)
-        paginate_results= paginate(data_list,page=page,per_page=page_size)
+        paginate_results= traced('paginate', paginate, data_list,page=page,per_page=page_size)
         return Response(paginate_results, status=status.HTTP_200_OK)
     
     
@@ -339,8 +397,9 @@ class ReplacementDeliveredList(APIView):
             filters.append("wi.mio_id = %s")
             params.append(mio_id)
         if rm_id:
-            filters.append("wi.rm_id = %s")
-            params.append(rm_id)
+            clause, clause_params = rm_scope_sql(rm_id, request.query_params.get('scope'))
+            filters.append(clause)
+            params.extend(clause_params)
         if depot_id:
             filters.append("wi.depot_id = %s")
             params.append(depot_id)
@@ -350,6 +409,18 @@ class ReplacementDeliveredList(APIView):
         if delivery_da_id:
             filters.append("wi.delivery_da_id = %s")
             params.append(delivery_da_id)
+        # Optional delivery date range; ranges reaching back into the archive also read the archive tables
+        try:
+            from_date = parse_date(request.query_params.get('from_date') or '')
+            to_date = parse_date(request.query_params.get('to_date') or '')
+        except ValueError:
+            return Response({"success":False,"message": "Please provide valid from_date and to_date (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+        if from_date:
+            filters.append("wi.delivery_date >= %s")
+            params.append(from_date)
+        if to_date:
+            filters.append("wi.delivery_date <= %s")
+            params.append(to_date)
             
         where_clause = " AND ".join(filters)
         sql= f"""
@@ -369,24 +440,29 @@ class ReplacementDeliveredList(APIView):
             wi.order_approval_date,
             wi.delivery_da_id,
             wi.last_status,
+            wi.replacement_total,
             rl.matnr,
             m.material_name,
             rl.pack_qty,
             rl.unit_qty,
             rl.net_val
-        FROM expr_withdrawal_info wi 
-        INNER JOIN expr_replacement_list rl ON wi.id = rl.invoice_id
+        FROM {{info}} wi 
+        INNER JOIN {{replacement_list}} rl ON wi.id = rl.invoice_id
         INNER JOIN rpl_customer c ON wi.partner_id = c.partner
         INNER JOIN rpl_material m ON rl.matnr = m.matnr
         INNER JOIN rdl_route_wise_depot r ON wi.route_id = r.route_code
-        WHERE {where_clause} AND wi.last_status='delivered';
+        WHERE {where_clause} AND wi.last_status='delivered'
         """
-        with connection.cursor() as cursor:
+        tiers = table_tiers(from_date)
+        sql = " UNION ALL ".join(sql.format(**tables) for tables in tiers)
+        params = params * len(tiers)
+        with span('query') as current, connection.cursor() as cursor:
                 cursor.execute(sql, params)
                 if cursor.description is None:
                     return Response(paginate([],message="No data found.", page=1, per_page=10), status=status.HTTP_200_OK)
                 columns = [col[0] for col in cursor.description]
                 rows = cursor.fetchall()
+                current.set('rows', len(rows))
         # Column mapping
         material_cols = ["matnr", "material_name", "batch", "pack_qty", "unit_qty","net_val"]
         data_map = defaultdict(lambda: {
@@ -395,6 +471,7 @@ class ReplacementDeliveredList(APIView):
         })
         if not rows:
             return Response(paginate([],message="No data found.", page=1, per_page=10), status=status.HTTP_200_OK)
+        group = start_span('group', rows=len(rows))
         for row in rows:
             row_dict = dict(zip(columns, row))
             invoice_no = row_dict["invoice_no"]
@@ -417,6 +494,7 @@ class ReplacementDeliveredList(APIView):
 
         # Convert to list
         data_list = list(data_map.values())
+        group.finish()
 
         # pagination
         page = int(request.query_params.get('page', 1))
@@ -426,7 +504,7 @@ class ReplacementDeliveredList(APIView):
                 "success": False,
                 "message": "Invalid 'page' or 'per_page'. Must be positive integers."
             }, status=status.HTTP_400_BAD_REQUEST)
-        paginate_results= paginate(data_list,page=page,per_page=page_size)
+        paginate_results= traced('paginate', paginate, data_list,page=page,per_page=page_size)
         return Response(paginate_results, status=status.HTTP_200_OK)
     
 class ReplacementDelivery(APIView):
@@ -436,9 +514,8 @@ class ReplacementDelivery(APIView):
             return Response({"success":False,"message": "Please provide invoice_no."}, status=status.HTTP_400_BAD_REQUEST)
         try:
             info = WithdrawalInfo.objects.get(invoice_no=invoice_no)
-            info.delivery_date = date.today()
-            info.last_status = info.Status.DELIVERED
-            info.save()
+            transition(info, info.Status.DELIVERED, actor_of(request), delivery_date=date.today())
+            invalidate_picklist(info.depot_id)
             return Response({"success":True,"message": "Delivery data updated successfully.", "data":{"invoice_no":invoice_no}}, status=status.HTTP_200_OK)
         except WithdrawalInfo.DoesNotExist:
             return Response({"success":False,"message": "Withdrawal request does not exist"}, status=status.HTTP_404_NOT_FOUND)
@@ -458,8 +535,9 @@ class AvailableReplacementListView2(APIView):
             filters.append("wi.mio_id = %s")
             params.append(mio_id)
         if rm_id:
-            filters.append("wi.rm_id = %s")
-            params.append(rm_id)
+            clause, clause_params = rm_scope_sql(rm_id, request.query_params.get('scope'))
+            filters.append(clause)
+            params.extend(clause_params)
         if depot_id:
             filters.append("wi.depot_id = %s")
             params.append(depot_id)
@@ -470,14 +548,15 @@ class AvailableReplacementListView2(APIView):
         where_clause = " AND ".join(filters)
         sql= f"""
         SELECT
-            wi.*,
+            {INFO_COLUMNS},
             rl.*,
             wl.*,
             CONCAT(c.name1, c.name2) AS partner_name,
             CONCAT(c.street, c.street1, c.street2, c.upazilla, c.district) AS partner_address,
             c.mobile_no AS partner_mobile_no,
             c.contact_person,
-            m.material_name
+            m.material_name,
+            wi.withdrawal_total
         FROM expr_withdrawal_info wi 
         INNER JOIN expr_request_list rl ON wi.id = rl.invoice_id_id
         LEFT JOIN expr_withdrawal_list wl ON wi.id = wl.invoice_id_id AND rl.matnr = wl.matnr
@@ -485,22 +564,24 @@ class AvailableReplacementListView2(APIView):
         INNER JOIN rpl_material m ON rl.matnr = m.matnr
         WHERE {where_clause} AND last_status='withdrawal_approved';
         """
-        with connection.cursor() as cursor:
+        with span('query') as current, connection.cursor() as cursor:
                 cursor.execute(sql, params)
                 if cursor.description is None:
                     return Response(paginate([],message="No data found.", page=1, per_page=10), status=status.HTTP_200_OK)
                 columns = [col[0] for col in cursor.description]
                 rows = cursor.fetchall()
+                current.set('rows', len(rows))
         # Column mapping
         if not rows:
             return Response(paginate([],message="No data found.", page=1, per_page=10), status=status.HTTP_200_OK)
 
+        group = start_span('group', rows=len(rows))
         grouped_data = {}
         for row in rows:
             if row[1] not in grouped_data:
                 data = {
                     "id": row[0],
-                    "total_amount": 0.0,
+                    "total_amount": row[56],
                     "partner_name": row[51],
                     "customer_address": row[52],
                     "customer_mobile": row[53],
@@ -569,10 +650,10 @@ class AvailableReplacementListView2(APIView):
                 "invoice_id": row[49]
             }
             grouped_data[row[1]]['withdrawal_list'].append(withdrawal_list_data)
-            grouped_data[row[1]]['total_amount'] += float(row[46])
 
         # Convert to list
         data_list = list(grouped_data.values())
+        group.finish()
 
         # pagination
         page = int(request.query_params.get('page', 1))
@@ -582,7 +663,7 @@ class AvailableReplacementListView2(APIView):
                 "success": False,
                 "message": "Invalid 'page' or 'per_page'. Must be positive integers."
             }, status=status.HTTP_400_BAD_REQUEST)
-        paginate_results= paginate(data_list,page=page,per_page=page_size)
+        paginate_results= traced('paginate', paginate, data_list,page=page,per_page=page_size)
         return Response(paginate_results, status=status.HTTP_200_OK)
     
 class RmApprovalListView(APIView):
@@ -600,8 +681,9 @@ class RmApprovalListView(APIView):
             filters.append("wi.mio_id = %s")
             params.append(mio_id)
         if rm_id:
-            filters.append("wi.rm_id = %s")
-            params.append(rm_id)
+            clause, clause_params = rm_scope_sql(rm_id, request.query_params.get('scope'))
+            filters.append(clause)
+            params.extend(clause_params)
         if depot_id:
             filters.append("wi.depot_id = %s")
             params.append(depot_id)
@@ -612,7 +694,7 @@ class RmApprovalListView(APIView):
         where_clause = " AND ".join(filters)
         sql= f"""
         SELECT
-            wi.*,
+            {INFO_COLUMNS},
             rl.*,
             CONCAT(c.name1, c.name2) AS partner_name,
             CONCAT(c.street, c.street1, c.street2, c.upazilla, c.district) AS partner_address,
@@ -625,16 +707,18 @@ class RmApprovalListView(APIView):
         INNER JOIN rpl_material m ON rl.matnr = m.matnr
         WHERE {where_clause} AND last_status='replacement_approval';
         """
-        with connection.cursor() as cursor:
+        with span('query') as current, connection.cursor() as cursor:
                 cursor.execute(sql, params)
                 if cursor.description is None:
                     return Response(paginate([],message="No data found.", page=1, per_page=10), status=status.HTTP_200_OK)
                 columns = [col[0] for col in cursor.description]
                 rows = cursor.fetchall()
+                current.set('rows', len(rows))
         # Column mapping
         if not rows:
             return Response(paginate([],message="No data found.", page=1, per_page=10), status=status.HTTP_200_OK)
 
+        group = start_span('group', rows=len(rows))
         grouped_data = {}
         for row in rows:
             if row[1] not in grouped_data:
@@ -688,6 +772,7 @@ class RmApprovalListView(APIView):
 
         # Convert to list
         data_list = list(grouped_data.values())
+        group.finish()
 
         # pagination
         page = int(request.query_params.get('page', 1))
@@ -697,5 +782,123 @@ class RmApprovalListView(APIView):
                 "success": False,
                 "message": "Invalid 'page' or 'per_page'. Must be positive integers."
             }, status=status.HTTP_400_BAD_REQUEST)
-        paginate_results= paginate(data_list,page=page,per_page=page_size)
-        return Response(paginate_results, status=status.HTTP_200_OK)
\ No newline at end of file
+        paginate_results= traced('paginate', paginate, data_list,page=page,per_page=page_size)
+        return Response(paginate_results, status=status.HTTP_200_OK)
+
+
+class ReplacementExportView(APIView):
+    """
+    Stream the replacement history of a depot as CSV or NDJSON.
+
+    One row per replacement line for invoices whose order_date falls inside
+    `from_date`..`to_date`, including archived invoices, read in
+    keyset-paginated chunks.
+    """
+    columns = [
+        'line_id', 'invoice_no', 'invoice_type', 'depot_id', 'route_id', 'partner_id',
+        'mio_id', 'rm_id', 'delivery_da_id', 'last_status', 'order_date', 'order_approval_date',
+        'delivery_date', 'matnr', 'batch', 'pack_qty', 'unit_qty', 'net_val',
+    ]
+
+    def get(self, request):
+        export, error = parse_export_params(request.query_params)
+        if error:
+            return Response({"success":False,"message": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        sql = """
+        SELECT
+            rl.id AS line_id, wi.invoice_no, wi.invoice_type, wi.depot_id, wi.route_id, wi.partner_id,
+            wi.mio_id, wi.rm_id, wi.delivery_da_id, wi.last_status, wi.order_date, wi.order_approval_date,
+            wi.delivery_date, rl.matnr, rl.batch, rl.pack_qty, rl.unit_qty, rl.net_val
+        FROM {replacement_list} rl
+        INNER JOIN {info} wi ON wi.id = rl.invoice_id
+        WHERE wi.depot_id = %s AND wi.order_date BETWEEN %s AND %s AND rl.id > %s
+        ORDER BY rl.id
+        LIMIT %s
+        """
+        params = [export['depot_id'], export['from_date'], export['to_date']]
+        rows = chain.from_iterable(
+            iter_keyset(sql.format(**tables), params) for tables in table_tiers(export['from_date'])
+        )
+        filename = f"replacement_{export['depot_id']}_{export['from_date']}_{export['to_date']}"
+        return export_response(request, self.columns, rows, export['format'], export['gzip'], filename)
+
+
+class ReplacementSuggestView(APIView):
+    """
+    Suggest a replacement material mix for an invoice.
+
+    The value to fill is the withdrawn total less what is already ordered.
+    By default the mix uses the materials withdrawn on the invoice, weighted by
+    their withdrawn value; pass `matnr` (comma separated) to choose others.
+    Lines are priced from the cached material price table.
+    """
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='invoice_no', description='Invoice number', required=True, type=str),
+            OpenApiParameter(name='matnr', description='Comma separated material numbers to use instead of the withdrawn ones', required=False, type=str),
+        ],
+    )
+    def get(self, request):
+        invoice_no = request.query_params.get('invoice_no')
+        if not invoice_no:
+            return Response({"success":False,"message": "Please provide invoice_no."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            invoice = WithdrawalInfo.objects.get(invoice_no=invoice_no)
+        except WithdrawalInfo.DoesNotExist:
+            return Response({"success":False,"message": "Invoice not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        matnrs = [m.strip() for m in request.query_params.get('matnr', '').split(',') if m.strip()]
+        if matnrs:
+            weights = dict.fromkeys(matnrs, 1)
+        else:
+            withdrawn = (
+                WithdrawalList.objects
+                .filter(invoice_id=invoice)
+                .values('matnr')
+                .annotate(value=Sum('net_val'))
+                .order_by('-value', 'matnr')
+            )
+            weights = {row['matnr']: to_paisa(row['value']) for row in withdrawn}
+
+        prices = price_table()
+        target = to_paisa(invoice.withdrawal_total) - to_paisa(invoice.replacement_total)
+        lines, total = suggest_mix(target, weights, prices)
+        for line in lines:
+            line['net_val'] = from_paisa(line['net_val'])
+        return Response({
+            "success": True,
+            "message": "Replacement suggestion built successfully.",
+            "data": {
+                "invoice_no": invoice.invoice_no,
+                "target": from_paisa(target),
+                "total": from_paisa(total),
+                "remainder": from_paisa(target - total),
+                "unpriced": [matnr for matnr in weights if matnr not in prices],
+                "lines": lines,
+            },
+        }, status=status.HTTP_200_OK)
+
+
+class ReplacementPickListView(APIView):
+    """
+    Depot pick-list: total pack and unit quantities per material and route
+    over the depot's `delivery_pending` invoices.
+
+    Served from a short-lived cache that is dropped whenever a delivery DA is
+    assigned or a delivery completes in the depot.
+    """
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='depot_id', description='Depot ID', required=True, type=str),
+            OpenApiParameter(name='route_id', description='Route ID; all routes when omitted', required=False, type=str),
+        ],
+    )
+    def get(self, request):
+        depot_id = request.query_params.get('depot_id')
+        route_id = request.query_params.get('route_id')
+        if not depot_id:
+            return Response({"success":False,"message": "Please provide depot_id."}, status=status.HTTP_400_BAD_REQUEST)
+        routes = depot_picklist(depot_id, route_id)
+        message = "Pick-list fetched successfully." if routes else "No pending deliveries found."
+        return Response({"success":True,"message": message, "data": routes}, status=status.HTTP_200_OK)
@@ -0,0 +1,74 @@
+from collections import Counter
+from django.db.models import F
+from outbox_app.consumers import TransitionConsumer
+from outbox_app.visibility import current_position, unread
+from withdrawal_app.models import WithdrawalInfo, WithdrawalTransition
+from .models import InvoiceStatusCount
+
+
+def _apply(deltas):
+    """Add `deltas` ((depot_id, status) -> change) to the counts, one statement per key."""
+    for (depot_id, status), delta in deltas.items():
+        if not delta:
+            continue
+        updated = InvoiceStatusCount.objects.filter(depot_id=depot_id, status=status).update(invoices=F('invoices') + delta)
+        if not updated:
+            InvoiceStatusCount.objects.create(depot_id=depot_id, status=status, invoices=delta)
+
+
+class StatusCountConsumer(TransitionConsumer):
+    """
+    Keep `InvoiceStatusCount` in step with the transition log.
+
+    Each transition moves one invoice out of its old status and into the new
+    one; a batch is folded into one delta per depot and status first.
+    """
+    name = 'status_counts'
+
+    def handle(self, transitions):
+        deltas = Counter()
+        for transition in transitions:
+            depot_id = transition.depot_id or ''
+            if transition.from_status and transition.from_status != WithdrawalInfo.Status.DELIVERED:
+                deltas[(depot_id, transition.from_status)] -= 1
+            if transition.to_status != WithdrawalInfo.Status.DELIVERED:
+                deltas[(depot_id, transition.to_status)] += 1
+        _apply(deltas)
+
+    def reset(self):
+        """
+        Recount the invoices per depot and status as of `current_position()`.
+
+        The position is read first, then the invoices, then the log. Any
+        invoice with transitions not read from the position (after it or
+        in its gaps) is counted under the `from_status` of the first of
+        them: the status it had at the position, whatever the invoice read
+        saw. An invoice's transitions commit in id order, as each one locks
+        the invoice row. So a transition committing during the rebuild is
+        counted once, by the next `run_once`.
+        """
+        position = current_position()
+        current = {
+            invoice_id: (depot_id or '', status)
+            for invoice_id, depot_id, status in (
+                WithdrawalInfo.objects
+                .exclude(last_status=WithdrawalInfo.Status.DELIVERED)
+                .values_list('id', 'depot_id', 'last_status')
+                .iterator()
+            )
+        }
+        # Newest first, so each invoice ends up with its first transition not read yet
+        later = WithdrawalTransition.objects.filter(unread(position)).order_by('-id').values_list('invoice_id', 'depot_id', 'from_status')
+        for invoice_id, depot_id, from_status in later:
+            if from_status and from_status != WithdrawalInfo.Status.DELIVERED:
+                current[invoice_id] = (depot_id or '', from_status)
+            else:
+                current.pop(invoice_id, None)
+
+        InvoiceStatusCount.objects.all().delete()
+        counts = Counter(current.values())
+        InvoiceStatusCount.objects.bulk_create([
+            InvoiceStatusCount(depot_id=depot_id, status=status, invoices=invoices)
+            for (depot_id, status), invoices in counts.items()
+        ])
+        return position
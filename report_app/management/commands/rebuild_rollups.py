@@ -0,0 +1,23 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from report_app.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the expired value rollups from the withdrawal and replacement line tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from-month',
+            help="First month to rebuild (YYYY-MM). Rebuilds everything when omitted.",
+        )
+
+    def handle(self, *args, **options):
+        from_month = options['from_month']
+        if from_month:
+            try:
+                from_month = datetime.strptime(from_month, '%Y-%m').date()
+            except ValueError:
+                raise CommandError("--from-month must be in YYYY-MM format.")
+        count = rebuild_rollups(from_month)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} rollup rows."))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-19 23:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpiredValueRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depot_id', models.CharField(max_length=40)),
+                ('producer_company', models.CharField(blank=True, default='', max_length=3)),
+                ('matnr', models.CharField(max_length=40)),
+                ('month', models.DateField()),
+                ('withdrawn_val', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('withdrawn_lines', models.IntegerField(default=0)),
+                ('replaced_val', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('replaced_lines', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Expired Value Rollup',
+                'verbose_name_plural': 'Expired Value Rollup',
+                'db_table': 'expr_value_rollup',
+                'indexes': [models.Index(fields=['month', 'depot_id'], name='expr_rollup_month_depot_idx')],
+                'unique_together': {('depot_id', 'producer_company', 'matnr', 'month')},
+            },
+        ),
+    ]
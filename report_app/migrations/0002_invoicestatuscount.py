@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('report_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depot_id', models.CharField(blank=True, default='', max_length=40)),
+                ('status', models.CharField(max_length=40)),
+                ('invoices', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Invoice Status Count',
+                'verbose_name_plural': 'Invoice Status Counts',
+                'db_table': 'expr_status_count',
+                'unique_together': {('depot_id', 'status')},
+            },
+        ),
+    ]
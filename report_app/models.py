@@ -0,0 +1,57 @@
+from django.db import models
+
+# Create your models here.
+class ExpiredValueRollup(models.Model):
+    """
+    Model representing pre-aggregated withdrawn and replaced values.
+
+    One row per depot, producer company, material and month. Rows are
+    incremented as withdrawal and replacement lines are saved (see
+    `report_app.rollups`) and can be rebuilt from the line tables with the
+    `rebuild_rollups` management command, so reports never aggregate the
+    transactional tables directly.
+    """
+    depot_id = models.CharField(max_length=40)
+    producer_company = models.CharField(max_length=3, blank=True, default='')
+    matnr = models.CharField(max_length=40)
+    month = models.DateField()  # First day of the month
+    withdrawn_val = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    withdrawn_lines = models.IntegerField(default=0)
+    replaced_val = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    replaced_lines = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.depot_id} {self.matnr} {self.month:%Y-%m}'
+
+    class Meta:
+        db_table = 'expr_value_rollup'
+        verbose_name = 'Expired Value Rollup'
+        verbose_name_plural = 'Expired Value Rollup'
+        unique_together = (('depot_id', 'producer_company', 'matnr', 'month'),)
+        indexes = [
+            models.Index(fields=['month', 'depot_id'], name='expr_rollup_month_depot_idx'),
+        ]
+
+
+class InvoiceStatusCount(models.Model):
+    """
+    Model representing how many open invoices of a depot are in one status.
+
+    Maintained incrementally from the transition log by
+    `report_app.consumers.StatusCountConsumer`; delivered invoices are not
+    counted, so archiving them does not disturb the counts.
+    """
+    depot_id = models.CharField(max_length=40, blank=True, default='')
+    status = models.CharField(max_length=40)
+    invoices = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.depot_id} {self.status}: {self.invoices}'
+
+    class Meta:
+        db_table = 'expr_status_count'
+        verbose_name = 'Invoice Status Count'
+        verbose_name_plural = 'Invoice Status Counts'
+        unique_together = (('depot_id', 'status'),)
@@ -0,0 +1,161 @@
+from collections import defaultdict
+from datetime import date
+from django.db import connection, transaction
+from django.db.models import Max
+from withdrawal_app import dialect
+from withdrawal_app.money import to_paisa, from_paisa
+from material_app.models import RplMaterial
+from report_app.models import ExpiredValueRollup
+from archive_app.tier import table_tiers
+
+# Unique key of a rollup row, and the columns an upsert adds to
+ROLLUP_KEY = ['depot_id', 'producer_company', 'matnr', 'month']
+ROLLUP_VALUES = ['withdrawn_val', 'withdrawn_lines', 'replaced_val', 'replaced_lines']
+
+# Upsert one rollup row, adding the deltas to an existing row
+UPSERT_SQL = """
+INSERT INTO expr_value_rollup
+    (depot_id, producer_company, matnr, month, withdrawn_val, withdrawn_lines, replaced_val, replaced_lines, updated_at)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
+{upsert}
+"""
+
+# Rebuild a month range from the line tables, withdrawn and replaced separately,
+# each line in the month it was saved in (as `_apply` counts it),
+# once per table tier (`{info}` and the line table names are filled in per tier,
+# `{month}` and `{upsert}` per database vendor).
+# rpl_material holds a row per plant/sales org, so take one producer company per material.
+REBUILD_WITHDRAWN_SQL = """
+INSERT INTO expr_value_rollup
+    (depot_id, producer_company, matnr, month, withdrawn_val, withdrawn_lines, replaced_val, replaced_lines, updated_at)
+SELECT
+    wi.depot_id,
+    COALESCE(m.producer_company, ''),
+    wl.matnr,
+    {month} AS month,
+    SUM(wl.net_val), COUNT(*), 0, 0, NOW()
+FROM {withdrawal_list} wl
+INNER JOIN {info} wi ON wi.id = wl.invoice_id_id
+LEFT JOIN (SELECT matnr, MAX(producer_company) AS producer_company FROM rpl_material GROUP BY matnr) m ON m.matnr = wl.matnr
+WHERE wi.depot_id IS NOT NULL AND wl.created_at >= %s
+GROUP BY wi.depot_id, COALESCE(m.producer_company, ''), wl.matnr, month
+{upsert}
+"""
+
+REBUILD_REPLACED_SQL = """
+INSERT INTO expr_value_rollup
+    (depot_id, producer_company, matnr, month, withdrawn_val, withdrawn_lines, replaced_val, replaced_lines, updated_at)
+SELECT
+    wi.depot_id,
+    COALESCE(m.producer_company, ''),
+    rl.matnr,
+    {month} AS month,
+    0, 0, SUM(rl.net_val), COUNT(*), NOW()
+FROM {replacement_list} rl
+INNER JOIN {info} wi ON wi.id = rl.invoice_id
+LEFT JOIN (SELECT matnr, MAX(producer_company) AS producer_company FROM rpl_material GROUP BY matnr) m ON m.matnr = rl.matnr
+WHERE wi.depot_id IS NOT NULL AND rl.created_at >= %s
+GROUP BY wi.depot_id, COALESCE(m.producer_company, ''), rl.matnr, month
+{upsert}
+"""
+
+
+def month_start(day):
+    """Return the first day of the month of `day` (today if empty)."""
+    day = day or date.today()
+    return day.replace(day=1)
+
+
+def _producer_companies(matnrs):
+    """Map each material number to its producer company in one query."""
+    rows = (
+        RplMaterial.objects
+        .filter(matnr__in=set(matnrs))
+        .values('matnr')
+        .annotate(producer_company=Max('producer_company'))
+    )
+    return {row['matnr']: row['producer_company'] or '' for row in rows}
+
+
+def _apply(invoice, lines, withdrawn):
+    """
+    Group `lines` by rollup key and add them to the rollup table.
+
+    Lines count towards the month they were saved in. The invoice's
+    `withdrawal_date` and `order_date` move with every save, so bucketing by
+    them would spread one invoice over the months of its saves differently
+    from `rebuild_rollups`, which only sees the latest date.
+    """
+    if not lines or not invoice.depot_id:
+        return
+    companies = _producer_companies(line.matnr for line in lines)
+    deltas = defaultdict(lambda: [0, 0])
+    for line in lines:
+        key = (invoice.depot_id, companies.get(line.matnr, ''), line.matnr, month_start(line.created_at.date()))
+        deltas[key][0] += to_paisa(line.net_val)
+        deltas[key][1] += 1
+
+    rows = []
+    for key, (paisa, count) in deltas.items():
+        value = from_paisa(paisa)
+        if withdrawn:
+            rows.append([*key, value, count, 0, 0])
+        else:
+            rows.append([*key, 0, 0, value, count])
+    with connection.cursor() as cursor:
+        cursor.executemany(UPSERT_SQL.format(upsert=dialect.upsert(ROLLUP_KEY, ROLLUP_VALUES, 'updated_at')), rows)
+
+
+def record_withdrawal_lines(invoice, lines):
+    """
+    Add newly saved withdrawal lines to the rollups.
+
+    Call inside the transaction that saved the lines so the rollup and the
+    lines commit or roll back together.
+
+    Args:
+        invoice (WithdrawalInfo): The invoice the lines belong to.
+        lines (list): The saved `WithdrawalList` instances.
+    """
+    _apply(invoice, lines, withdrawn=True)
+
+
+def record_replacement_lines(invoice, lines):
+    """
+    Add newly saved replacement lines to the rollups.
+
+    Args:
+        invoice (WithdrawalInfo): The invoice the lines belong to.
+        lines (list): The saved `ReplacementList` instances.
+    """
+    _apply(invoice, lines, withdrawn=False)
+
+
+def rebuild_rollups(from_month=None):
+    """
+    Recompute the rollups from the line tables.
+
+    Args:
+        from_month (date, optional): First month to rebuild. Everything is
+            rebuilt when omitted.
+
+    Returns:
+        int: Number of rollup rows after the rebuild.
+    """
+    from_month = month_start(from_month) if from_month else date(1900, 1, 1)
+    with transaction.atomic():
+        ExpiredValueRollup.objects.filter(month__gte=from_month).delete()
+        with connection.cursor() as cursor:
+            # Archived invoices keep counting towards their months
+            for tables in table_tiers(from_month):
+                cursor.execute(REBUILD_WITHDRAWN_SQL.format(
+                    month=dialect.month_start('DATE(wl.created_at)'),
+                    upsert=dialect.upsert(ROLLUP_KEY, ROLLUP_VALUES[:2]),
+                    **tables,
+                ), [from_month])
+                cursor.execute(REBUILD_REPLACED_SQL.format(
+                    month=dialect.month_start('DATE(rl.created_at)'),
+                    upsert=dialect.upsert(ROLLUP_KEY, ROLLUP_VALUES[2:]),
+                    **tables,
+                ), [from_month])
+    return ExpiredValueRollup.objects.filter(month__gte=from_month).count()
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+
+class RollupSummarySerializer(serializers.Serializer):
+    """
+    Serializer for one grouped row of the expired value rollups.
+
+    Grouping keys that were not requested are omitted from the output.
+    """
+    depot_id = serializers.CharField(required=False)
+    producer_company = serializers.CharField(required=False)
+    matnr = serializers.CharField(required=False)
+    month = serializers.DateField(format='%Y-%m', required=False)
+    withdrawn_val = serializers.DecimalField(max_digits=16, decimal_places=2)
+    withdrawn_lines = serializers.IntegerField()
+    replaced_val = serializers.DecimalField(max_digits=16, decimal_places=2)
+    replaced_lines = serializers.IntegerField()
@@ -0,0 +1,45 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from material_app.models import RplMaterial
+from replacement_app.models import ReplacementList
+from withdrawal_app.models import WithdrawalInfo, WithdrawalList
+from .models import ExpiredValueRollup
+from .rollups import month_start, record_withdrawal_lines, record_replacement_lines, rebuild_rollups
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        RplMaterial.objects.create(matnr='X1', plant='P', sales_org='S', dis_channel='D', producer_company='ACM')
+        self.invoice = WithdrawalInfo.objects.create(invoice_no='INV1', mio_id='M1', rm_id='R1', depot_id='P1', partner_id='C1')
+
+    def withdraw(self, *values):
+        lines = [WithdrawalList.objects.create(invoice_id=self.invoice, matnr=matnr, batch='B1', net_val=Decimal(value)) for matnr, value in values]
+        record_withdrawal_lines(self.invoice, lines)
+
+    def replace(self, *values):
+        lines = [ReplacementList.objects.create(invoice=self.invoice, matnr=matnr, net_val=Decimal(value)) for matnr, value in values]
+        record_replacement_lines(self.invoice, lines)
+
+    def rollups(self):
+        return sorted(
+            ExpiredValueRollup.objects.values_list('producer_company', 'matnr', 'month', 'withdrawn_val', 'withdrawn_lines', 'replaced_val', 'replaced_lines')
+        )
+
+    def test_recorded_lines_add_to_one_row_per_key(self):
+        self.withdraw(('X1', '10.10'), ('X1', '0.20'), ('Y1', '5.00'))
+        self.withdraw(('X1', '1.00'))
+        self.replace(('X1', '2.50'))
+        month = month_start(date.today())
+        self.assertEqual(self.rollups(), [
+            ('', 'Y1', month, Decimal('5.00'), 1, Decimal('0.00'), 0),
+            ('ACM', 'X1', month, Decimal('11.30'), 3, Decimal('2.50'), 1),
+        ])
+
+    def test_rebuild_matches_the_recorded_rollups(self):
+        self.withdraw(('X1', '10.10'), ('Y1', '5.00'))
+        self.replace(('X1', '2.50'), ('X1', '0.75'))
+        recorded = self.rollups()
+        ExpiredValueRollup.objects.update(withdrawn_val=0, withdrawn_lines=0)
+        self.assertEqual(rebuild_rollups(), 2)
+        self.assertEqual(self.rollups(), recorded)
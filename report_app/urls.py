@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views as report_views
+
+urlpatterns = [
+    path('summary', report_views.RollupSummaryView.as_view(), name='report_summary'),
+    path('status-counts', report_views.StatusCountView.as_view(), name='report_status_counts'),
+]
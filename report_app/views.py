@@ -0,0 +1,108 @@
+import logging
+from datetime import datetime
+from django.db.models import Sum
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from report_app.models import ExpiredValueRollup, InvoiceStatusCount
+from report_app.serializers import RollupSummarySerializer
+from withdrawal_app.utils import paginate
+
+# Set logger
+logger = logging.getLogger("report_app")
+
+GROUP_FIELDS = ['depot_id', 'producer_company', 'matnr', 'month']
+
+# Create your views here.
+class RollupSummaryView(APIView):
+    """
+    View to summarise withdrawn and replaced values from the rollup table.
+
+    Reads only `expr_value_rollup`; it never touches the line tables.
+    """
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='depot_id', description='Depot ID', required=False, type=str),
+            OpenApiParameter(name='producer_company', description='Producer company', required=False, type=str),
+            OpenApiParameter(name='matnr', description='Material number', required=False, type=str),
+            OpenApiParameter(name='from_month', description='First month (YYYY-MM)', required=False, type=str),
+            OpenApiParameter(name='to_month', description='Last month (YYYY-MM)', required=False, type=str),
+            OpenApiParameter(name='group_by', description='Comma separated: depot_id, producer_company, matnr, month', required=False, type=str),
+        ],
+        responses={
+            status.HTTP_200_OK: RollupSummarySerializer(many=True),
+            status.HTTP_400_BAD_REQUEST: OpenApiResponse(description="Invalid request parameters"),
+        }
+    )
+    def get(self, request):
+        """
+        Summarise withdrawn and replaced values.
+
+        Filters on `depot_id`, `producer_company`, `matnr` and the
+        `from_month`..`to_month` range, grouped by `group_by` (all four keys by default).
+        """
+        group_by = request.query_params.get('group_by')
+        group_by = [field.strip() for field in group_by.split(',')] if group_by else GROUP_FIELDS
+        if not group_by or any(field not in GROUP_FIELDS for field in group_by):
+            return Response({"success":False,"message": "Please provide a valid group_by (depot_id, producer_company, matnr, month)."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = ExpiredValueRollup.objects.all()
+        for field in ['depot_id', 'producer_company', 'matnr']:
+            value = request.query_params.get(field)
+            if value:
+                queryset = queryset.filter(**{field: value})
+        try:
+            from_month = request.query_params.get('from_month')
+            if from_month:
+                queryset = queryset.filter(month__gte=datetime.strptime(from_month, '%Y-%m').date())
+            to_month = request.query_params.get('to_month')
+            if to_month:
+                queryset = queryset.filter(month__lte=datetime.strptime(to_month, '%Y-%m').date())
+        except ValueError:
+            return Response({"success":False,"message": "Months must be in YYYY-MM format."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = (
+            queryset
+            .values(*group_by)
+            .annotate(
+                withdrawn_val=Sum('withdrawn_val'),
+                withdrawn_lines=Sum('withdrawn_lines'),
+                replaced_val=Sum('replaced_val'),
+                replaced_lines=Sum('replaced_lines'),
+            )
+            .order_by(*group_by)
+        )
+        # Grouping keys missing from the rows are skipped by the serializer
+        data = RollupSummarySerializer(queryset, many=True).data
+
+        page = int(request.query_params.get('page', 1))
+        page_size = int(request.query_params.get('per_page', 10))
+        if page <= 0 or page_size <= 0:
+            return Response({
+                "success": False,
+                "message": "Invalid 'page' or 'per_page'. Must be positive integers."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        logger.info("Rollup summary fetched, grouped by %s", group_by)
+        return Response(paginate(data, page=page, per_page=page_size), status=status.HTTP_200_OK)
+
+
+class StatusCountView(APIView):
+    """
+    View returning open invoice counts per status from `expr_status_count`.
+
+    The counts are kept by the `status_counts` transition log consumer, so
+    they trail live data by up to one consumer run.
+    """
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='depot_id', description='Depot ID; all depots when omitted', required=False, type=str),
+        ],
+    )
+    def get(self, request):
+        queryset = InvoiceStatusCount.objects.filter(invoices__gt=0)
+        depot_id = request.query_params.get('depot_id')
+        if depot_id:
+            queryset = queryset.filter(depot_id=depot_id)
+        counts = queryset.values('status').annotate(invoices=Sum('invoices')).order_by('status')
+        return Response({"success":True,"message": "Status counts fetched successfully.", "data": {row['status']: row['invoices'] for row in counts}}, status=status.HTTP_200_OK)
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-19 23:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line_type', models.CharField(choices=[('request_list', 'Request List'), ('withdrawal_list', 'Withdrawal List'), ('replacement_list', 'Replacement List')], max_length=20)),
+                ('line_id', models.BigIntegerField()),
+                ('invoice_id', models.BigIntegerField()),
+                ('invoice_no', models.CharField(blank=True, max_length=12, null=True)),
+                ('mio_id', models.CharField(max_length=40)),
+                ('rm_id', models.CharField(max_length=40)),
+                ('da_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('depot_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('delivery_da_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Sync Tombstone',
+                'verbose_name_plural': 'Sync Tombstones',
+                'db_table': 'expr_sync_tombstone',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-20 00:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='synctombstone',
+            name='line_type',
+            field=models.CharField(choices=[('request_list', 'Request List'), ('withdrawal_list', 'Withdrawal List'), ('replacement_list', 'Replacement List'), ('invoice', 'Invoice')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,73 @@
+from django.db import models
+
+# Create your models here.
+class SyncTombstone(models.Model):
+    """
+    Model recording a deleted invoice line for the delta sync feed.
+
+    The invoice scope is copied onto the row so the feed can be filtered
+    without joining back to an invoice that may itself be gone. Rows are
+    append-only; the auto-increment id is the tombstone part of the sync cursor.
+    An `invoice` tombstone (`line_id` is the invoice id) records a whole
+    invoice leaving the scope it had: archived, or moved by a change of its
+    scope fields.
+    """
+    class LineType(models.TextChoices):
+        REQUEST_LIST = 'request_list', 'Request List'
+        WITHDRAWAL_LIST = 'withdrawal_list', 'Withdrawal List'
+        REPLACEMENT_LIST = 'replacement_list', 'Replacement List'
+        INVOICE = 'invoice', 'Invoice'
+    line_type = models.CharField(max_length=20, choices=LineType.choices)
+    line_id = models.BigIntegerField()
+    invoice_id = models.BigIntegerField()
+    invoice_no = models.CharField(max_length=12, blank=True, null=True)
+    mio_id = models.CharField(max_length=40)
+    rm_id = models.CharField(max_length=40)
+    da_id = models.CharField(max_length=40, null=True, blank=True)
+    depot_id = models.CharField(max_length=40, null=True, blank=True)
+    delivery_da_id = models.CharField(max_length=40, null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.invoice_no} {self.line_type} {self.line_id}'
+
+    @classmethod
+    def record(cls, invoice, line_type, lines):
+        """
+        Record tombstones for `lines` of `invoice` that are being deleted.
+
+        Call in the same transaction as the delete.
+        """
+        cls.objects.bulk_create([
+            cls(
+                line_type=line_type, line_id=line.pk, invoice_id=invoice.pk, invoice_no=invoice.invoice_no,
+                mio_id=invoice.mio_id, rm_id=invoice.rm_id, da_id=invoice.da_id,
+                depot_id=invoice.depot_id, delivery_da_id=invoice.delivery_da_id,
+            )
+            for line in lines
+        ])
+
+    @classmethod
+    def record_invoices(cls, invoices):
+        """
+        Record tombstones for `invoices` leaving the scope they had.
+
+        Args:
+            invoices (iterable): Dicts of the invoice `id`, `invoice_no` and
+                scope fields, as they were before the change.
+
+        Call in the same transaction as the change.
+        """
+        cls.objects.bulk_create([
+            cls(
+                line_type=cls.LineType.INVOICE, line_id=invoice['id'], invoice_id=invoice['id'], invoice_no=invoice['invoice_no'],
+                mio_id=invoice['mio_id'], rm_id=invoice['rm_id'], da_id=invoice['da_id'],
+                depot_id=invoice['depot_id'], delivery_da_id=invoice['delivery_da_id'],
+            )
+            for invoice in invoices
+        ])
+
+    class Meta:
+        db_table = 'expr_sync_tombstone'
+        verbose_name = 'Sync Tombstone'
+        verbose_name_plural = 'Sync Tombstones'
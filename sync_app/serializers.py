@@ -0,0 +1,30 @@
+from rest_framework import serializers
+from withdrawal_app.models import WithdrawalInfo
+from replacement_app.models import ReplacementList
+from replacement_app.serializers import RequestListSerializer, WithdrawalListSerializer
+from .models import SyncTombstone
+
+
+class SyncReplacementListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReplacementList
+        fields = '__all__'
+
+
+class SyncInvoiceSerializer(serializers.ModelSerializer):
+    """
+    Serializer for one changed invoice in the delta sync feed, with all its current lines.
+    """
+    request_list = RequestListSerializer(many=True, read_only=True)
+    withdrawal_list = WithdrawalListSerializer(many=True, read_only=True)
+    replacement_list = SyncReplacementListSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = WithdrawalInfo
+        fields = '__all__'
+
+
+class SyncTombstoneSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SyncTombstone
+        fields = ['line_type', 'line_id', 'invoice_id', 'invoice_no', 'deleted_at']
@@ -0,0 +1,85 @@
+from datetime import datetime
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from archive_app.tier import archive_invoices
+from outbox_app.visibility import Gap, Position
+from withdrawal_app.models import WithdrawalInfo, WithdrawalRequestList
+from withdrawal_app.transitions import transition
+from .models import SyncTombstone
+from .views import encode_cursor, decode_cursor
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        updated_at = datetime(2026, 10, 19, 14, 5, 9, 123456)
+        cursor = encode_cursor(updated_at, 42, Position(7, ()))
+        self.assertEqual(decode_cursor(cursor), (updated_at, 42, Position(7, ())))
+
+    def test_round_trip_keeps_microseconds_of_zero(self):
+        updated_at = datetime(2026, 1, 2, 3, 4, 5)
+        self.assertEqual(decode_cursor(encode_cursor(updated_at, 1, Position(0, ()))), (updated_at, 1, Position(0, ())))
+
+    def test_round_trip_with_gaps(self):
+        tombstones = Position(15, (Gap(9, 11, 1760000000),))
+        self.assertEqual(encode_cursor(None, 0, tombstones), '0.0.15.9-11@1760000000')
+        self.assertEqual(decode_cursor(encode_cursor(None, 0, tombstones)), (None, 0, tombstones))
+
+    def test_initial_cursor(self):
+        self.assertEqual(encode_cursor(None, 0, Position(0, ())), '0.0.0')
+        self.assertEqual(decode_cursor('0.0.0'), (None, 0, Position(0, ())))
+
+    def test_malformed(self):
+        for cursor in ['', 'abc', '0.0', '0.0.0.0', '20261019.x.0', '0.1.y', '0.0.4.5-x@1']:
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.invoice = WithdrawalInfo.objects.create(invoice_no='INV1', mio_id='M1', rm_id='R1', da_id='D1', depot_id='P1', partner_id='C1')
+        self.line = WithdrawalRequestList.objects.create(invoice_id=self.invoice, matnr='X1', batch='B1', pack_qty=1, unit_qty=0, net_val=10)
+        self.cursors = {}
+
+    def sync(self, **scope):
+        key = tuple(sorted(scope.items()))
+        query = {**scope, 'since': self.cursors[key]} if key in self.cursors else scope
+        response = self.client.get(reverse('delta_sync'), query)
+        self.assertEqual(response.status_code, 200)
+        self.cursors[key] = response.data['cursor']
+        return response.data
+
+    def deleted(self, data):
+        return [(tombstone['line_type'], tombstone['line_id']) for tombstone in data['deleted']]
+
+    def test_deleted_line_reaches_its_scope_only(self):
+        self.sync(mio_id='M1')
+        self.sync(mio_id='M2')
+        SyncTombstone.record(self.invoice, SyncTombstone.LineType.REQUEST_LIST, [self.line])
+        self.assertEqual(self.deleted(self.sync(mio_id='M1')), [('request_list', self.line.pk)])
+        self.assertEqual(self.deleted(self.sync(mio_id='M2')), [])
+        self.assertEqual(self.deleted(self.sync(mio_id='M1')), [])
+
+    def test_tombstone_committed_behind_the_cursor_is_returned(self):
+        self.sync(mio_id='M1')
+        first = SyncTombstone.objects.create(line_type='request_list', line_id=1, invoice_id=self.invoice.pk, mio_id='M1', rm_id='R1')
+        SyncTombstone.objects.create(id=first.pk + 2, line_type='request_list', line_id=3, invoice_id=self.invoice.pk, mio_id='M1', rm_id='R1')
+        self.assertEqual(self.deleted(self.sync(mio_id='M1')), [('request_list', 1), ('request_list', 3)])
+        # The id in between commits after the cursor was handed out
+        SyncTombstone.objects.create(id=first.pk + 1, line_type='request_list', line_id=2, invoice_id=self.invoice.pk, mio_id='M1', rm_id='R1')
+        self.assertEqual(self.deleted(self.sync(mio_id='M1')), [('request_list', 2)])
+
+    def test_archived_invoice_is_tombstoned(self):
+        self.sync(mio_id='M1')
+        archive_invoices([self.invoice.pk])
+        self.assertEqual(self.deleted(self.sync(mio_id='M1')), [('invoice', self.invoice.pk)])
+
+    def test_invoice_moved_out_of_scope_is_tombstoned(self):
+        self.sync(da_id='D1')
+        self.sync(mio_id='M1')
+        transition(self.invoice, WithdrawalInfo.Status.REQUEST_APPROVED, da_id='D2')
+        self.assertEqual(self.deleted(self.sync(da_id='D1')), [('invoice', self.invoice.pk)])
+        # Still in the MIO's scope, where it comes up as changed instead
+        data = self.sync(mio_id='M1')
+        self.assertEqual(self.deleted(data), [])
+        self.assertEqual([invoice['id'] for invoice in data['invoices']], [self.invoice.pk])
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views as sync_views
+
+urlpatterns = [
+    path('', sync_views.DeltaSyncView.as_view(), name='delta_sync'),
+]
@@ -0,0 +1,143 @@
+import logging
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from withdrawal_app.models import WithdrawalInfo
+from outbox_app.visibility import advance, current_position, decode_position, encode_position, prune, unread
+from .models import SyncTombstone
+from .serializers import SyncInvoiceSerializer, SyncTombstoneSerializer
+
+# Set logger
+logger = logging.getLogger("sync_app")
+
+SCOPE_FIELDS = ['mio_id', 'rm_id', 'depot_id', 'da_id', 'delivery_da_id']
+CURSOR_TIME_FORMAT = '%Y%m%d%H%M%S%f'
+
+
+def encode_cursor(updated_at, invoice_id, tombstones):
+    """
+    Build the opaque sync cursor `<updated_at>.<invoice id>.<tombstone position>`.
+
+    The tombstone position is a `outbox_app.visibility` position token: the
+    last tombstone id read and the ids below it not visible yet.
+    """
+    stamp = updated_at.strftime(CURSOR_TIME_FORMAT) if updated_at else '0'
+    return f'{stamp}.{invoice_id}.{encode_position(tombstones)}'
+
+
+def decode_cursor(cursor):
+    """
+    Parse a cursor made by `encode_cursor`.
+
+    Returns:
+        tuple: (updated_at or None, invoice id, tombstone position).
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    stamp, invoice_id, tombstones = cursor.split('.', 2)
+    updated_at = None if stamp == '0' else datetime.strptime(stamp, CURSOR_TIME_FORMAT)
+    return updated_at, int(invoice_id), decode_position(tombstones)
+
+
+def in_scope(tombstones, scope):
+    """
+    Keep the tombstones a caller filtering on `scope` should get.
+
+    Tombstones are read across scopes, so the cursor's gaps cover every
+    tombstone id, and filtered here. An `invoice` tombstone is also dropped
+    when its invoice is in `scope` now: the change was to a scope field the
+    caller does not filter on, or the invoice moved away and back.
+    """
+    tombstones = [tombstone for tombstone in tombstones if all(getattr(tombstone, field) == value for field, value in scope.items())]
+    moved = [tombstone.invoice_id for tombstone in tombstones if tombstone.line_type == SyncTombstone.LineType.INVOICE]
+    if not moved:
+        return tombstones
+    kept = set(WithdrawalInfo.objects.filter(**scope, id__in=moved).values_list('id', flat=True))
+    return [
+        tombstone for tombstone in tombstones
+        if not (tombstone.line_type == SyncTombstone.LineType.INVOICE and tombstone.invoice_id in kept)
+    ]
+
+
+# Create your views here.
+class DeltaSyncView(APIView):
+    """
+    View returning what changed in the caller's scope since a sync cursor.
+
+    Changed invoices come from the `(updated_at, id)` index on WithdrawalInfo;
+    every line write refreshes its invoice's totals and `updated_at`, so changed
+    lines surface through their invoice, which is returned with all current
+    lines. Deleted lines are returned as tombstones, and so are invoices that
+    were archived or moved out of the caller's scope (`line_type` `invoice`).
+
+    Invoice changes younger than `SYNC_SETTLE_SECONDS` are held back, as
+    `updated_at` is set before the commit; a write transaction open for
+    longer than that can still commit behind the cursor, and the change then
+    reaches the client with the invoice's next change. Tombstones are read
+    by id with the gaps of `outbox_app.visibility` and are not held back.
+    """
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='since', description='Cursor from the previous sync; omit for a full sync', required=False, type=str),
+            OpenApiParameter(name='mio_id', description='Mio ID', required=False, type=str),
+            OpenApiParameter(name='rm_id', description='RM ID', required=False, type=str),
+            OpenApiParameter(name='depot_id', description='Depot ID', required=False, type=str),
+            OpenApiParameter(name='da_id', description='Delivery Agent ID', required=False, type=str),
+            OpenApiParameter(name='delivery_da_id', description='Delivery DA ID', required=False, type=str),
+            OpenApiParameter(name='limit', description='Maximum invoices and tombstones per page (max 500)', required=False, type=int),
+        ],
+        responses={
+            status.HTTP_200_OK: SyncInvoiceSerializer(many=True),
+            status.HTTP_400_BAD_REQUEST: OpenApiResponse(description="Invalid request parameters"),
+        }
+    )
+    def get(self, request):
+        """
+        Return invoices changed and lines deleted since `since`.
+
+        Keep calling with the returned `cursor` while `has_more` is true.
+        """
+        scope = {field: request.query_params.get(field) for field in SCOPE_FIELDS if request.query_params.get(field)}
+        if not scope:
+            return Response({"success":False,"message": "Please provide at least one ID (mio_id, rm_id, depot_id, da_id or delivery_da_id)."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            since = request.query_params.get('since')
+            since_time, since_id, tombstone_position = decode_cursor(since) if since else (None, 0, None)
+            limit = min(int(request.query_params.get('limit', 200)), 500)
+        except ValueError:
+            return Response({"success":False,"message": "Invalid 'since' cursor or 'limit'."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit <= 0:
+            return Response({"success":False,"message": "Invalid 'limit'. Must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        settled = datetime.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+        invoices = WithdrawalInfo.objects.filter(**scope, updated_at__lt=settled)
+        if since_time:
+            invoices = invoices.filter(Q(updated_at__gt=since_time) | Q(updated_at=since_time, id__gt=since_id))
+        invoices = list(
+            invoices
+            .order_by('updated_at', 'id')
+            .prefetch_related('request_list', 'withdrawal_list', 'replacement_list')[:limit + 1]
+        )
+        # A full sync needs no deletion from before it started
+        tombstone_position = prune(tombstone_position or current_position(SyncTombstone, 'deleted_at'))
+        tombstones = list(SyncTombstone.objects.filter(unread(tombstone_position)).order_by('id')[:limit + 1])
+        has_more = len(invoices) > limit or len(tombstones) > limit
+        invoices, tombstones = invoices[:limit], tombstones[:limit]
+        tombstone_position = advance(tombstone_position, [tombstone.id for tombstone in tombstones])
+        tombstones = in_scope(tombstones, scope)
+
+        if invoices:
+            since_time, since_id = invoices[-1].updated_at, invoices[-1].id
+        logger.info("Sync for %s returned %s invoices and %s tombstones", scope, len(invoices), len(tombstones))
+        return Response({
+            "success": True,
+            "cursor": encode_cursor(since_time, since_id, tombstone_position),
+            "has_more": has_more,
+            "invoices": SyncInvoiceSerializer(invoices, many=True).data,
+            "deleted": SyncTombstoneSerializer(tombstones, many=True).data,
+        }, status=status.HTTP_200_OK)
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class WithdrawalAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'withdrawal_app'
+
+    def ready(self):
+        from .dialect import register_functions
+        connection_created.connect(register_functions, dispatch_uid='withdrawal_app.dialect')
@@ -0,0 +1,113 @@
+import heapq
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.db.models import Count, Q
+from replacement_app.picklist import invalidate_picklist
+from .models import WithdrawalInfo
+from .transitions import bulk_transition
+
+Status = WithdrawalInfo.Status
+
+# stage: (status waiting for a DA, DA column, status once assigned)
+STAGES = {
+    'withdrawal': (Status.REQUEST_APPROVED, 'da_id', Status.WITHDRAWAL_PENDING),
+    'delivery': (Status.REPLACEMENT_APPROVED, 'delivery_da_id', Status.DELIVERY_PENDING),
+}
+
+
+def open_workload(da_ids):
+    """
+    Count the open invoices of each DA with one aggregate query.
+
+    Open work is every withdrawal still to collect and every delivery still
+    to make, whichever stage is being assigned.
+
+    Returns:
+        Counter: DA id to open invoice count, zero for idle DAs.
+    """
+    rows = (
+        WithdrawalInfo.objects
+        .filter(
+            Q(last_status=Status.WITHDRAWAL_PENDING, da_id__in=da_ids)
+            | Q(last_status=Status.DELIVERY_PENDING, delivery_da_id__in=da_ids)
+        )
+        .values('last_status', 'da_id', 'delivery_da_id')
+        .annotate(open=Count('id'))
+    )
+    workload = Counter(dict.fromkeys(da_ids, 0))
+    for row in rows:
+        da = row['da_id'] if row['last_status'] == Status.WITHDRAWAL_PENDING else row['delivery_da_id']
+        workload[da] += row['open']
+    return workload
+
+
+def plan_assignment(routes, workload):
+    """
+    Hand each route to the least loaded DA, biggest routes first.
+
+    A route stays with one DA. Placing the largest routes first on the
+    currently lightest DA keeps the final loads close together.
+
+    Args:
+        routes (dict): Route id to invoice ids.
+        workload (Counter): DA id to current open invoices.
+
+    Returns:
+        dict: DA id to the list of route ids it receives.
+    """
+    heap = [(load, da) for da, load in workload.items()]
+    heapq.heapify(heap)
+    plan = defaultdict(list)
+    for route_id in sorted(routes, key=lambda r: (-len(routes[r]), r or '')):
+        load, da = heapq.heappop(heap)
+        plan[da].append(route_id)
+        heapq.heappush(heap, (load + len(routes[route_id]), da))
+    return plan
+
+
+def auto_assign(depot_id, stage, da_ids, dry_run=False, actor=''):
+    """
+    Assign every invoice of a depot waiting for a DA at `stage`.
+
+    Pending invoices are grouped by route and the routes spread over `da_ids`
+    by open workload. Each DA's invoices are then written with one UPDATE,
+    guarded on the waiting status so invoices assigned by hand meanwhile are
+    left alone.
+
+    Args:
+        depot_id (str): Depot whose invoices are assigned.
+        stage (str): `withdrawal` or `delivery`.
+        da_ids (list): DAs to share the work between.
+        dry_run (bool): Plan only, write nothing.
+        actor (str): Who is assigning, for the transition log.
+
+    Returns:
+        dict: DA id to `{"routes": [...], "invoices": n}` for the DAs given work.
+    """
+    waiting, da_field, assigned = STAGES[stage]
+    da_ids = list(dict.fromkeys(da_ids))
+    with transaction.atomic():
+        pending = (
+            WithdrawalInfo.objects
+            .filter(depot_id=depot_id, last_status=waiting)
+            .values_list('id', 'route_id')
+        )
+        routes = defaultdict(list)
+        for invoice_id, route_id in pending:
+            routes[route_id].append(invoice_id)
+        if not routes:
+            return {}
+
+        plan = plan_assignment(routes, open_workload(da_ids))
+        result = {}
+        for da, route_ids in plan.items():
+            ids = [invoice_id for route_id in route_ids for invoice_id in routes[route_id]]
+            count = len(ids)
+            if not dry_run:
+                count = bulk_transition(
+                    WithdrawalInfo.objects.filter(id__in=ids, last_status=waiting), assigned, actor, **{da_field: da}
+                )
+            result[da] = {"routes": route_ids, "invoices": count}
+        if stage == 'delivery' and not dry_run:
+            invalidate_picklist(depot_id)
+    return result
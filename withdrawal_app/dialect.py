@@ -0,0 +1,75 @@
+"""
+The few places where the raw SQL differs between MySQL (production) and
+SQLite (local benchmarks and regression tests).
+
+Queries are written in MySQL; what SQLite lacks is either registered on its
+connections as a function (`CONCAT`, `NOW`) or built here per vendor
+(`IN` lists, month truncation, upserts).
+"""
+from datetime import datetime
+from django.db import connection
+
+
+def _concat(*parts):
+    # MySQL's CONCAT is NULL as soon as one argument is
+    if any(part is None for part in parts):
+        return None
+    return ''.join(str(part) for part in parts)
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def register_functions(sender, connection, **kwargs):
+    """`connection_created` receiver adding the MySQL functions the raw SQL uses to SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    connection.connection.create_function('CONCAT', -1, _concat, deterministic=True)
+    connection.connection.create_function('NOW', 0, _now)
+
+
+def in_clause(column, values):
+    """
+    Build `column IN (%s, ...)` with one placeholder per value.
+
+    Use instead of binding a tuple to a single `IN %s`, which only the
+    MySQL driver expands.
+
+    Returns:
+        tuple: (clause, params); a clause matching nothing when `values` is empty.
+    """
+    values = list(values)
+    if not values:
+        return "1 = 0", []
+    return f"{column} IN ({', '.join(['%s'] * len(values))})", values
+
+
+def month_start(column):
+    """SQL expression for the first day of the month of a date column."""
+    if connection.vendor == 'sqlite':
+        return f"date({column}, 'start of month')"
+    return f"DATE_SUB({column}, INTERVAL DAYOFMONTH({column}) - 1 DAY)"
+
+
+def upsert(key_columns, added_columns, touched_column=None):
+    """
+    Build the clause ending an `INSERT` that adds to the row it collides with.
+
+    Args:
+        key_columns (list): The unique key the insert may collide on (SQLite names it).
+        added_columns (list): Columns whose inserted value is added to the existing one.
+        touched_column (str, optional): Column set to `NOW()` on update.
+
+    Returns:
+        str: `ON DUPLICATE KEY UPDATE ...` on MySQL, `ON CONFLICT (...) DO UPDATE SET ...` on SQLite.
+    """
+    if connection.vendor == 'sqlite':
+        assignments = [f"{column} = {column} + excluded.{column}" for column in added_columns]
+        clause = f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET "
+    else:
+        assignments = [f"{column} = {column} + VALUES({column})" for column in added_columns]
+        clause = "ON DUPLICATE KEY UPDATE "
+    if touched_column:
+        assignments.append(f"{touched_column} = NOW()")
+    return clause + ",\n    ".join(assignments)
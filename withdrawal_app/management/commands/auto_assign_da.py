@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from withdrawal_app.assignment import STAGES, auto_assign
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign DAs to every invoice of a depot waiting for one, grouping "
+        "invoices by route and balancing on each DA's open workload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('depot_id', help="Depot whose invoices are assigned.")
+        parser.add_argument('--stage', choices=sorted(STAGES), required=True, help="withdrawal or delivery.")
+        parser.add_argument('--da', dest='da_ids', action='append', required=True, help="DA id; repeat for each DA.")
+        parser.add_argument('--dry-run', action='store_true', help="Print the plan without assigning.")
+
+    def handle(self, *args, **options):
+        if not all(options['da_ids']):
+            raise CommandError("DA ids must not be empty.")
+        result = auto_assign(options['depot_id'], options['stage'], options['da_ids'], dry_run=options['dry_run'], actor='command:auto_assign_da')
+        for da, assigned in result.items():
+            routes = ", ".join(route or '-' for route in assigned['routes'])
+            self.stdout.write(f"{da}: {assigned['invoices']} invoices on routes {routes}")
+        action = "Planned" if options['dry_run'] else "Assigned"
+        total = sum(assigned['invoices'] for assigned in result.values())
+        self.stdout.write(self.style.SUCCESS(f"{action} {total} invoices to {len(result)} DAs."))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from django.utils import timezone
+from withdrawal_app.models import WithdrawalInfo
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the denormalized invoice totals with their line tables and "
+        "optionally fix (backfill) the invoices that differ."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Rewrite the totals of mismatched invoices.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Invoices checked per query.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        expressions = WithdrawalInfo.totals_expressions()
+        actual = {f'actual_{field}': expression for field, expression in expressions.items()}
+        mismatch = Q()
+        for field in WithdrawalInfo.TOTAL_FIELDS:
+            mismatch |= ~Q(**{field: F(f'actual_{field}')})
+
+        last_id = 0
+        checked = mismatched = 0
+        while True:
+            ids = list(
+                WithdrawalInfo.objects
+                .filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            checked += len(ids)
+
+            wrong = list(
+                WithdrawalInfo.objects
+                .filter(id__in=ids)
+                .annotate(**actual)
+                .filter(mismatch)
+                .values_list('id', 'invoice_no')
+            )
+            if not wrong:
+                continue
+            mismatched += len(wrong)
+            for _, invoice_no in wrong:
+                self.stdout.write(f"Totals out of sync: {invoice_no}")
+            if options['fix']:
+                WithdrawalInfo.objects.filter(id__in=[pk for pk, _ in wrong]).update(updated_at=timezone.now(), **expressions)
+
+        action = "fixed" if options['fix'] else "found"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} invoices, {action} {mismatched} out of sync."))
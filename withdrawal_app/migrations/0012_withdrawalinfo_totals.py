@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-19 23:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('withdrawal_app', '0011_withdrawalinfo_delivery_da_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='withdrawalinfo',
+            name='replacement_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='withdrawalinfo',
+            name='replacement_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='withdrawalinfo',
+            name='request_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='withdrawalinfo',
+            name='request_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='withdrawalinfo',
+            name='withdrawal_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='withdrawalinfo',
+            name='withdrawal_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+    ]
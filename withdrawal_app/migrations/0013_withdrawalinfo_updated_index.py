@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-19 23:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('withdrawal_app', '0012_withdrawalinfo_totals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='withdrawalinfo',
+            index=models.Index(fields=['updated_at', 'id'], name='expr_wi_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-19 23:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('withdrawal_app', '0013_withdrawalinfo_updated_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WithdrawalTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('invoice_id', models.BigIntegerField()),
+                ('invoice_no', models.CharField(blank=True, max_length=12, null=True)),
+                ('from_status', models.CharField(blank=True, default='', max_length=40)),
+                ('to_status', models.CharField(choices=[('request_pending', 'Request Pending'), ('request_approved', 'Request Approved'), ('withdrawal_pending', 'Withdrawal Pending'), ('withdrawal_approval', 'Withdrawal Approval'), ('withdrawal_approved', 'Withdrawal Approved'), ('replacement_approval', 'Replacement Approval'), ('replacement_approved', 'Replacement Approved'), ('delivery_pending', 'Delivery Pending'), ('delivered', 'Delivered')], max_length=40)),
+                ('mio_id', models.CharField(max_length=40)),
+                ('rm_id', models.CharField(max_length=40)),
+                ('depot_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('da_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('delivery_da_id', models.CharField(blank=True, max_length=40, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Withdrawal Transition',
+                'verbose_name_plural': 'Withdrawal Transitions',
+                'db_table': 'expr_withdrawal_transition',
+                'indexes': [models.Index(fields=['mio_id', 'id'], name='expr_wt_mio_idx'), models.Index(fields=['rm_id', 'id'], name='expr_wt_rm_idx'), models.Index(fields=['depot_id', 'id'], name='expr_wt_depot_idx'), models.Index(fields=['da_id', 'id'], name='expr_wt_da_idx'), models.Index(fields=['delivery_da_id', 'id'], name='expr_wt_delivery_da_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('withdrawal_app', '0014_withdrawaltransition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='withdrawaltransition',
+            name='actor',
+            field=models.CharField(blank=True, default='', max_length=150),
+        ),
+    ]
@@ -1,4 +1,8 @@
+from decimal import Decimal
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 # Create your models here.
 class WithdrawalInfo(models.Model):
@@ -48,6 +52,62 @@ class WithdrawalInfo(models.Model):
     last_status = models.CharField(max_length=40, choices=Status.choices, default=Status.REQUEST_PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized line totals, kept in sync by refresh_totals() on every line write
+    request_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    request_count = models.IntegerField(default=0)
+    withdrawal_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    withdrawal_count = models.IntegerField(default=0)
+    replacement_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    replacement_count = models.IntegerField(default=0)
+    
+    TOTAL_FIELDS = [
+        'request_total', 'request_count', 'withdrawal_total', 'withdrawal_count',
+        'replacement_total', 'replacement_count',
+    ]
+    
+    @staticmethod
+    def totals_expressions():
+        """
+        Build the expressions that recompute the denormalized totals.
+
+        Each total and count is a correlated subquery over its line table, so
+        the result can be passed to `QuerySet.update()` to refresh any number of
+        invoices in one statement, or to `QuerySet.annotate()` to compare the
+        stored values against the lines.
+
+        Returns:
+            dict: Field name to expression, one entry per `TOTAL_FIELDS` item.
+        """
+        from replacement_app.models import ReplacementList
+        
+        expressions = {}
+        for prefix, model, fk in [
+            ('request', WithdrawalRequestList, 'invoice_id'),
+            ('withdrawal', WithdrawalList, 'invoice_id'),
+            ('replacement', ReplacementList, 'invoice'),
+        ]:
+            lines = model.objects.filter(**{fk: OuterRef('pk')}).order_by().values(fk)
+            expressions[f'{prefix}_total'] = Coalesce(
+                Subquery(lines.annotate(total=Sum('net_val')).values('total')),
+                Value(Decimal('0')),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            )
+            expressions[f'{prefix}_count'] = Coalesce(
+                Subquery(lines.annotate(count=Count('pk')).values('count')),
+                Value(0),
+            )
+        return expressions
+    
+    def refresh_totals(self):
+        """
+        Recompute the denormalized totals from the line tables.
+
+        Runs as a single UPDATE, so call it inside the transaction that wrote
+        the lines. Also bumps `updated_at`, since the invoice changed with its
+        lines; the app clock is used, as `auto_now` does, to keep the sync feed ordered.
+        """
+        WithdrawalInfo.objects.filter(pk=self.pk).update(updated_at=timezone.now(), **self.totals_expressions())
+        self.refresh_from_db(fields=[*self.TOTAL_FIELDS, 'updated_at'])
     
     def save(self, *args, **kwargs):
         """
@@ -69,6 +129,10 @@ class WithdrawalInfo(models.Model):
         db_table = 'expr_withdrawal_info'
         verbose_name = 'Withdrawal Info'
         verbose_name_plural = 'Withdrawal Info'
+        indexes = [
+            # Change feed for the delta sync endpoint
+            models.Index(fields=['updated_at', 'id'], name='expr_wi_updated_idx'),
+        ]
         
         
 class WithdrawalRequestList(models.Model):
@@ -130,3 +194,44 @@ class WithdrawalList(models.Model):
         verbose_name = 'Withdrawal List'
         verbose_name_plural = 'Withdrawal List'
     
+
+
+class WithdrawalTransition(models.Model):
+    """
+    Model representing one status change of an invoice, in an append-only log.
+
+    A row is written in the same transaction as every change of
+    `WithdrawalInfo.last_status` (see `withdrawal_app.transitions`); an empty
+    `from_status` marks a new invoice. This is the outbox of the invoice
+    workflow: the event stream and the `outbox_app` consumers read it in id
+    order. The invoice scope is copied onto the row so subscribers can follow
+    their own changes.
+    """
+    # Plain id, not a foreign key: the invoice may later move to the archive tables
+    invoice_id = models.BigIntegerField()
+    invoice_no = models.CharField(max_length=12, blank=True, null=True)
+    from_status = models.CharField(max_length=40, blank=True, default='')
+    to_status = models.CharField(max_length=40, choices=WithdrawalInfo.Status.choices)
+    # Who made the change: a username, `anon:<ip>` or `command:<name>`
+    actor = models.CharField(max_length=150, blank=True, default='')
+    mio_id = models.CharField(max_length=40)
+    rm_id = models.CharField(max_length=40)
+    depot_id = models.CharField(max_length=40, null=True, blank=True)
+    da_id = models.CharField(max_length=40, null=True, blank=True)
+    delivery_da_id = models.CharField(max_length=40, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.invoice_no}: {self.from_status or "-"} > {self.to_status}'
+
+    class Meta:
+        db_table = 'expr_withdrawal_transition'
+        verbose_name = 'Withdrawal Transition'
+        verbose_name_plural = 'Withdrawal Transitions'
+        indexes = [
+            models.Index(fields=['mio_id', 'id'], name='expr_wt_mio_idx'),
+            models.Index(fields=['rm_id', 'id'], name='expr_wt_rm_idx'),
+            models.Index(fields=['depot_id', 'id'], name='expr_wt_depot_idx'),
+            models.Index(fields=['da_id', 'id'], name='expr_wt_da_idx'),
+            models.Index(fields=['delivery_da_id', 'id'], name='expr_wt_delivery_da_idx'),
+        ]
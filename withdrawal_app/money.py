@@ -0,0 +1,60 @@
+"""
+Fixed-point money as integer paisa.
+
+Amounts are held as plain `int` counts of paisa (1/100 taka) in valuation,
+totals and aggregation loops: integer arithmetic is exact and much faster
+than `Decimal`, and unlike `float` it never drifts. Convert at the edges,
+with `to_paisa` when reading database or request values and `from_paisa`
+when writing a `DecimalField` or a response.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+PAISA_PER_TAKA = 100
+_ONE = Decimal(1)
+
+
+def to_paisa(value):
+    """
+    Convert an amount in taka (`Decimal`, `int`, `float` or numeric string) to paisa.
+
+    Fractions of a paisa are rounded half up, as `DecimalField` storage does.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, int):
+        return value * PAISA_PER_TAKA
+    if not isinstance(value, Decimal):
+        # str() first, so a float is taken at its shortest repr (0.1, not 0.1000000000000000055)
+        value = Decimal(str(value))
+    return int((value * PAISA_PER_TAKA).quantize(_ONE, rounding=ROUND_HALF_UP))
+
+
+def from_paisa(paisa):
+    """Convert paisa back to a 2-place `Decimal` amount in taka."""
+    return Decimal(paisa).scaleb(-2)
+
+
+def sum_paisa(values):
+    """Sum taka amounts exactly, returning paisa."""
+    return sum(map(to_paisa, values))
+
+
+def div_round(numerator, denominator):
+    """Integer division of non-negative values, rounded half up."""
+    quotient, remainder = divmod(numerator, denominator)
+    return quotient + (2 * remainder >= denominator)
+
+
+def unit_paisa(pack_paisa, units_per_pack):
+    """Price of one unit of a pack, rounded to the paisa."""
+    return div_round(pack_paisa, units_per_pack)
+
+
+def line_paisa(pack_paisa, units_per_pack, pack_qty, unit_qty):
+    """
+    Value `pack_qty` packs plus `unit_qty` loose units, rounded once to the paisa.
+
+    The value is taken on the total unit count, so loose units do not pile
+    up the rounding of a per-unit price.
+    """
+    return div_round((pack_qty * units_per_pack + unit_qty) * pack_paisa, units_per_pack)
@@ -1,5 +1,9 @@
+from django.db import transaction
 from rest_framework import serializers
 from withdrawal_app.models import WithdrawalList, WithdrawalRequestList, WithdrawalInfo
+from sync_app.models import SyncTombstone
+from inbox_app.fanout import sync_inbox
+from withdrawal_app.transitions import created, actor_of
 
 class WithdrawalRequestListSerializer(serializers.ModelSerializer):
     """
@@ -95,9 +99,12 @@ class WithdrawalRequestSerializer(serializers.ModelSerializer):
             WithdrawalInfo: The created withdrawal request instance.
         """
         requests_data = validated_data.pop('request_list')
-        info = WithdrawalInfo.objects.create(**validated_data)
-        for request_data in requests_data:
-            WithdrawalRequestList.objects.create(invoice_id=info, **request_data)
+        with transaction.atomic():
+            info = WithdrawalInfo.objects.create(**validated_data)
+            for request_data in requests_data:
+                WithdrawalRequestList.objects.create(invoice_id=info, **request_data)
+            info.refresh_totals()
+            created(info, actor_of(self.context.get('request')))
         return info
     
     def update(self, instance, validated_data):
@@ -113,38 +120,43 @@ class WithdrawalRequestSerializer(serializers.ModelSerializer):
         """
         requests_data = validated_data.pop('request_list',[])
         
-        # request list update 
-        # Get the existing items and create a dictionary for efficient lookup
-        existing_items = WithdrawalRequestList.objects.filter(invoice_id=instance)
-        existing_items_dict = {
-            (item.expire_date, item.pack_qty, item.strip_qty, item.unit_qty, item.net_val): item
-            for item in existing_items
-        }
-        
-        # Update existing items and create new items
-        new_items = set()
-        for item in requests_data:
-            key = (
-                item['expire_date'],
-                item['pack_qty'],
-                item['strip_qty'],
-                item['unit_qty'],
-                item['net_val']
-            )
-            new_items.add(key)
+        with transaction.atomic():
+            # request list update 
+            # Get the existing items and create a dictionary for efficient lookup
+            existing_items = WithdrawalRequestList.objects.filter(invoice_id=instance)
+            existing_items_dict = {
+                (item.expire_date, item.pack_qty, item.strip_qty, item.unit_qty, item.net_val): item
+                for item in existing_items
+            }
             
-            existing_item = existing_items_dict.get(key)
-            if existing_item:
-                for attr, value in item.items():
-                    setattr(existing_item, attr, value)
-                existing_item.save()
-            else:
-                WithdrawalRequestList.objects.create(invoice_id=instance, **item)
-        
-        # Delete removed items
-        for key, item in existing_items_dict.items():
-            if key not in new_items:
+            # Update existing items and create new items
+            new_items = set()
+            for item in requests_data:
+                key = (
+                    item['expire_date'],
+                    item['pack_qty'],
+                    item['strip_qty'],
+                    item['unit_qty'],
+                    item['net_val']
+                )
+                new_items.add(key)
+                
+                existing_item = existing_items_dict.get(key)
+                if existing_item:
+                    for attr, value in item.items():
+                        setattr(existing_item, attr, value)
+                    existing_item.save()
+                else:
+                    WithdrawalRequestList.objects.create(invoice_id=instance, **item)
+            
+            # Delete removed items, leaving tombstones for the sync feed
+            removed = [item for key, item in existing_items_dict.items() if key not in new_items]
+            SyncTombstone.record(instance, SyncTombstone.LineType.REQUEST_LIST, removed)
+            for item in removed:
                 item.delete()
+            
+            instance.refresh_totals()
+            sync_inbox([instance.pk])
         
         # Return the updated instance
         return instance
@@ -160,4 +172,9 @@ class DaAssignSerializer(serializers.ModelSerializer):
     class Meta:
         model = WithdrawalInfo
         fields = ['da_id']
-    
\ No newline at end of file
+    
+class AutoAssignSerializer(serializers.Serializer):
+    depot_id = serializers.CharField(max_length=40)
+    stage = serializers.ChoiceField(choices=['withdrawal', 'delivery'])
+    da_ids = serializers.ListField(child=serializers.CharField(max_length=40), allow_empty=False)
+    dry_run = serializers.BooleanField(default=False)
@@ -1,3 +1,185 @@
-from django.test import TestCase
+import gzip
+import json
+from datetime import date
+from decimal import Decimal
+from asgiref.sync import async_to_sync
+from django.db import IntegrityError
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from inbox_app.models import WorklistInbox
+from replacement_app.models import ReplacementList
+from .models import WithdrawalInfo, WithdrawalList, WithdrawalRequestList, WithdrawalTransition
+from .money import to_paisa, from_paisa, div_round, unit_paisa, line_paisa
+from .transitions import created, transition, bulk_transition
+from .utils import iter_keyset
 
-# Create your tests here.
+Status = WithdrawalInfo.Status
+
+
+class MoneyTests(SimpleTestCase):
+    def test_to_paisa_rounds_half_up(self):
+        self.assertEqual(to_paisa(Decimal('1.005')), 101)
+        self.assertEqual(to_paisa(Decimal('1.0049')), 100)
+        self.assertEqual(to_paisa('2.675'), 268)
+
+    def test_to_paisa_takes_floats_at_their_shortest_repr(self):
+        # 1.005 is 1.00499999999999989... as a binary float
+        self.assertEqual(to_paisa(1.005), 101)
+        self.assertEqual(to_paisa(0.1) + to_paisa(0.2), to_paisa(0.3))
+
+    def test_to_paisa_edges(self):
+        self.assertEqual(to_paisa(None), 0)
+        self.assertEqual(to_paisa(7), 700)
+        self.assertEqual(to_paisa(Decimal('0')), 0)
+
+    def test_from_paisa_round_trip(self):
+        self.assertEqual(from_paisa(12345), Decimal('123.45'))
+        self.assertEqual(str(from_paisa(5)), '0.05')
+        for value in ['0.00', '0.01', '99.99', '123456.78']:
+            self.assertEqual(from_paisa(to_paisa(Decimal(value))), Decimal(value))
+
+    def test_div_round_half_up(self):
+        self.assertEqual(div_round(5, 2), 3)
+        self.assertEqual(div_round(7, 3), 2)
+        self.assertEqual(div_round(8, 3), 3)
+        self.assertEqual(div_round(0, 3), 0)
+        self.assertEqual(div_round(6, 3), 2)
+
+    def test_unit_paisa(self):
+        # 100.00 taka for 30 units is 3.333... taka, 3.50 taka for 4 units 0.875
+        self.assertEqual(unit_paisa(10000, 30), 333)
+        self.assertEqual(unit_paisa(350, 4), 88)
+
+    def test_line_paisa_rounds_once_on_the_total(self):
+        # 10 loose units at 3.333... taka: 33.33 taka, not 10 x 3.33
+        self.assertEqual(line_paisa(10000, 30, 0, 10), 3333)
+        self.assertNotEqual(line_paisa(10000, 30, 0, 10), 10 * unit_paisa(10000, 30))
+        self.assertEqual(line_paisa(10000, 30, 2, 0), 20000)
+        self.assertEqual(line_paisa(10000, 30, 1, 15), 15000)
+        self.assertEqual(line_paisa(10000, 30, 0, 0), 0)
+
+
+class TransitionTests(TestCase):
+    def setUp(self):
+        self.first = WithdrawalInfo.objects.create(invoice_no='INV1', mio_id='M1', rm_id='R1', depot_id='P1', partner_id='C1')
+        self.second = WithdrawalInfo.objects.create(invoice_no='INV2', mio_id='M1', rm_id='R1', depot_id='P1', partner_id='C1')
+
+    def inbox(self, invoice):
+        return sorted(WorklistInbox.objects.filter(invoice_id=invoice.pk).values_list('role', 'owner_id', 'last_status'))
+
+    def test_created_logs_the_first_status_and_fills_the_inbox(self):
+        created(self.first, actor='mio1')
+        entry = WithdrawalTransition.objects.get(invoice_id=self.first.pk)
+        self.assertEqual((entry.from_status, entry.to_status, entry.actor), ('', Status.REQUEST_PENDING, 'mio1'))
+        self.assertEqual(self.inbox(self.first), [
+            ('depot', 'P1', Status.REQUEST_PENDING), ('mio', 'M1', Status.REQUEST_PENDING), ('rm', 'R1', Status.REQUEST_PENDING),
+        ])
+
+    def test_transition_logs_the_change_with_the_new_scope(self):
+        transition(self.first, Status.REQUEST_APPROVED, 'rm1', da_id='D1')
+        self.first.refresh_from_db()
+        self.assertEqual((self.first.last_status, self.first.da_id), (Status.REQUEST_APPROVED, 'D1'))
+        entry = WithdrawalTransition.objects.get(invoice_id=self.first.pk)
+        self.assertEqual(
+            (entry.from_status, entry.to_status, entry.actor, entry.invoice_no, entry.da_id),
+            (Status.REQUEST_PENDING, Status.REQUEST_APPROVED, 'rm1', 'INV1', 'D1'),
+        )
+        self.assertIn(('da', 'D1', Status.REQUEST_APPROVED), self.inbox(self.first))
+
+    def test_bulk_transition_logs_each_invoice(self):
+        transition(self.second, Status.REQUEST_APPROVED)
+        moved = bulk_transition(WithdrawalInfo.objects.filter(mio_id='M1'), Status.DELIVERED, 'command:test')
+        self.assertEqual(moved, 2)
+        self.assertEqual(
+            sorted(WithdrawalTransition.objects.filter(to_status=Status.DELIVERED).values_list('invoice_id', 'from_status', 'actor')),
+            [(self.first.pk, Status.REQUEST_PENDING, 'command:test'), (self.second.pk, Status.REQUEST_APPROVED, 'command:test')],
+        )
+        self.assertEqual(set(WithdrawalInfo.objects.values_list('last_status', flat=True)), {Status.DELIVERED})
+        # Delivered invoices leave every worklist
+        self.assertFalse(WorklistInbox.objects.exists())
+
+    def test_failed_transition_leaves_no_log_row(self):
+        with self.assertRaises(IntegrityError):
+            transition(self.first, Status.REQUEST_APPROVED, mio_id=None)
+        self.assertFalse(WithdrawalTransition.objects.exists())
+        self.assertEqual(WithdrawalInfo.objects.get(pk=self.first.pk).last_status, Status.REQUEST_PENDING)
+
+
+class RefreshTotalsTests(TestCase):
+    def setUp(self):
+        self.invoice = WithdrawalInfo.objects.create(invoice_no='INV1', mio_id='M1', rm_id='R1', partner_id='C1')
+
+    def add_lines(self, model, field, values):
+        model.objects.bulk_create([model(**{field: self.invoice}, matnr='X1', batch='B1', net_val=Decimal(value)) for value in values])
+
+    def test_totals_follow_the_lines(self):
+        self.add_lines(WithdrawalRequestList, 'invoice_id', ['10.25', '4.75'])
+        self.add_lines(WithdrawalList, 'invoice_id', ['3.10'])
+        self.add_lines(ReplacementList, 'invoice', ['1.01', '2.02', '3.03'])
+        before = self.invoice.updated_at
+        self.invoice.refresh_totals()
+        self.assertEqual(
+            [getattr(self.invoice, field) for field in WithdrawalInfo.TOTAL_FIELDS],
+            [Decimal('15.00'), 2, Decimal('3.10'), 1, Decimal('6.06'), 3],
+        )
+        self.assertGreater(self.invoice.updated_at, before)
+
+        WithdrawalRequestList.objects.filter(net_val=Decimal('4.75')).delete()
+        WithdrawalList.objects.all().delete()
+        self.invoice.refresh_totals()
+        stored = WithdrawalInfo.objects.values(*WithdrawalInfo.TOTAL_FIELDS).get(pk=self.invoice.pk)
+        self.assertEqual(stored, {
+            'request_total': Decimal('10.25'), 'request_count': 1, 'withdrawal_total': Decimal('0.00'),
+            'withdrawal_count': 0, 'replacement_total': Decimal('6.06'), 'replacement_count': 3,
+        })
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        today = date.today()
+        self.invoice = WithdrawalInfo.objects.create(
+            invoice_no='INV1', mio_id='M1', rm_id='R1', depot_id='P1', partner_id='C1', withdrawal_date=today,
+        )
+        WithdrawalList.objects.bulk_create([
+            WithdrawalList(invoice_id=self.invoice, matnr=f'X{index}', batch='B1', pack_qty=index, net_val=Decimal(index))
+            for index in range(1, 6)
+        ])
+        self.query = {'depot_id': 'P1', 'from_date': today.isoformat(), 'to_date': today.isoformat()}
+
+    def export(self, **query):
+        response = self.client.get(reverse('withdrawal_export'), {**self.query, **query})
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_iter_keyset_reads_in_chunks(self):
+        sql = "SELECT id, matnr FROM expr_withdrawal_list WHERE invoice_id_id = %s AND id > %s ORDER BY id LIMIT %s"
+        with self.assertNumQueries(3):
+            rows = list(iter_keyset(sql, [self.invoice.pk], chunk_size=2))
+        self.assertEqual([row['matnr'] for row in rows], ['X1', 'X2', 'X3', 'X4', 'X5'])
+
+    def test_csv(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = body.decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['line_id', 'invoice_no', 'invoice_type'])
+        self.assertEqual([line.split(',')[13] for line in lines[1:]], ['X1', 'X2', 'X3', 'X4', 'X5'])
+
+    def test_ndjson_gzip(self):
+        response, body = self.export(file_format='ndjson', gzip='1')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.ndjson.gz', response['Content-Disposition'])
+        rows = [json.loads(line) for line in gzip.decompress(body).decode().splitlines()]
+        # Raw SQL values keep the backend's type (a plain number on SQLite)
+        self.assertEqual([(row['matnr'], Decimal(str(row['net_val']))) for row in rows], [(f'X{index}', Decimal(index)) for index in range(1, 6)])
+
+    def test_asgi_gets_an_async_stream(self):
+        async def fetch():
+            response = await self.async_client.get(reverse('withdrawal_export'), self.query)
+            self.assertTrue(response.is_async)
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(async_to_sync(fetch)(), self.export()[1])
+
+    def test_invalid_params(self):
+        response = self.client.get(reverse('withdrawal_export'), {**self.query, 'file_format': 'xml'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,109 @@
+"""
+The write path of invoice status changes.
+
+`transition` (one invoice), `bulk_transition` (a queryset, one UPDATE) and
+`created` (a new invoice's first status) are the only supported ways to
+set `WithdrawalInfo.last_status`. Each one writes the `WithdrawalTransition`
+log rows and calls `inbox_app.fanout.sync_inbox` in the same transaction
+as the change, so the log, the worklist inbox and the invoice never
+disagree. Code that updates `last_status` any other way bypasses both.
+A change of scope field made through them also records an `invoice`
+tombstone for the scope the invoice left, for the delta sync feed.
+"""
+from django.db import transaction
+from django.utils import timezone
+from inbox_app.fanout import sync_inbox
+from sync_app.models import SyncTombstone
+from .models import WithdrawalInfo, WithdrawalTransition
+
+# Invoice columns copied onto each transition row
+SCOPE_FIELDS = ['mio_id', 'rm_id', 'depot_id', 'da_id', 'delivery_da_id']
+
+
+def actor_of(request):
+    """
+    Name the actor of a request for the transition log.
+
+    The username when authenticated, else `anon:<client ip>`; empty without a request.
+    """
+    if request is None:
+        return ''
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.get_username()
+    return f"anon:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def _entry(invoice, from_status, actor):
+    """Build the log row of `invoice` (a dict of its current values) leaving `from_status`."""
+    return WithdrawalTransition(
+        invoice_id=invoice['id'], invoice_no=invoice['invoice_no'],
+        from_status=from_status or '', to_status=invoice['last_status'], actor=actor[:150],
+        **{field: invoice[field] for field in SCOPE_FIELDS},
+    )
+
+
+def _values(invoice):
+    return {field: getattr(invoice, field) for field in ['id', 'invoice_no', 'last_status', *SCOPE_FIELDS]}
+
+
+def _moved(invoice, fields):
+    """Whether saving `fields` moves `invoice` (a dict of its current values) out of its scope."""
+    return any(field in fields and fields[field] != invoice[field] for field in SCOPE_FIELDS)
+
+
+def created(invoice, actor=''):
+    """
+    Record a new invoice: log its first status and build its inbox rows.
+
+    Call in the transaction that created it, once its lines are saved.
+    """
+    with transaction.atomic():
+        _entry(_values(invoice), '', actor).save()
+        sync_inbox([invoice.pk])
+
+
+def transition(invoice, to_status, actor='', **fields):
+    """
+    Move one invoice to `to_status`, saving `fields` with it, on behalf of `actor`.
+
+    Every status change goes through here (or `bulk_transition`), so the
+    transition log and the inbox are kept in step in the same transaction.
+
+    Returns:
+        WithdrawalInfo: The saved invoice.
+    """
+    with transaction.atomic():
+        from_status = invoice.last_status
+        if _moved(_values(invoice), fields):
+            SyncTombstone.record_invoices([_values(invoice)])
+        for name, value in fields.items():
+            setattr(invoice, name, value)
+        invoice.last_status = to_status
+        invoice.save()
+        _entry(_values(invoice), from_status, actor).save()
+        sync_inbox([invoice.pk])
+    return invoice
+
+
+def bulk_transition(queryset, to_status, actor='', **fields):
+    """
+    Move every invoice of `queryset` to `to_status` with one UPDATE.
+
+    Returns:
+        int: The number of invoices moved.
+    """
+    with transaction.atomic():
+        invoices = list(queryset.select_for_update().values('id', 'invoice_no', 'last_status', *SCOPE_FIELDS))
+        if invoices:
+            ids = [invoice['id'] for invoice in invoices]
+            WithdrawalInfo.objects.filter(id__in=ids).update(
+                last_status=to_status, updated_at=timezone.now(), **fields
+            )
+            WithdrawalTransition.objects.bulk_create([
+                _entry({**invoice, **fields, 'last_status': to_status}, invoice['last_status'], actor)
+                for invoice in invoices
+            ])
+            sync_inbox(ids)
+            SyncTombstone.record_invoices([invoice for invoice in invoices if _moved(invoice, fields)])
+    return len(invoices)
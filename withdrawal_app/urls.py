@@ -8,7 +8,9 @@ urlpatterns = [
     path('request/edit', withdrawal_views.WithdrawalRequestUpdateView.as_view(), name='withdrawal_request_edit'),
     path('request/approve/<str:invoice_no>', withdrawal_views.RequestApproveView.as_view(), name='request_approve'),
     path('assign-da', withdrawal_views.DaAssignView.as_view(), name='da_assign'),
+    path('auto-assign-da', withdrawal_views.AutoAssignView.as_view(), name='da_auto_assign'),
     path('save/<str:invoice_no>',withdrawal_views.WithdrawalSaveView.as_view(), name='withdrawal_save'),
     path('confirmation', withdrawal_views.WithdrawalConfirmationView.as_view(), name='withdrawal_confirmation'),
     path('final_list', withdrawal_views.WithdrawalInfoFinalListView.as_view(), name='withdrawal_approval'),
+    path('export', withdrawal_views.WithdrawalExportView.as_view(), name='withdrawal_export'),
 ]
\ No newline at end of file
@@ -1,3 +1,16 @@
+import csv
+import json
+import zlib
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from material_app.prices import units_per_pack
+from .money import to_paisa, from_paisa, unit_paisa
+
 def paginate(data,success=True,message="All items get successfully.", page=1, per_page=10, max_page_size=100):
     per_page = min(per_page, max_page_size)
     total_items = len(data)
@@ -21,15 +34,162 @@ def paginate(data,success=True,message="All items get successfully.", page=1, pe
     }
     
 def mtnr_unit_price(pack_size, unit_tp, unit_vat):
-    clean = pack_size.replace("'", "").replace("s", "").lower().replace(" ", "")
-    if "x" in clean:
-        parts = clean.split("x")
-        pack_strip = int(parts[0])
-        strip_unit = int(parts[1])
-        unit_per_pack = pack_strip * strip_unit
+    unit_per_pack = units_per_pack(pack_size)
+    unit_price = unit_paisa(to_paisa(unit_tp) + to_paisa(unit_vat), unit_per_pack)
+    return from_paisa(unit_price)
+
+
+class _Echo:
+    """File-like object whose write() hands the written line straight back to csv.writer."""
+    def write(self, value):
+        return value
+
+
+def iter_keyset(sql, params, chunk_size=2000):
+    """
+    Iterate a raw query in fixed-size chunks using keyset pagination.
+
+    The query must select its paging key as the first column and end with
+    `<key> > %s ORDER BY <key> LIMIT %s`. Each chunk re-binds the last key
+    seen, so at most `chunk_size` rows are held in memory at a time and no
+    single statement runs long enough to time out.
+
+    Yields:
+        dict: One row at a time, keyed by column name.
+    """
+    last_key = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*params, last_key, chunk_size])
+            columns = [col[0] for col in cursor.description]
+            rows = cursor.fetchall()
+        for row in rows:
+            yield dict(zip(columns, row))
+        if len(rows) < chunk_size:
+            return
+        last_key = rows[-1][0]
+
+
+def csv_stream(columns, rows):
+    """Yield a header line followed by one CSV line per row."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([row[col] for col in columns])
+
+
+def ndjson_stream(columns, rows):
+    """Yield one JSON document per row, newline delimited."""
+    for row in rows:
+        yield json.dumps({col: row[col] for col in columns}, cls=DjangoJSONEncoder) + "\n"
+
+
+def gzip_stream(chunks, flush_bytes=64 * 1024):
+    """
+    Gzip-compress an iterator of text chunks on the fly.
+
+    Compressed output is buffered and flushed every `flush_bytes` so the
+    response keeps moving without emitting one tiny write per row.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            buffer.append(data)
+            size += len(data)
+        if size >= flush_bytes:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    buffer.append(compressor.flush())
+    yield b"".join(buffer)
+
+
+def _take(chunks, count):
+    return list(islice(chunks, count))
+
+
+async def async_stream(chunks, batch=100):
+    """
+    Serve a synchronous chunk iterator as an async iterator.
+
+    Under ASGI, `StreamingHttpResponse` reads a synchronous iterator with
+    `sync_to_async(list)`, buffering the whole body before sending a byte.
+    This pulls `batch` chunks at a time on the request's sync thread (where
+    its database connection lives) instead, so memory stays bounded.
+    """
+    take = sync_to_async(_take, thread_sensitive=True)
+    while True:
+        part = await take(chunks, batch)
+        for chunk in part:
+            yield chunk
+        if len(part) < batch:
+            return
+
+
+def export_response(request, columns, rows, export_format, compress, filename):
+    """
+    Build a streaming download response for an export.
+
+    Args:
+        request (HttpRequest): The request; under ASGI the body is streamed
+            through `async_stream`.
+        columns (list): Column names, in output order.
+        rows (iterable): Row dicts, typically from `iter_keyset`.
+        export_format (str): `csv` or `ndjson`.
+        compress (bool): Gzip the body on the fly.
+        filename (str): Download file name without extension.
+
+    Returns:
+        StreamingHttpResponse: The streaming response.
+    """
+    if export_format == "ndjson":
+        body = ndjson_stream(columns, rows)
+        content_type = "application/x-ndjson"
     else:
-        unit_per_pack = int(clean)
+        body = csv_stream(columns, rows)
+        content_type = "text/csv"
+    filename = f"{filename}.{export_format}"
+    if compress:
+        body = gzip_stream(body)
+        content_type = "application/gzip"
+        filename = f"{filename}.gz"
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        body = async_stream(body)
+    response = StreamingHttpResponse(body, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
 
-    unit_price = (float(unit_tp) + float(unit_vat)) / unit_per_pack
-    return unit_price
 
+def parse_export_params(query_params):
+    """
+    Validate the common export query parameters.
+
+    `depot_id`, `from_date` and `to_date` (YYYY-MM-DD) are required;
+    `file_format` is `csv` (default) or `ndjson` (`format` itself is reserved
+    by DRF content negotiation); `gzip=1` compresses the body.
+
+    Returns:
+        tuple: (params dict, None) on success or (None, error message).
+    """
+    depot_id = query_params.get('depot_id')
+    if not depot_id:
+        return None, "Please provide depot_id."
+    try:
+        from_date = parse_date(query_params.get('from_date') or '')
+        to_date = parse_date(query_params.get('to_date') or '')
+    except ValueError:
+        from_date = to_date = None
+    if not from_date or not to_date or from_date > to_date:
+        return None, "Please provide a valid from_date and to_date (YYYY-MM-DD)."
+    export_format = query_params.get('file_format', 'csv')
+    if export_format not in ['csv', 'ndjson']:
+        return None, "Please provide a valid file_format (csv or ndjson)."
+    return {
+        "depot_id": depot_id,
+        "from_date": from_date,
+        "to_date": to_date,
+        "format": export_format,
+        "gzip": query_params.get('gzip') in ['1', 'true'],
+    }, None
@@ -1,15 +1,23 @@
 import logging
 from datetime import date
 from collections import defaultdict
-from django.db import connection
+from itertools import chain
+from django.db import connection, transaction
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from withdrawal_app.serializers import WithdrawalRequestSerializer, WithdrawalSerializer, WithdrawalListSerializer, DaAssignSerializer
+from withdrawal_app.serializers import WithdrawalRequestSerializer, WithdrawalSerializer, WithdrawalListSerializer, DaAssignSerializer, AutoAssignSerializer
 from withdrawal_app.models import WithdrawalInfo
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse, OpenApiTypes
-from .utils import paginate, mtnr_unit_price
+from report_app.rollups import record_withdrawal_lines
+from archive_app.tier import table_tiers
+from hierarchy_app.closure import rm_scope_sql, rm_scope_q
+from .assignment import auto_assign
+from monitoring_app.tracing import span, start_span, traced
+from .dialect import in_clause
+from .transitions import transition, actor_of
+from .utils import paginate, mtnr_unit_price, iter_keyset, export_response, parse_export_params
 
 # Set logger
 logger = logging.getLogger("withdrawal_app")
@@ -78,12 +86,12 @@ class WithdrawalRequestView(APIView):
         data['request_date'] = date.today()
         
         # Validate and save
-        serializer = WithdrawalRequestSerializer(data=data)
+        serializer = WithdrawalRequestSerializer(data=data, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             logger.info("Withdrawal request created successfully for MIO %s", mio)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-        logger.error(f"Error creating withdrawal request {mio} : {serializer.errors}")
+        logger.error("Error creating withdrawal request %s : %s", mio, serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     
@@ -120,8 +128,9 @@ class WithdrawalRequestListView(APIView):
             filters.append("wi.mio_id = %s")
             params.append(mio_id)
         if rm_id:
-            filters.append("wi.rm_id = %s")
-            params.append(rm_id)
+            clause, clause_params = rm_scope_sql(rm_id, request.query_params.get('scope'))
+            filters.append(clause)
+            params.extend(clause_params)
         if depot_id:
             filters.append("wi.depot_id = %s")
             params.append(depot_id)
@@ -150,7 +159,7 @@ class WithdrawalRequestListView(APIView):
         # WithdrawalInfo query
         main_info_query = f"""
             SELECT
-                wi.id, wi.invoice_no, wi.mio_id, wi.rm_id, wi.da_id, wi.depot_id, wi.route_id, wi.partner_id, wi.request_approval, wi.withdrawal_confirmation, wi.replacement_order, wi.order_approval, wi.order_delivery, wi.request_date, wi.request_approval_date, wi.withdrawal_date, wi.withdrawal_approval_date, wi.order_date, wi.order_approval_date, wi.delivery_date, wi.last_status, wi.invoice_type, 
+                wi.id, wi.invoice_no, wi.mio_id, wi.rm_id, wi.da_id, wi.depot_id, wi.route_id, wi.partner_id, wi.request_approval, wi.withdrawal_confirmation, wi.replacement_order, wi.order_approval, wi.order_delivery, wi.request_date, wi.request_approval_date, wi.withdrawal_date, wi.withdrawal_approval_date, wi.order_date, wi.order_approval_date, wi.delivery_date, wi.last_status, wi.invoice_type, wi.request_total, wi.request_count,
                 mio.`name` AS mio_name,
                 mio.mobile_number AS mio_mobile,
                 rm.`name` AS rm_name,
@@ -175,17 +184,16 @@ class WithdrawalRequestListView(APIView):
             ORDER BY wi.id DESC
             LIMIT 200;
         """
-        print(
-            f"main_info_query: {main_info_query}",
-        )       
+        logger.debug("main_info_query: %s", main_info_query)
         # Execute the query
         try:
-            with connection.cursor() as cursor:
+            with span('query') as current, connection.cursor() as cursor:
                 cursor.execute(main_info_query, params)
                 columns = [col[0] for col in cursor.description]
                 rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                current.set('rows', len(rows))
         except Exception as e:
-            logger.error(f"Error executing query: {e}")
+            logger.error("Error executing query: %s", e)
             return Response({"success":False,"message": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         if not rows:
@@ -210,24 +218,27 @@ class WithdrawalRequestListView(APIView):
         invoice_ids = [row['id'] for row in rows]     
         
         # Fetching material list query
-        material_list_query = """
+        invoice_clause, invoice_params = in_clause('rl.invoice_id_id', invoice_ids)
+        material_list_query = f"""
         SELECT rl.id AS list_id, rl.invoice_id_id AS invoice_id, rl.matnr, rl.batch, rl.pack_qty, rl.strip_qty, rl.unit_qty, rl.net_val, rl.expire_date, m.material_name, m.producer_company, m.unit_tp, m.unit_vat , m.pack_size 
         FROM expr_request_list AS rl 
         INNER JOIN rpl_material AS m ON rl.matnr = m.matnr
-        WHERE rl.invoice_id_id IN %s;
+        WHERE {invoice_clause};
         """
         
         if invoice_ids:
             try:
-                with connection.cursor() as cursor:
-                    cursor.execute(material_list_query,[tuple(invoice_ids)])
+                with span('query.materials') as current, connection.cursor() as cursor:
+                    cursor.execute(material_list_query, invoice_params)
                     material_rows = cursor.fetchall()
+                    current.set('rows', len(material_rows))
                     material_columns = [col[0] for col in cursor.description]
                     materials = [dict(zip(material_columns, row)) for row in material_rows]   
             except Exception as e:
-                logger.error(f"Error executing query: {e}")
+                logger.error("Error executing query: %s", e)
                 return Response({"success":False,"message": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
                 
+        group = start_span('group', rows=len(materials))
         # Group materials by invoice_id
         material_map = defaultdict(list)
         for mat in materials:
@@ -251,6 +262,7 @@ class WithdrawalRequestListView(APIView):
         # Attach materials to each row
         for row in rows:
             row['request_list'] = material_map.get(row['id'], [])
+        group.finish()
             
         # pagination
         page = int(request.query_params.get('page', 1))
@@ -261,8 +273,8 @@ class WithdrawalRequestListView(APIView):
                 "message": "Invalid 'page' or 'per_page'. Must be positive integers."
             }, status=status.HTTP_400_BAD_REQUEST)
             
-        paginate_results= paginate(rows,page=page,per_page=page_size)
-        logger.info(f"Fetched {len(rows)} withdrawal requests")
+        paginate_results= traced('paginate', paginate, rows,page=page,per_page=page_size)
+        logger.info("Fetched %s withdrawal requests", len(rows))
         return Response(paginate_results, status=status.HTTP_200_OK)
     
     
@@ -283,10 +295,10 @@ class RequestApproveView(APIView):
             Response: A response object containing the approval status.
         """
         withdrawal_request = get_object_or_404(WithdrawalInfo, invoice_no=invoice_no)
-        withdrawal_request.request_approval = True
-        withdrawal_request.request_approval_date = date.today()
-        withdrawal_request.last_status = 'request_approved'
-        withdrawal_request.save()
+        transition(
+            withdrawal_request, WithdrawalInfo.Status.REQUEST_APPROVED, actor_of(request),
+            request_approval=True, request_approval_date=date.today(),
+        )
         return Response({"detail": "Withdrawal request approved successfully."}, status=status.HTTP_200_OK)
        
     
@@ -311,13 +323,40 @@ class DaAssignView(APIView):
         withdrawal_request = get_object_or_404(WithdrawalInfo, invoice_no=invoice_no)
         serializer = DaAssignSerializer(withdrawal_request, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save(last_status=WithdrawalInfo.Status.WITHDRAWAL_PENDING) 
-            logger.info(f"Delivery agent assigned to withdrawal request {invoice_no}")
-            return Response({"success":True,"message": "Delivery agent assigned successfully.", "data": serializer.data}, status=status.HTTP_200_OK)
-        logger.error(f"Error assigning delivery agent to withdrawal request {invoice_no}: {serializer.errors}")
+            transition(withdrawal_request, WithdrawalInfo.Status.WITHDRAWAL_PENDING, actor_of(request), **serializer.validated_data)
+            logger.info("Delivery agent assigned to withdrawal request %s", invoice_no)
+            return Response({"success":True,"message": "Delivery agent assigned successfully.", "data": DaAssignSerializer(withdrawal_request).data}, status=status.HTTP_200_OK)
+        logger.error("Error assigning delivery agent to withdrawal request %s: %s", invoice_no, serializer.errors)
         return Response({"success":False,"message": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
     
     
+class AutoAssignView(APIView):
+    """
+    View to assign DAs to all waiting invoices of a depot in one pass.
+    """
+    serializer_class = AutoAssignSerializer
+    @extend_schema(request=AutoAssignSerializer)
+    def post(self, request):
+        """
+        Spread a depot's waiting invoices over the given DAs by route and open workload.
+
+        Stage `withdrawal` assigns `request_approved` invoices (`da_id`), stage
+        `delivery` assigns `replacement_approved` invoices (`delivery_da_id`).
+
+        Returns:
+            Response: The routes and invoice count given to each DA.
+        """
+        serializer = AutoAssignSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"success":False,"message": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        result = auto_assign(data['depot_id'], data['stage'], data['da_ids'], dry_run=data['dry_run'], actor=actor_of(request))
+        if not result:
+            return Response({"success":True,"message": "No invoices waiting for a DA.", "data": {}}, status=status.HTTP_200_OK)
+        logger.info("Auto assigned %s DAs for depot %s (%s)", data['stage'], data['depot_id'], result)
+        return Response({"success":True,"message": "DAs assigned successfully.", "data": result}, status=status.HTTP_200_OK)
+
+
 class WithdrawalSaveView(APIView):
     """
     View to save a withdrawal request.
@@ -341,21 +380,21 @@ class WithdrawalSaveView(APIView):
             return Response({"success":False,"message": "Withdrawal request does not exist"}, status=status.HTTP_404_NOT_FOUND)
         # Get DA id for logging
         da_id = info.da_id
-        # Update the withdrawal_date and save
-        info.withdrawal_date = date.today()
-        info.last_status = info.Status.WITHDRAWAL_APPROVAL
-        
         # Get the withdrawal items
         data = request.data
         
         # Validate and save
         serializer = WithdrawalListSerializer(data=data, many=True, context={'invoice_no': info.invoice_no})
         if serializer.is_valid():
-            info.save()
-            serializer.save()
+            with transaction.atomic():
+                lines = serializer.save()
+                info.refresh_totals()
+                # Update the withdrawal_date and status
+                transition(info, info.Status.WITHDRAWAL_APPROVAL, actor_of(request), withdrawal_date=date.today())
+                record_withdrawal_lines(info, lines)
             logger.info("Withdrawal successfully created for DA %s", da_id)
             return Response({"success":True,"message":"Items Save Successfully.","data":serializer.data}, status=status.HTTP_201_CREATED)
-        logger.error(f"Error creating withdrawal {da_id} : {serializer.errors}")
+        logger.error("Error creating withdrawal %s : %s", da_id, serializer.errors)
         return Response({"success":False, "message":serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
     
 class WithdrawalListView(APIView):
@@ -369,6 +408,7 @@ class WithdrawalListView(APIView):
         parameters=[
             OpenApiParameter(name='mio_id', description='Mio ID', required=False, type=str),
             OpenApiParameter(name='rm_id', description='RM ID', required=False, type=str),
+            OpenApiParameter(name='scope', description="With 'subtree', rm_id matches every MIO currently under the RM", required=False, type=str, enum=['subtree']),
             OpenApiParameter(name='depot_id', description='Depot ID', required=False, type=str),
             OpenApiParameter(name='da_id', description='Delivery Agent ID', required=False, type=str),
             OpenApiParameter(name='status', description='Filter status of the withdrawal request', required=True, type=str, enum=['all', 'withdrawal_list', 'withdrawal_approved', 'order_pending', 'order_approved', 'order_delivered'])
@@ -404,7 +444,7 @@ class WithdrawalListView(APIView):
         if mio_id:
             queryset = queryset.filter(mio_id=mio_id)
         if rm_id:
-            queryset = queryset.filter(rm_id=rm_id)
+            queryset = queryset.filter(rm_scope_q(rm_id, request.query_params.get('scope')))
         if depot_id:
             queryset = queryset.filter(depot_id=depot_id)
         if da_id:
@@ -428,12 +468,12 @@ class WithdrawalListView(APIView):
 
         # Ensure we return a meaningful response
         if not queryset.exists():
-            logger.error(f"No matching records found. {mio_id}, {rm_id}, {depot_id}, {da_id}, {status}")
+            logger.error("No matching records found. %s, %s, %s, %s, %s", mio_id, rm_id, depot_id, da_id, status)
             return Response({"success":False,"message": "No matching records found."}, status=status.HTTP_404_NOT_FOUND)
         
         # Serialize the queryset and return it as a response
         serializer = WithdrawalSerializer(queryset, many=True)
-        logger.info(f"Approval list fetched successfully for {mio_id}, {rm_id}, {depot_id}, {da_id}, {status}")
+        logger.info("Approval list fetched successfully for %s, %s, %s, %s, %s", mio_id, rm_id, depot_id, da_id, status)
         return Response({"success":True,"message": "Approval list fetched successfully.","data":serializer.data}, status=status.HTTP_200_OK)    
     
 class WithdrawalConfirmationView(APIView):
@@ -454,10 +494,10 @@ class WithdrawalConfirmationView(APIView):
         """
         invoice_no = request.data.get('invoice_no')
         withdrawal_request = get_object_or_404(WithdrawalInfo, invoice_no=invoice_no)
-        withdrawal_request.withdrawal_confirmation = True
-        withdrawal_request.withdrawal_approval_date = date.today()
-        withdrawal_request.last_status = 'withdrawal_approved'
-        withdrawal_request.save()
+        transition(
+            withdrawal_request, WithdrawalInfo.Status.WITHDRAWAL_APPROVED, actor_of(request),
+            withdrawal_confirmation=True, withdrawal_approval_date=date.today(),
+        )
         return Response({"success":True,"message": "Withdrawal request confirmed successfully.","data":{"invoice_no": invoice_no}}, status=status.HTTP_200_OK)
     
 class WithdrawalRequestUpdateView(APIView):
@@ -494,7 +534,7 @@ class WithdrawalRequestUpdateView(APIView):
             serializer.save()
             logger.info("Withdrawal request updated successfully for MIO %s", invoice_no)
             return Response({'success':True,'detail':'Withdrawal request updated successfully','data':serializer.data}, status=status.HTTP_200_OK)
-        logger.error(f"Error updating withdrawal request {invoice_no} : {serializer.errors}")
+        logger.error("Error updating withdrawal request %s : %s", invoice_no, serializer.errors)
         return Response({'success':False,"detail": serializer.errors}, status=status.HTTP_400_BAD_REQUEST) 
     
 
@@ -517,8 +557,9 @@ class WithdrawalInfoFinalListView(APIView):
             filters.append("wi.mio_id = %s")
             params.append(mio_id)
         if rm_id:
-            filters.append("wi.rm_id = %s")
-            params.append(rm_id)
+            clause, clause_params = rm_scope_sql(rm_id, request.query_params.get('scope'))
+            filters.append(clause)
+            params.extend(clause_params)
         if depot_id:
             filters.append("wi.depot_id = %s")
             params.append(depot_id)
@@ -561,6 +602,8 @@ class WithdrawalInfoFinalListView(APIView):
             wi.order_approval_date,
             wi.delivery_date,
             wi.last_status,
+            wi.request_total,
+            wi.withdrawal_total,
 
             rl.matnr AS matnr,
             m.material_name,
@@ -584,12 +627,13 @@ class WithdrawalInfoFinalListView(APIView):
         ORDER BY wi.id DESC
         """
 
-        with connection.cursor() as cursor:
+        with span('query') as current, connection.cursor() as cursor:
             cursor.execute(sql, params)
             if cursor.description is None:
                 return Response(paginate([],message="No data found.", page=1, per_page=10), status=status.HTTP_200_OK)
             columns = [col[0] for col in cursor.description]
             rows = cursor.fetchall()
+            current.set('rows', len(rows))
 
         # Column mapping
         material_cols = ["matnr", "material_name", "batch", "request_pack_qty", "request_unit_qty",
@@ -604,6 +648,7 @@ class WithdrawalInfoFinalListView(APIView):
         if not rows:
             return Response(paginate([],message="No data found.", page=1, per_page=10), status=status.HTTP_200_OK)
 
+        group = start_span('group', rows=len(rows))
         for row in rows:
             row_dict = dict(zip(columns, row))
             invoice_no = row_dict["invoice_no"]
@@ -632,6 +677,7 @@ class WithdrawalInfoFinalListView(APIView):
 
         # Convert to list
         data_list = list(data_map.values())
+        group.finish()
 
         # pagination
         page = int(request.query_params.get('page', 1))
@@ -641,6 +687,65 @@ class WithdrawalInfoFinalListView(APIView):
                 "success": False,
                 "message": "Invalid 'page' or 'per_page'. Must be positive integers."
             }, status=status.HTTP_400_BAD_REQUEST)
-        paginate_results= paginate(data_list,page=page,per_page=page_size)
-        logger.info(f"Fetched {len(data_list)} withdrawal requests")
+        paginate_results= traced('paginate', paginate, data_list,page=page,per_page=page_size)
+        logger.info("Fetched %s withdrawal requests", len(data_list))
         return Response(paginate_results, status=status.HTTP_200_OK)
+
+
+class WithdrawalExportView(APIView):
+    """
+    Stream the withdrawal history of a depot as CSV or NDJSON.
+
+    One row per withdrawn line, with its invoice header, for invoices whose
+    withdrawal_date falls inside `from_date`..`to_date`, including archived
+    invoices. Rows are read in keyset-paginated chunks, so memory stays
+    constant however long the range is.
+    """
+    columns = [
+        'line_id', 'invoice_no', 'invoice_type', 'depot_id', 'route_id', 'partner_id',
+        'mio_id', 'rm_id', 'da_id', 'last_status', 'request_date', 'withdrawal_date',
+        'withdrawal_approval_date', 'matnr', 'batch', 'pack_qty', 'strip_qty', 'unit_qty',
+        'net_val', 'expire_date',
+    ]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='depot_id', description='Depot ID', required=True, type=str),
+            OpenApiParameter(name='from_date', description='Withdrawal date from (YYYY-MM-DD)', required=True, type=OpenApiTypes.DATE),
+            OpenApiParameter(name='to_date', description='Withdrawal date to (YYYY-MM-DD)', required=True, type=OpenApiTypes.DATE),
+            OpenApiParameter(name='file_format', description='Export format', required=False, type=str, enum=['csv', 'ndjson']),
+            OpenApiParameter(name='gzip', description='Gzip the response body (1 or 0)', required=False, type=str),
+        ],
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(description="Streamed CSV or NDJSON file"),
+            status.HTTP_400_BAD_REQUEST: OpenApiResponse(description="Invalid request parameters"),
+        }
+    )
+    def get(self, request):
+        """
+        Stream withdrawn lines of one depot for a withdrawal date range.
+        """
+        export, error = parse_export_params(request.query_params)
+        if error:
+            return Response({"success":False,"message": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        sql = """
+        SELECT
+            wl.id AS line_id, wi.invoice_no, wi.invoice_type, wi.depot_id, wi.route_id, wi.partner_id,
+            wi.mio_id, wi.rm_id, wi.da_id, wi.last_status, wi.request_date, wi.withdrawal_date,
+            wi.withdrawal_approval_date, wl.matnr, wl.batch, wl.pack_qty, wl.strip_qty, wl.unit_qty,
+            wl.net_val, wl.expire_date
+        FROM {withdrawal_list} wl
+        INNER JOIN {info} wi ON wi.id = wl.invoice_id_id
+        WHERE wi.depot_id = %s AND wi.withdrawal_date BETWEEN %s AND %s AND wl.id > %s
+        ORDER BY wl.id
+        LIMIT %s
+        """
+        params = [export['depot_id'], export['from_date'], export['to_date']]
+        # Hot tables first, then the archive when the range reaches back into it
+        rows = chain.from_iterable(
+            iter_keyset(sql.format(**tables), params) for tables in table_tiers(export['from_date'])
+        )
+        logger.info("Withdrawal export started for depot %s (%s to %s)", export['depot_id'], export['from_date'], export['to_date'])
+        filename = f"withdrawal_{export['depot_id']}_{export['from_date']}_{export['to_date']}"
+        return export_response(request, self.columns, rows, export['format'], export['gzip'], filename)